@@ -0,0 +1,403 @@
+"""
+Schema-directed decoder for the survey answers POSTed to `/generate-results`.
+
+The frontend sends `JSON.stringify(answers)`, a flat object keyed by the
+`inputKey`s (and `consentInputKey`s) in `src/data/surveyData.js`. This module
+compiles that survey definition once into a small schema and decodes request
+bodies straight into slotted answer objects:
+
+  - single-choice answers become the option's small-int index
+  - multi-select answers become an int bitmask of option indexes
+  - text answers stay strings, consent flags stay bools
+
+Bodies are size-capped before they are read, and unknown keys, unknown option
+ids and oversize arrays are rejected while parsing.
+
+Startup reads the prebuilt `build/survey-schema.json` artifact (written by
+`populate_project.py`) and only falls back to compiling through node when the
+artifact is missing or older than `surveyData.js`.
+
+Long-running servers can call `watch_schema_artifact()` to pick up a rebuilt
+artifact without restarting (see that function for the swap rules);
+live_catalog.py does the same for the product catalog and weights, and
+rebuilds them when the schema changes.
+
+Usage from a request handler:
+
+    schema = get_schema()
+    raw = read_capped_body(request.stream, request.content_length)
+    answers = decode_answers(raw, schema)
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from textwrap import dedent
+
+try:
+    import msgspec  # Optional: fastest backend, validates while parsing
+except ImportError:
+    msgspec = None
+
+# --- Configuration ---
+PROJECT_ROOT = Path(__file__).resolve().parent
+SURVEY_DATA_PATH = PROJECT_ROOT / "src" / "data" / "surveyData.js"
+SCHEMA_ARTIFACT_PATH = PROJECT_ROOT / "build" / "survey-schema.json"
+SCHEMA_ARTIFACT_VERSION = 1 # Bump when the artifact layout changes
+SCHEMA_WATCH_INTERVAL = 2.0 # Seconds between artifact checks in watch_schema_artifact()
+MAX_BODY_BYTES = 16 * 1024 # Generous: a full set of answers is well under 2 KB
+MAX_TEXT_LENGTH = 320 # Longest valid email address; also caps name/age strings
+MULTI_SELECT_TYPES = ('multi-grid', 'checkbox')
+TEXT_TYPES = ('text', 'email')
+
+# Prints `surveySteps` as JSON. Functions (`validation`, `condition`) are dropped,
+# so `hasCondition` is added explicitly for tools that need to know about them.
+DUMP_SURVEY_STEPS_JS = dedent("""\
+    const { surveySteps } = await import(process.argv[1]);
+    const steps = surveySteps.map(step => ({ ...step, hasCondition: typeof step.condition === 'function' }));
+    process.stdout.write(JSON.stringify(steps));
+""")
+
+# --- Errors ---
+
+class PayloadError(ValueError):
+    """Raised for request bodies that must be rejected; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# --- Schema ---
+
+class AnswerField:
+    """One answer slot: its key, kind ('single', 'multi', 'text' or 'flag') and interned option ids."""
+
+    __slots__ = ('key', 'kind', 'option_ids', 'option_index', 'max_items')
+
+    def __init__(self, key, kind, option_ids=()):
+        self.key = key
+        self.kind = kind
+        self.option_ids = tuple(option_ids)
+        self.option_index = {option_id: i for i, option_id in enumerate(self.option_ids)}
+        self.max_items = len(self.option_ids)
+
+class AnswerRecord:
+    """Base class for the generated, slotted answer classes. Unanswered slots are None."""
+
+    __slots__ = ()
+    schema = None # Set on each generated subclass
+
+    def option_ids(self, key):
+        """Maps an interned answer back to its option id(s)."""
+        field = self.schema.fields[key]
+        value = getattr(self, key)
+        if value is None or field.kind not in ('single', 'multi'):
+            return value
+        if field.kind == 'single':
+            return field.option_ids[value]
+        return [option_id for i, option_id in enumerate(field.option_ids) if value >> i & 1]
+
+    def __repr__(self):
+        values = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.__slots__ if getattr(self, key) is not None)
+        return f"{type(self).__name__}({values})"
+
+class SurveySchema:
+    """Compiled answer schema: one AnswerField per key plus the slotted class answers decode into.
+
+    `version` identifies the survey source it was built from. Interned option
+    indexes are only meaningful within one version, so anything that caches or
+    stores decoded answers should key on it.
+    """
+
+    def __init__(self, steps, fields, version=None):
+        self.steps = steps
+        self.fields = fields
+        self.version = version
+        self.answers_type = type('Answers', (AnswerRecord,), {'__slots__': tuple(self.fields), 'schema': self})
+        self._struct_type = _build_struct_type(self.fields) if msgspec else None
+
+    def new_answers(self):
+        record = self.answers_type()
+        for key in self.fields:
+            setattr(record, key, None)
+        return record
+
+def compile_fields(steps):
+    """Builds the AnswerField table (with interned option ids) for every answer key in `steps`."""
+    fields = {}
+    for step in steps:
+        input_key = step.get('inputKey')
+        if input_key:
+            option_ids = [option['id'] for option in step.get('options', [])]
+            if step['type'] in TEXT_TYPES:
+                kind = 'text'
+            elif step['type'] in MULTI_SELECT_TYPES:
+                kind = 'multi'
+            else:
+                kind = 'single'
+            fields[input_key] = AnswerField(input_key, kind, option_ids)
+        if step.get('consentInputKey'):
+            fields[step['consentInputKey']] = AnswerField(step['consentInputKey'], 'flag')
+    return fields
+
+def run_survey_script(script, survey_data_path=SURVEY_DATA_PATH):
+    """Runs an ESM snippet that imports the survey module (its URL is process.argv[1]) and returns the JSON it prints."""
+    command = ['node', '--input-type=module', '-e', script, Path(survey_data_path).resolve().as_uri()]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise RuntimeError("'node' command not found. It is needed to read the survey definition.") from None
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Could not load {survey_data_path}:\n{e.stderr}") from None
+    return json.loads(result.stdout)
+
+def compile_schema(survey_data_path=SURVEY_DATA_PATH):
+    """Loads `surveySteps` through node (the survey module is plain ESM) and compiles it."""
+    steps = run_survey_script(DUMP_SURVEY_STEPS_JS, survey_data_path)
+    return SurveySchema(steps, compile_fields(steps), version=_source_hash(survey_data_path)[:12])
+
+# --- Prebuilt Artifact ---
+
+def _source_hash(survey_data_path):
+    return hashlib.sha256(Path(survey_data_path).read_bytes()).hexdigest()
+
+def write_schema_artifact(survey_data_path=SURVEY_DATA_PATH, artifact_path=SCHEMA_ARTIFACT_PATH):
+    """Compiles the survey once and writes the steps plus interning tables to a versioned artifact."""
+    schema = compile_schema(survey_data_path)
+    artifact = {
+        'version': SCHEMA_ARTIFACT_VERSION,
+        'sourceHash': _source_hash(survey_data_path),
+        'steps': schema.steps,
+        'fields': [[field.key, field.kind, list(field.option_ids)] for field in schema.fields.values()],
+    }
+    artifact_path = Path(artifact_path)
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so a running server never reads a half-written artifact
+    tmp_path = artifact_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(artifact, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp_path, artifact_path)
+    return artifact_path
+
+def load_schema_artifact(survey_data_path=SURVEY_DATA_PATH, artifact_path=SCHEMA_ARTIFACT_PATH):
+    """Loads the prebuilt schema, or returns None if it is missing, from another version, or stale."""
+    try:
+        artifact = json.loads(Path(artifact_path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if artifact.get('version') != SCHEMA_ARTIFACT_VERSION:
+        return None
+    if Path(survey_data_path).exists() and artifact.get('sourceHash') != _source_hash(survey_data_path):
+        print(f"Warning: {artifact_path} is older than {survey_data_path}, recompiling.", file=sys.stderr)
+        return None
+    fields = {key: AnswerField(key, kind, option_ids) for key, kind, option_ids in artifact['fields']}
+    return SurveySchema(artifact['steps'], fields, version=artifact['sourceHash'][:12])
+
+def validate_schema(schema):
+    """Checks a freshly loaded schema before it may replace the live one; returns a list of problems.
+
+    The artifact stores its interning tables next to the steps they were
+    compiled from, so the tables are compiled again from those steps and
+    must match: a truncated or hand-edited artifact fails here.
+    """
+    problems = []
+    expected = compile_fields(schema.steps)
+    for key in expected.keys() - schema.fields.keys():
+        problems.append(f"'{key}' is in surveySteps but has no field")
+    for key, field in schema.fields.items():
+        if key not in expected:
+            problems.append(f"'{key}' is not an inputKey in surveySteps")
+        elif (field.kind, field.option_ids) != (expected[key].kind, expected[key].option_ids):
+            problems.append(f"'{key}' does not match its step's type or options")
+        if field.kind in ('single', 'multi') and not field.option_ids:
+            problems.append(f"'{key}' has no options")
+        if len(field.option_index) != len(field.option_ids):
+            problems.append(f"'{key}' has duplicate option ids")
+    return problems
+
+_schema = None
+
+def get_schema():
+    """Returns the process-wide schema: the prebuilt artifact if it is current, else compiled on first use."""
+    global _schema
+    if _schema is None:
+        _schema = load_schema_artifact() or compile_schema()
+    return _schema
+
+def watch_schema_artifact(artifact_path=SCHEMA_ARTIFACT_PATH, interval=SCHEMA_WATCH_INTERVAL):
+    """Starts a daemon thread that hot-swaps the live schema whenever the artifact is rebuilt.
+
+    The new version is loaded and validated off to the side, then published
+    with a single reference assignment. Requests that already called
+    get_schema() finish on the version they started with; `schema.version`
+    changes, which is what version-tagged caches invalidate on.
+    """
+    def poll():
+        global _schema
+        last_mtime = None
+        while True:
+            try:
+                mtime = Path(artifact_path).stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != last_mtime:
+                last_mtime = mtime
+                candidate = load_schema_artifact(artifact_path=artifact_path)
+                problems = validate_schema(candidate) if candidate else ["artifact could not be loaded"]
+                if problems:
+                    print(f"Warning: keeping schema {getattr(_schema, 'version', None)}: {'; '.join(problems)}", file=sys.stderr)
+                elif _schema is None or candidate.version != _schema.version:
+                    _schema = candidate
+                    print(f"Loaded survey schema {candidate.version}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=poll, name='schema-watcher', daemon=True)
+    thread.start()
+    return thread
+
+# --- Decoding ---
+
+def read_capped_body(stream, content_length, limit=MAX_BODY_BYTES):
+    """Reads a request body from a file-like `stream`, refusing oversize bodies before reading them."""
+    if content_length is not None:
+        try:
+            length = int(content_length)
+        except (TypeError, ValueError):
+            length = -1
+        if length < 0: # read(-1) would read the whole stream, past any cap
+            raise PayloadError("Content-Length must be a non-negative integer.")
+        if length > limit:
+            raise PayloadError(f"Request body exceeds {limit} bytes.", status=413)
+        return stream.read(length)
+    # No Content-Length (e.g. chunked): read one byte past the limit to detect overflow
+    raw = stream.read(limit + 1)
+    if len(raw) > limit:
+        raise PayloadError(f"Request body exceeds {limit} bytes.", status=413)
+    return raw
+
+def decode_answers(raw, schema):
+    """Decodes a JSON request body into a `schema.answers_type` instance."""
+    if len(raw) > MAX_BODY_BYTES:
+        raise PayloadError(f"Request body exceeds {MAX_BODY_BYTES} bytes.", status=413)
+    if schema._struct_type is not None:
+        return _decode_with_msgspec(raw, schema)
+    return _decode_with_json(raw, schema)
+
+def decode_answer_mapping(mapping, schema, kinds=None):
+    """Like decode_answers, for answers already parsed into a dict (e.g. nested in an event batch).
+
+    `kinds` optionally restricts which field kinds are accepted, so callers can
+    refuse free-text answers they must not store.
+    """
+    if not isinstance(mapping, dict):
+        raise PayloadError("Answers must be a JSON object.")
+    record = schema.new_answers()
+    for key, value in mapping.items():
+        field = schema.fields.get(key)
+        if field is None or (kinds is not None and field.kind not in kinds):
+            raise PayloadError(f"Unknown answer key '{key}'.")
+        if value is not None:
+            setattr(record, key, _intern_value(field, value))
+    return record
+
+def _intern_value(field, value):
+    """Validates one raw answer value and returns its compact form."""
+    if field.kind == 'single':
+        if type(value) is not str or value not in field.option_index:
+            raise PayloadError(f"Unknown option for '{field.key}'.")
+        return field.option_index[value]
+    if field.kind == 'multi':
+        if type(value) is not list:
+            raise PayloadError(f"'{field.key}' must be a list.")
+        if len(value) > field.max_items:
+            raise PayloadError(f"Too many options for '{field.key}'.")
+        mask = 0
+        for option_id in value:
+            index = field.option_index.get(option_id) if type(option_id) is str else None
+            if index is None:
+                raise PayloadError(f"Unknown option for '{field.key}'.")
+            mask |= 1 << index
+        return mask
+    if field.kind == 'text':
+        if type(value) is not str or len(value) > MAX_TEXT_LENGTH:
+            raise PayloadError(f"'{field.key}' must be a string of at most {MAX_TEXT_LENGTH} characters.")
+        return value
+    if type(value) is not bool:
+        raise PayloadError(f"'{field.key}' must be true or false.")
+    return value
+
+def _decode_with_json(raw, schema):
+    fields = schema.fields
+
+    def build_record(pairs):
+        # Called with the raw key/value pairs, so no dict is built. Answers are flat,
+        # which means any nested object fails here or as a value of the outer object.
+        record = schema.new_answers()
+        for key, value in pairs:
+            field = fields.get(key)
+            if field is None:
+                raise PayloadError(f"Unknown answer key '{key}'.")
+            if value is not None:
+                setattr(record, key, _intern_value(field, value))
+        return record
+
+    try:
+        record = json.loads(raw, object_pairs_hook=build_record)
+    except (ValueError, RecursionError) as e:
+        if isinstance(e, PayloadError):
+            raise
+        raise PayloadError("Request body is not valid JSON.") from None
+    if not isinstance(record, schema.answers_type):
+        raise PayloadError("Request body must be a JSON object.")
+    return record
+
+def _build_struct_type(fields):
+    """Builds a msgspec Struct that rejects unknown keys, unknown option ids and oversize arrays while parsing."""
+    from typing import Annotated, Literal, Optional
+
+    struct_fields = []
+    for key, field in fields.items():
+        if field.kind == 'single':
+            value_type = Literal[field.option_ids]
+        elif field.kind == 'multi':
+            value_type = Annotated[list[Literal[field.option_ids]], msgspec.Meta(max_length=field.max_items)]
+        elif field.kind == 'text':
+            value_type = Annotated[str, msgspec.Meta(max_length=MAX_TEXT_LENGTH)]
+        else:
+            value_type = bool
+        struct_fields.append((key, Optional[value_type], None))
+    return msgspec.defstruct('AnswersPayload', struct_fields, forbid_unknown_fields=True)
+
+def _decode_with_msgspec(raw, schema):
+    try:
+        payload = msgspec.json.decode(raw, type=schema._struct_type)
+    except msgspec.ValidationError as e:
+        raise PayloadError(str(e)) from None
+    except msgspec.DecodeError:
+        raise PayloadError("Request body is not valid JSON.") from None
+    record = schema.answers_type()
+    for key, field in schema.fields.items():
+        value = getattr(payload, key)
+        if value is not None and field.kind in ('single', 'multi'):
+            value = _intern_value(field, value)
+        setattr(record, key, value)
+    return record
+
+# --- Command Line ---
+
+def main():
+    """Decodes a JSON answers body from stdin; handy for checking what the backend will accept."""
+    schema = get_schema()
+    try:
+        answers = decode_answers(read_capped_body(sys.stdin.buffer, None), schema)
+    except PayloadError as e:
+        print(f"Rejected ({e.status}): {e}", file=sys.stderr)
+        sys.exit(1)
+    print(answers)
+
+if __name__ == "__main__":
+    main()
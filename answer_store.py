@@ -0,0 +1,650 @@
+"""
+Columnar store of submitted answers, with block-level zone maps, for
+marketing questions such as "vegan women 25-35 with the Bones goal who
+smoke":
+
+    store = AnswerStore(get_schema())
+    store.append(answers_dict, ts)          # from a submit event's extra
+    store.count({'sex': 'female', 'age': [25, 35], 'dietDescription': 'd_vegan',
+                 'healthGoals': ['g_bones'], 'isSmoker': 'yes'})
+    store.crosstab('dietDescription', 'sex', where={...})
+
+Rows are grouped into blocks of BLOCK_ROWS. Inside a sealed block every
+closed-option column is stored as one bitmap per option (bit i = row i, held
+in a Python int), and age as AGE_BITS bit-sliced bitmaps. Filters and
+counts are then whole-block integer ANDs/ORs and `int.bit_count()` calls, so
+the per-row work happens in C rather than in a Python loop.
+
+Each block also keeps a zone map per column: which options appear in it at
+all, which appear in every row, and the block's min/max age. Predicates
+consult the zone map first, so a block that can't match is skipped without
+touching its bitmaps, and a predicate every row satisfies costs nothing.
+
+Where-clause values:
+
+  - single-choice key: an option id, or a list of ids (any of them)
+  - multi-select key: a list of option ids the answer must all contain
+  - 'age': [low, high], inclusive
+
+Bitmaps are keyed by option id, not interned index, so blocks stay readable
+after options are added to or removed from the survey.
+
+On disk (see open()), a manifest lists the blocks in order and the tier
+each lives in: `block-<seq>.bin` (hot) or `cold/block-<seq>.bin.xz` (cold,
+lzma-compressed). The server seals the tail into a small block on every
+flush; compaction later merges runs of small blocks into full, sorted ones
+and moves blocks older than COLD_AFTER_DAYS to the cold tier.
+
+Erasure: each row carries a prefix of the SHA-256 of its normalized email,
+and every block keeps a sorted index of them. erase() only appends the hash
+to an fsync'd tombstone log. apply_tombstones() (run in the background)
+marks the matching rows deleted, so queries stop seeing them, and the next
+compaction drops them physically by rebuilding just the affected blocks.
+Submissions not yet in a saved block are kept in short-lived journal files
+(see seal_journal()), which a restart replays minus the erased hashes.
+"""
+
+import bisect
+import hashlib
+import itertools
+import json
+import lzma
+import os
+import re
+import struct
+from array import array
+from pathlib import Path
+
+from answer_decoder import PayloadError, decode_answer_mapping
+
+# --- Configuration ---
+BLOCK_ROWS = 65536 # 8 KB per bitmap
+SMALL_BLOCK_ROWS = BLOCK_ROWS // 4 # Smaller blocks get merged by compaction
+COLD_AFTER_DAYS = 30
+SORT_KEYS = ('dietDescription', 'sex') # Compacted blocks are sorted by these, then age, to tighten zone maps
+AGE_KEY = 'age'
+AGE_BITS = 7 # Ages 1..127; 0 means not given
+MAX_AGE = (1 << AGE_BITS) - 1
+EMAIL_HASH_KEY = 'emailHash' # Hex SHA-256 of the trimmed, lower-cased email, computed by the frontend
+BLOCK_FILE_MAGIC = b'PVAB'
+BLOCK_FILE_VERSION = 2 # 2 added the email index
+MANIFEST_NAME = 'manifest.json'
+TOMBSTONES_NAME = 'tombstones.log'
+JOURNAL_PATTERN = 'journal-*.jsonl'
+HOT, COLD = 'hot', 'cold'
+
+EMAIL_HASH_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+def hash_email(email):
+    """Same normalization and hash as the frontend's hashEmail()."""
+    return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+def email_prefix(email_hash):
+    """The 64-bit prefix rows are indexed by."""
+    return int(email_hash[:16], 16)
+
+def submission_row(answers, schema):
+    """Validates a submit event's answers; returns (decoded closed answers, age or 0, email prefix or 0)."""
+    if not isinstance(answers, dict):
+        raise PayloadError("Answers must be a JSON object.")
+    answers = dict(answers)
+    age = answers.pop(AGE_KEY, None)
+    if age is None:
+        age = 0
+    elif type(age) is not int or not 0 < age <= MAX_AGE:
+        raise PayloadError(f"'{AGE_KEY}' must be a whole number between 1 and {MAX_AGE}.")
+    email_hash = answers.pop(EMAIL_HASH_KEY, None)
+    if email_hash is not None and (type(email_hash) is not str or not EMAIL_HASH_PATTERN.fullmatch(email_hash)):
+        raise PayloadError(f"'{EMAIL_HASH_KEY}' must be a lower-case hex SHA-256.")
+    return decode_answer_mapping(answers, schema, kinds=('single', 'multi')), age, email_prefix(email_hash) if email_hash else 0
+
+def _set_rows(bitmap):
+    """Row numbers of the set bits, lowest first."""
+    return [match.start() for match in re.finditer('1', format(bitmap, 'b')[::-1])]
+
+# --- Blocks ---
+
+class Block:
+    """One sealed block: per-option bitmaps, age bit slices, zone maps and the email index."""
+
+    __slots__ = ('rows', 'all_rows', 'columns', 'present', 'full', 'age_slices', 'age_known', 'age_min', 'age_max', 'ts_max',
+                 'email_keys', 'email_rows', 'deleted', 'live_rows', 'seq', 'tier')
+
+    def __init__(self, rows, columns, age_slices, ts_max, email_keys=None, email_rows=None):
+        self.rows = rows
+        self.all_rows = (1 << rows) - 1
+        self.columns = columns # key -> {option id: bitmap}
+        self.age_slices = age_slices # Least significant bit first
+        self.ts_max = ts_max # Latest submission in the block (after compaction: latest of the merged blocks)
+        self.email_keys = email_keys if email_keys is not None else array('Q') # Sorted email prefixes...
+        self.email_rows = email_rows if email_rows is not None else array('I') # ...and the row each belongs to
+        self.deleted = 0 # Erased rows not yet dropped by compaction
+        self.live_rows = self.all_rows
+        self.seq = None # File sequence number, once the block has been saved
+        self.tier = HOT
+
+        # Zone maps
+        self.present = {key: {option_id for option_id, bitmap in bitmaps.items() if bitmap} for key, bitmaps in columns.items()}
+        self.full = {key: {option_id for option_id, bitmap in bitmaps.items() if bitmap == self.all_rows} for key, bitmaps in columns.items()}
+        self.age_known = 0
+        for bitmap in age_slices:
+            self.age_known |= bitmap
+        self.age_min, self.age_max = self._age_bounds()
+
+    def _age_bounds(self):
+        """Smallest and largest given age, read off the slices without decoding rows."""
+        if not self.age_known:
+            return None, None
+        low_rows, high_rows, low, high = self.age_known, self.age_known, 0, 0
+        for bit in reversed(range(AGE_BITS)):
+            ones = high_rows & self.age_slices[bit]
+            if ones:
+                high_rows, high = ones, high | (1 << bit)
+            zeros = low_rows & ~self.age_slices[bit]
+            if zeros:
+                low_rows = zeros
+            else:
+                low |= 1 << bit
+        return low, high
+
+    def age_at_most(self, limit):
+        """Rows whose age is <= limit (rows without an age read as 0 and match)."""
+        less, equal = 0, self.all_rows
+        for bit in reversed(range(AGE_BITS)):
+            if limit >> bit & 1:
+                less |= equal & ~self.age_slices[bit]
+                equal &= self.age_slices[bit]
+            else:
+                equal &= ~self.age_slices[bit]
+        return (less | equal) & self.all_rows
+
+    def age_between(self, low, high):
+        return self.age_at_most(high) & ~self.age_at_most(low - 1) & self.age_known
+
+    def rows_for_emails(self, prefixes):
+        """Bitmap of the rows whose email prefix is in `prefixes`."""
+        rows = 0
+        for prefix in prefixes:
+            i = bisect.bisect_left(self.email_keys, prefix)
+            while i < len(self.email_keys) and self.email_keys[i] == prefix:
+                rows |= 1 << self.email_rows[i]
+                i += 1
+        return rows
+
+    def mark_deleted(self, rows):
+        self.deleted |= rows & self.all_rows
+        self.live_rows = self.all_rows & ~self.deleted
+
+def build_block(rows, fields):
+    """Seals staged (answers, age, ts, email prefix) rows into a Block."""
+    count = len(rows)
+    width = (count + 7) // 8
+    columns = {}
+    for key, field in fields.items():
+        buffers = [bytearray(width) for _ in field.option_ids]
+        for row, staged in enumerate(rows):
+            value = getattr(staged[0], key)
+            if value is None:
+                continue
+            byte, bit = row >> 3, 1 << (row & 7)
+            if field.kind == 'single':
+                buffers[value][byte] |= bit
+            else:
+                while value:
+                    low = value & -value
+                    buffers[low.bit_length() - 1][byte] |= bit
+                    value ^= low
+        columns[key] = {option_id: int.from_bytes(buffer, 'little') for option_id, buffer in zip(field.option_ids, buffers)}
+
+    slices = [bytearray(width) for _ in range(AGE_BITS)]
+    for row, staged in enumerate(rows):
+        age = staged[1]
+        for bit in range(AGE_BITS):
+            if age >> bit & 1:
+                slices[bit][row >> 3] |= 1 << (row & 7)
+    order = sorted(range(count), key=lambda row: rows[row][3])
+    return Block(count, columns, [int.from_bytes(s, 'little') for s in slices], max(staged[2] for staged in rows),
+                 array('Q', (rows[row][3] for row in order)), array('I', order))
+
+def decode_rows(block, schema, fields):
+    """The block's live rows as staged (answers, age, ts, email prefix) tuples, for rebuilding it."""
+    records = {row: schema.new_answers() for row in _set_rows(block.live_rows)}
+    for key, field in fields.items():
+        for index, option_id in enumerate(field.option_ids):
+            for row in _set_rows(block.columns[key].get(option_id, 0) & block.live_rows):
+                record = records[row]
+                setattr(record, key, index if field.kind == 'single' else (getattr(record, key) or 0) | 1 << index)
+    ages = dict.fromkeys(records, 0)
+    for bit, bitmap in enumerate(block.age_slices):
+        for row in _set_rows(bitmap & block.live_rows):
+            ages[row] |= 1 << bit
+    emails = {row: key for key, row in zip(block.email_keys, block.email_rows) if row in records}
+    return [(record, ages[row], block.ts_max, emails.get(row, 0)) for row, record in records.items()]
+
+def write_block(block, path, compress=False):
+    """Binary block file: magic, header length, JSON header, every bitmap as little-endian bytes, then the email index."""
+    width = (block.rows + 7) // 8
+    header = json.dumps({
+        'version': BLOCK_FILE_VERSION, 'rows': block.rows, 'tsMax': block.ts_max,
+        'columns': [[key, list(bitmaps)] for key, bitmaps in block.columns.items()], 'ageBits': AGE_BITS,
+        'emails': len(block.email_keys),
+    }, separators=(',', ':')).encode('utf-8')
+    parts = [BLOCK_FILE_MAGIC, struct.pack('<I', len(header)), header]
+    for bitmaps in block.columns.values():
+        parts.extend(bitmap.to_bytes(width, 'little') for bitmap in bitmaps.values())
+    parts.extend(bitmap.to_bytes(width, 'little') for bitmap in block.age_slices)
+    parts += [block.email_keys.tobytes(), block.email_rows.tobytes()]
+    data = b''.join(parts)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(lzma.compress(data) if compress else data)
+    os.replace(tmp_path, path)
+
+def read_block(path, fields):
+    """Loads a block file, re-keyed to the current schema: unknown columns/options are dropped, new ones start empty."""
+    data = Path(path).read_bytes()
+    if Path(path).suffix == '.xz':
+        data = lzma.decompress(data)
+    if data[:4] != BLOCK_FILE_MAGIC:
+        raise ValueError(f"{path} is not an answer block file")
+    (header_length,) = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_length])
+    if header['version'] not in (1, BLOCK_FILE_VERSION) or header['ageBits'] != AGE_BITS:
+        raise ValueError(f"{path} has an unsupported block layout")
+    width = (header['rows'] + 7) // 8
+    offset = 8 + header_length
+
+    def take(size):
+        nonlocal offset
+        offset += size
+        return data[offset - size:offset]
+
+    stored = {key: {option_id: int.from_bytes(take(width), 'little') for option_id in option_ids} for key, option_ids in header['columns']}
+    age_slices = [int.from_bytes(take(width), 'little') for _ in range(AGE_BITS)]
+    email_keys, email_rows = array('Q'), array('I')
+    if header.get('emails'): # Version 1 blocks predate erasure and have no index
+        email_keys.frombytes(take(8 * header['emails']))
+        email_rows.frombytes(take(email_rows.itemsize * header['emails']))
+    columns = {key: {option_id: stored.get(key, {}).get(option_id, 0) for option_id in field.option_ids} for key, field in fields.items()}
+    return Block(header['rows'], columns, age_slices, header['tsMax'], email_keys, email_rows)
+
+# --- Erasure ---
+
+class TombstoneLog:
+    """Append-only log of erased email hashes; one fsync'd line per erasure."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = self.path.read_text(encoding='ascii').split() if self.path.is_file() else []
+
+    def append(self, email_hash):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='ascii') as f:
+            f.write(email_hash + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries.append(email_hash)
+
+# --- Store ---
+
+class AnswerStore:
+    """Sealed blocks plus an open tail of staged rows; queries see both."""
+
+    def __init__(self, schema, block_rows=BLOCK_ROWS):
+        self.schema = schema
+        self.fields = {key: field for key, field in schema.fields.items() if field.kind in ('single', 'multi')}
+        self.block_rows = block_rows
+        self.blocks = []
+        self.tail = [] # Staged (answers, age, ts, email prefix) rows
+        self._tail_block = None # Cached build of the tail, dropped when it changes
+        self.observers = [] # E.g. CrossTabCube: row_appended, block_sealed, rows_deleted, tail_rewritten, blocks_compacted
+
+        # Replaced by open()
+        self.directory = None
+        self.tombstones = TombstoneLog(os.devnull)
+        self.tombstones_applied = 0 # Log entries already resolved to deleted rows
+        self.compacted_tombstones = 0 # Log entries already dropped physically
+        self.generation = 0 # Bumped by every compaction
+        self._seqs = itertools.count()
+        self.journal_saved = 0 # Journals up to this number are covered by the saved blocks (manifest 'journalSeq')
+        self.journal_sealed = 0 # ...and up to this one by the sealed blocks
+        self._journal_replayed = 0 # Last journal replayed into the tail by open()
+        self._journal_seqs = itertools.count(1)
+
+    def __len__(self):
+        return sum(block.live_rows.bit_count() for block in self.blocks) + len(self.tail)
+
+    def append(self, answers, ts):
+        """Adds one submission (a submit event's answers dict); returns the block sealed by it, if any."""
+        record, age, email = submission_row(answers, self.schema)
+        self.tail.append((record, age, ts, email))
+        self._tail_block = None
+        for observer in self.observers:
+            observer.row_appended(record)
+        if len(self.tail) >= self.block_rows:
+            return self.seal()
+        return None
+
+    def seal(self):
+        """Turns the tail into a block, even a short one (compaction merges those later)."""
+        if not self.tail:
+            return None
+        block = build_block(self.tail, self.fields)
+        self.blocks.append(block)
+        self.tail = []
+        self._tail_block = None
+        for observer in self.observers:
+            observer.block_sealed(block)
+        return block
+
+    def ingest(self, records):
+        """Event listener: appends the answers carried by submit events."""
+        for _, event_type, _, ts, extra in records:
+            if event_type == 'submit' and extra:
+                self.append(extra, ts)
+
+    def _all_blocks(self):
+        if self.tail and self._tail_block is None:
+            self._tail_block = build_block(self.tail, self.fields)
+        return self.blocks + [self._tail_block] if self.tail else self.blocks
+
+    # --- Queries ---
+
+    def compile_where(self, where):
+        """Validates a where-clause and turns it into (kind, key, option ids or age bounds) predicates."""
+        predicates = []
+        for key, value in (where or {}).items():
+            if key == AGE_KEY:
+                if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(type(v) is int for v in value):
+                    raise ValueError("'age' must be [low, high]")
+                predicates.append(('age', key, (max(value[0], 1), min(value[1], MAX_AGE))))
+                continue
+            field = self.fields.get(key)
+            if field is None:
+                raise ValueError(f"Unknown or non-filterable answer key: {key}")
+            option_ids = [value] if isinstance(value, str) else list(value)
+            unknown = [option_id for option_id in option_ids if option_id not in field.option_index]
+            if unknown or not option_ids:
+                raise ValueError(f"Unknown option(s) for {key}: {', '.join(map(str, unknown)) or '(none given)'}")
+            predicates.append(('any' if field.kind == 'single' else 'all', key, frozenset(option_ids)))
+        return predicates
+
+    def _filter(self, block, predicates):
+        """Bitmap of the block's matching rows; 0 when the zone maps rule the block out."""
+        rows = block.live_rows
+        for kind, key, operand in predicates:
+            if kind == 'any':
+                if not operand & block.present[key]:
+                    return 0
+                if operand & block.full[key]:
+                    continue # Every row has one of the wanted options
+                mask = 0
+                for option_id in operand & block.present[key]:
+                    mask |= block.columns[key][option_id]
+                rows &= mask
+            elif kind == 'all':
+                if operand - block.present[key]:
+                    return 0
+                for option_id in operand - block.full[key]:
+                    rows &= block.columns[key][option_id]
+            else:
+                low, high = operand
+                if block.age_min is None or block.age_max < low or block.age_min > high:
+                    return 0
+                if not (low <= block.age_min and block.age_max <= high and block.age_known == block.all_rows):
+                    rows &= block.age_between(low, high)
+            if not rows:
+                return 0
+        return rows
+
+    def count(self, where=None):
+        predicates = self.compile_where(where)
+        return sum(self._filter(block, predicates).bit_count() for block in self._all_blocks())
+
+    def distribution(self, key, where=None):
+        """Matching rows per option of `key` (a multi-select row counts once per option it holds)."""
+        return self.crosstab(key, None, where)
+
+    def crosstab(self, row_key, column_key=None, where=None):
+        """{row option: {column option: count}} over the matching rows, or {row option: count} without a column key."""
+        predicates = self.compile_where(where)
+        for key in (row_key, column_key):
+            if key is not None and key not in self.fields:
+                raise ValueError(f"Unknown or non-groupable answer key: {key}")
+        row_ids = self.fields[row_key].option_ids
+        column_ids = self.fields[column_key].option_ids if column_key else ()
+        table = {row_id: dict.fromkeys(column_ids, 0) if column_key else 0 for row_id in row_ids}
+        for block in self._all_blocks():
+            rows = self._filter(block, predicates)
+            if not rows:
+                continue
+            for row_id in block.present[row_key]:
+                selected = rows & block.columns[row_key][row_id]
+                if not selected:
+                    continue
+                if not column_key:
+                    table[row_id] += selected.bit_count()
+                    continue
+                cells = table[row_id]
+                for column_id in block.present[column_key]:
+                    cells[column_id] += (selected & block.columns[column_key][column_id]).bit_count()
+        return table
+
+    # --- Erasure ---
+
+    def erase(self, email_hash):
+        """Records an erasure request. O(1): the rows are found by apply_tombstones() and dropped by compaction."""
+        if type(email_hash) is not str or not EMAIL_HASH_PATTERN.fullmatch(email_hash):
+            raise ValueError("Expected a lower-case hex SHA-256")
+        self.tombstones.append(email_hash)
+
+    def apply_tombstones(self):
+        """Marks the rows of newly logged erasures as deleted (blocks and tail); returns the number of rows erased."""
+        new_entries = self.tombstones.entries[self.tombstones_applied:]
+        if not new_entries:
+            return 0
+        prefixes = {email_prefix(email_hash) for email_hash in new_entries}
+        erased = 0
+        for block in self.blocks:
+            rows = block.rows_for_emails(prefixes) & block.live_rows
+            if rows:
+                block.mark_deleted(rows)
+                erased += rows.bit_count()
+                for observer in self.observers:
+                    observer.rows_deleted(block, rows)
+        kept = [staged for staged in self.tail if staged[3] not in prefixes]
+        if len(kept) != len(self.tail):
+            erased += len(self.tail) - len(kept)
+            self.tail = kept
+            self._tail_block = None
+            for observer in self.observers:
+                observer.tail_rewritten(self.tail)
+        self.tombstones_applied += len(new_entries)
+        return erased
+
+    # --- Persistence ---
+
+    def _block_path(self, seq, tier):
+        if tier == COLD:
+            return self.directory / 'cold' / f"block-{seq:06d}.bin.xz"
+        return self.directory / f"block-{seq:06d}.bin"
+
+    def open(self, answers_dir):
+        """Loads the blocks listed in the manifest and re-marks logged erasures; returns the block count.
+
+        Directories written before the manifest existed are read by listing
+        their block files.
+        """
+        self.directory = Path(answers_dir)
+        manifest_path = self.directory / MANIFEST_NAME
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        else:
+            seqs = sorted(int(path.name[6:12]) for path in self.directory.glob('block-*.bin'))
+            manifest = {'generation': 0, 'blocks': [[seq, HOT] for seq in seqs], 'compactedTombstones': 0}
+        for seq, tier in manifest['blocks']:
+            block = read_block(self._block_path(seq, tier), self.fields)
+            block.seq, block.tier = seq, tier
+            self.blocks.append(block)
+        self.generation = manifest['generation']
+        self._seqs = itertools.count(max((seq for seq, _ in manifest['blocks']), default=-1) + 1)
+
+        # Erasures since the last compaction only exist as tombstones; mark their rows again
+        self.tombstones = TombstoneLog(self.directory / TOMBSTONES_NAME)
+        self.compacted_tombstones = self.tombstones_applied = manifest['compactedTombstones']
+        self.apply_tombstones()
+        self.journal_saved = self.journal_sealed = manifest.get('journalSeq', 0)
+        last_journal = max((int(path.name[8:14]) for path in self.directory.glob(JOURNAL_PATTERN)), default=0)
+        self._journal_seqs = itertools.count(max(last_journal, self.journal_saved) + 1)
+        return len(self.blocks)
+
+    def unsaved_blocks(self):
+        """Sealed blocks without a file yet, each given its sequence number; write them off the loop with write_blocks()."""
+        blocks = [block for block in self.blocks if block.seq is None]
+        for block in blocks:
+            block.seq = next(self._seqs)
+        return blocks
+
+    def write_blocks(self, blocks):
+        for block in blocks:
+            write_block(block, self._block_path(block.seq, block.tier), compress=block.tier == COLD)
+
+    def write_manifest(self):
+        """Atomically records which block files make up the store; call once their files exist."""
+        manifest = {
+            'generation': self.generation,
+            'blocks': [[block.seq, block.tier] for block in self.blocks if block.seq is not None],
+            'compactedTombstones': self.compacted_tombstones,
+            'journalSeq': self.journal_saved,
+        }
+        path = self.directory / MANIFEST_NAME
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    # --- Compaction ---
+
+    def plan_compaction(self, now_ms):
+        """Picks the saved blocks to rewrite: runs of small blocks, blocks with erased rows, and hot blocks old enough to go cold."""
+        runs, run = [], []
+        for block in self.blocks + [None]: # None closes the last run
+            if block is not None and block.seq is not None and (block.rows < SMALL_BLOCK_ROWS or block.deleted):
+                run.append(block)
+                continue
+            if len(run) > 1 or any(b.deleted for b in run):
+                runs.append(run)
+            run = []
+        merged = {id(block) for run in runs for block in run}
+        cutoff = now_ms - COLD_AFTER_DAYS * 24 * 3600 * 1000
+        to_cold = [block for block in self.blocks if block.seq is not None and block.tier == HOT
+                   and block.ts_max < cutoff and id(block) not in merged]
+        if not runs and not to_cold:
+            return None
+        return {'runs': runs, 'cold': to_cold, 'tombstones': self.tombstones_applied}
+
+    def run_compaction(self, plan):
+        """Builds and writes the replacement blocks for a plan; runs in a worker thread and leaves the store as it is."""
+        sort_fields = [self.fields[key] for key in SORT_KEYS if key in self.fields]
+
+        def sort_key(staged):
+            record, age = staged[0], staged[1]
+            return tuple(-1 if getattr(record, field.key) is None else getattr(record, field.key) for field in sort_fields) + (age,)
+
+        replacements = []
+        for run in plan['runs']:
+            rows = sorted((staged for block in run for staged in decode_rows(block, self.schema, self.fields)), key=sort_key)
+            new_blocks = [build_block(rows[start:start + self.block_rows], self.fields) for start in range(0, len(rows), self.block_rows)]
+            for block in new_blocks:
+                block.seq = next(self._seqs)
+            self.write_blocks(new_blocks)
+            replacements.append(new_blocks)
+        for block in plan['cold']:
+            write_block(block, self._block_path(block.seq, COLD), compress=True)
+        return replacements
+
+    def commit_compaction(self, plan, replacements):
+        """Swaps the rewritten blocks in (on the event loop), records the new manifest and removes the old files."""
+        obsolete = []
+        for run, new_blocks in zip(plan['runs'], replacements):
+            start = next(i for i, block in enumerate(self.blocks) if block is run[0])
+            self.blocks[start:start + len(run)] = new_blocks
+            obsolete += [self._block_path(block.seq, block.tier) for block in run]
+        for block in plan['cold']:
+            obsolete.append(self._block_path(block.seq, HOT))
+            block.tier = COLD
+
+        # Erasures applied while the plan ran only marked the old blocks; mark the new ones too
+        late_entries = self.tombstones.entries[plan['tombstones']:self.tombstones_applied]
+        if late_entries:
+            prefixes = {email_prefix(email_hash) for email_hash in late_entries}
+            for new_blocks in replacements:
+                for block in new_blocks:
+                    block.mark_deleted(block.rows_for_emails(prefixes))
+        self.compacted_tombstones = plan['tombstones']
+        self.generation += 1
+        self.write_manifest()
+        for path in obsolete:
+            path.unlink(missing_ok=True)
+        for observer in self.observers:
+            observer.blocks_compacted(self)
+
+    # --- Journal ---
+    #
+    # Event segments (survey_server.py) never hold email hashes, so submissions
+    # can't be rebuilt from them and still be erasable. Instead every flush
+    # writes the submissions it drained, hashes included, to a numbered journal
+    # file. The manifest records the last journal its blocks cover, and covered
+    # journals are deleted, so a journal only outlives the flush that wrote it
+    # after a crash. Replay skips rows whose email hash has been erased.
+
+    def _journal_path(self, seq):
+        return self.directory / f"journal-{seq:06d}.jsonl"
+
+    def seal_journal(self, records):
+        """Seals the tail and numbers the journal of the submissions among `records`; returns (seq, rows), seq None if there are none.
+
+        Call it in the same loop step that drained `records`, so the sealed
+        blocks hold exactly the journaled submissions (minus erased ones).
+        """
+        rows = [[ts, extra] for _, event_type, _, ts, extra in records if event_type == 'submit' and extra]
+        self.seal()
+        seq = next(self._journal_seqs) if rows else None
+        self.journal_sealed = max(self.journal_sealed, self._journal_replayed, seq or 0)
+        self._journal_replayed = 0
+        return seq, rows
+
+    def write_journal(self, seq, rows):
+        """Writes (and fsyncs) one journal file; blocking, run it off the loop."""
+        path = self._journal_path(seq)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row, separators=(',', ':')) + '\n' for row in rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def drop_journals(self):
+        """Deletes the journal files the manifest says are covered; call after write_manifest()."""
+        for path in self.directory.glob(JOURNAL_PATTERN):
+            if int(path.name[8:14]) <= self.journal_saved:
+                path.unlink(missing_ok=True)
+
+    def replay_journal(self):
+        """Re-appends submissions from journals newer than the manifest (left by a crash), minus erased ones; returns the count."""
+        erased = set(self.tombstones.entries)
+        count = 0
+        for path in sorted(self.directory.glob(JOURNAL_PATTERN)):
+            seq = int(path.name[8:14])
+            if seq <= self.journal_saved:
+                continue
+            with path.open(encoding='utf-8') as f:
+                for line in f:
+                    ts, answers = json.loads(line)
+                    if answers.get(EMAIL_HASH_KEY) in erased:
+                        continue
+                    self.append(answers, ts)
+                    count += 1
+            self._journal_replayed = seq
+        return count
@@ -0,0 +1,152 @@
+"""
+Content-hashed copies of the files in `public/`, so they can be cached for
+good.
+
+Every file directly in `public/` (`provit-icon.png`, ...) is copied to
+`public/static/` as `<name>.<content hash>.<ext>`, and a manifest at
+`src/data/assetManifest.json` maps each fixed path to its hashed one:
+
+    {"/provit-icon.png": "/static/provit-icon.3f9c0a1b.png", ...}
+
+References are rewritten to the hashed paths:
+
+  dist/index.html             every href/src naming a public file, fixed or
+                              from an earlier run (the favicon), when a
+                              build directory is given; the source
+                              index.html keeps its fixed paths
+  src/utils/assets.js         `assetUrl()` looks paths up in the manifest;
+                              ResponsiveImage and App.jsx go through it
+
+Hashed paths never change content, so they are served with
+IMMUTABLE_CACHE_CONTROL, as are the `public/img/` variants (image_assets.py)
+and Vite's own `assets/` output, which are content-hashed too: a repeat
+visit downloads no image at all. `cache_control()` is the rule for Python
+servers; vite.config.js applies the same one to `vite preview`. The
+originals stay in `public/` for anything that needs a fixed URL.
+
+A re-run only hashes: files whose hashed copy exists are not copied again,
+and copies no longer in the manifest are removed. The copies and the
+manifest must exist before `vite build` (the `prebuild` script), the
+rewrite needs its output (`postbuild`).
+
+    python asset_manifest.py      # hash only; same stage populate_project.py runs
+    python asset_manifest.py dist # hash, then rewrite dist/index.html
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+# --- Configuration ---
+PUBLIC_DIR = Path("public")
+HASHED_DIR_NAME = "static" # Inside PUBLIC_DIR, so Vite copies the hashed files as they are
+MANIFEST_PATH = Path("src") / "data" / "assetManifest.json"
+INDEX_HTML_PATH = Path("dist") / "index.html" # The built page; the source index.html is never rewritten
+HASH_LENGTH = 8
+IMMUTABLE_PREFIXES = (f"/{HASHED_DIR_NAME}/", "/img/", "/assets/") # Content-hashed URL paths
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache" # index.html and fixed paths: always checked, usually a 304
+
+REFERENCE_PATTERN = re.compile(r'\b(href|src)="(/[^"?#]+)"')
+HASHED_NAME_PATTERN = re.compile(r'^/' + re.escape(HASHED_DIR_NAME) + r'/(.+)\.[0-9a-f]{' + str(HASH_LENGTH) + r'}(\.[^./]+)$')
+
+# --- Fingerprinting ---
+
+def hashed_name(path, digest):
+    return f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"
+
+def public_assets(public_dir=PUBLIC_DIR):
+    return sorted(path for path in Path(public_dir).iterdir() if path.is_file() and not path.name.startswith('.'))
+
+def build_asset_manifest(public_dir=PUBLIC_DIR, manifest_path=MANIFEST_PATH):
+    """Writes the missing hashed copies and the manifest; returns (manifest, files copied)."""
+    public_dir = Path(public_dir)
+    hashed_dir = public_dir / HASHED_DIR_NAME
+    manifest, copied = {}, 0
+    for path in public_assets(public_dir):
+        data = path.read_bytes()
+        out_path = hashed_dir / hashed_name(path, hashlib.sha256(data).hexdigest())
+        if not out_path.exists():
+            hashed_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = out_path.with_name(out_path.name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, out_path)
+            copied += 1
+        manifest[f"/{path.name}"] = f"/{HASHED_DIR_NAME}/{out_path.name}"
+    if hashed_dir.is_dir():
+        wanted = {Path(url).name for url in manifest.values()}
+        for stale in hashed_dir.iterdir():
+            if stale.name not in wanted:
+                stale.unlink()
+
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(manifest, indent=2) + '\n'
+    if not manifest_path.exists() or manifest_path.read_text(encoding='utf-8') != text: # Unchanged manifest: no rebuild for Vite
+        tmp_path = manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, manifest_path)
+    return manifest, copied
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """The manifest, or {} before the stage has run (fixed paths are then used as they are)."""
+    manifest_path = Path(manifest_path)
+    return json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+
+# --- Rewriting ---
+
+def original_path(url_path):
+    """Fixed public path for a hashed one ('/static/provit-icon.3f9c0a1b.png' -> '/provit-icon.png'), else unchanged."""
+    match = HASHED_NAME_PATTERN.match(url_path)
+    return f"/{match.group(1)}{match.group(2)}" if match else url_path
+
+def rewrite_references(html, manifest):
+    """Points every href/src naming a public file, by fixed or earlier hashed path, at its current hashed path."""
+    def replace(match):
+        hashed = manifest.get(original_path(match.group(2)))
+        return f'{match.group(1)}="{hashed}"' if hashed else match.group(0)
+    return REFERENCE_PATTERN.sub(replace, html)
+
+def rewrite_index(manifest, index_path=INDEX_HTML_PATH):
+    """Rewrites index.html's references; returns False if they were already current."""
+    index_path = Path(index_path)
+    html = index_path.read_text(encoding='utf-8')
+    rewritten = rewrite_references(html, manifest)
+    if rewritten == html:
+        return False
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.write_text(rewritten, encoding='utf-8')
+    os.replace(tmp_path, index_path)
+    return True
+
+def build_hashed_assets(public_dir=PUBLIC_DIR, manifest_path=MANIFEST_PATH, index_path=None):
+    """The whole stage; returns (assets, files copied, index.html rewritten). Without `index_path` it only hashes."""
+    manifest, copied = build_asset_manifest(public_dir, manifest_path)
+    return len(manifest), copied, index_path is not None and rewrite_index(manifest, index_path)
+
+# --- Serving ---
+
+def cache_control(url_path):
+    """Cache-Control for a URL path: immutable for content-hashed files, revalidated for everything else."""
+    return IMMUTABLE_CACHE_CONTROL if url_path.startswith(IMMUTABLE_PREFIXES) else REVALIDATE_CACHE_CONTROL
+
+# --- Command Line ---
+
+def main():
+    index_path = Path(sys.argv[1]) / "index.html" if len(sys.argv) > 1 else None
+    if index_path is not None and not index_path.exists():
+        print(f"Error: {index_path} not found; run `npm run build` first", file=sys.stderr)
+        sys.exit(1)
+    try:
+        assets, copied, rewritten = build_hashed_assets(index_path=index_path)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Hashed {assets} public file(s), {copied} copied; wrote {MANIFEST_PATH}"
+          + (f"; {index_path} {'updated' if rewritten else 'unchanged'}" if index_path else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Picks a coherent supplement bundle for a user, instead of a plain top-N list.
+
+The objective is weighted coverage of health goals: each goal the bundle
+covers adds its weight once, so two products for the same goal don't score
+twice. A goal's weight is 1 when the user selected it in `healthGoals`, plus
+any boosts the catalog attaches to other answers (low sun, smoking, alcohol...).
+Bundles must stay within the catalog's nutrient upper limits and the size cap.
+
+Catalog settings used here (products as described in catalog_index.py, plus):
+
+    {
+      "upperLimits": {"vitamin_d_iu": 4000, "zinc_mg": 40},
+      "answerWeights": {"sunExposure": {"sun_rarely": {"g_bones": 0.5}}},
+      "products": [{"sku": "...", "goals": ["g_bones"], "nutrients": {"vitamin_d_iu": 1000}, "excludeFor": []}]
+    }
+
+The solver is greedy weighted max-coverage followed by single-swap local
+search, and checks a deadline as it goes: when the time budget runs out it
+returns the best bundle found so far.
+"""
+
+import sys
+import time
+
+from answer_decoder import get_schema
+from catalog_index import CatalogIndex, load_catalog
+
+# --- Configuration ---
+BUNDLE_SIZE_CAP = 4
+SOLVE_BUDGET_SECONDS = 0.010 # Slice of the results request budget given to one solve
+DEADLINE_CHECK_EVERY = 64 # Candidates scored between deadline checks
+
+class Bundle:
+    """Result of one solve. `complete` is False when the time budget cut the search short."""
+
+    __slots__ = ('skus', 'goals', 'score', 'complete')
+
+    def __init__(self, skus, goals, score, complete):
+        self.skus = skus
+        self.goals = goals
+        self.score = score
+        self.complete = complete
+
+    def __repr__(self):
+        return f"Bundle(skus={self.skus}, goals={self.goals}, score={self.score:.2f}, complete={self.complete})"
+
+class BundleOptimizer:
+    """Precomputed goal masks and dosage rows for one catalog, plus the bounded-time solver."""
+
+    def __init__(self, catalog, schema):
+        products = catalog['products']
+        self.index = CatalogIndex(products, schema)
+        self.goal_field = schema.fields['healthGoals']
+
+        upper_limits = catalog.get('upperLimits', {})
+        self.nutrients = sorted(upper_limits)
+        self.upper_limits = [upper_limits[nutrient] for nutrient in self.nutrients]
+        # One dosage row per product, aligned with self.nutrients; nutrients without a limit are ignored
+        self.doses = [tuple(product.get('nutrients', {}).get(nutrient, 0) for nutrient in self.nutrients) for product in products]
+
+        unknown = set()
+        # goal_masks[p]: goals product p covers (bits are healthGoals option indexes)
+        # goal_products[g]: products covering goal g (bits are product positions)
+        self.goal_masks = []
+        self.goal_products = [0] * len(self.goal_field.option_ids)
+        for position, product in enumerate(products):
+            mask = 0
+            for goal_id in product.get('goals', ()):
+                goal = self.goal_field.option_index.get(goal_id)
+                if goal is None:
+                    unknown.add(goal_id)
+                    continue
+                mask |= 1 << goal
+                self.goal_products[goal] |= 1 << position
+            self.goal_masks.append(mask)
+
+        # Flattened answer boosts: (field, interned option, goal index, weight)
+        self.boosts = []
+        for key, options in catalog.get('answerWeights', {}).items():
+            field = schema.fields.get(key)
+            if field is None or field.kind != 'single':
+                unknown.add(key)
+                continue
+            for option_id, goal_weights in options.items():
+                if option_id not in field.option_index:
+                    unknown.add(f"{key}:{option_id}")
+                    continue
+                for goal_id, weight in goal_weights.items():
+                    if goal_id not in self.goal_field.option_index:
+                        unknown.add(goal_id)
+                        continue
+                    self.boosts.append((key, field.option_index[option_id], self.goal_field.option_index[goal_id], weight))
+        if unknown:
+            raise ValueError(f"Catalog refers to ids that are not in surveySteps: {', '.join(sorted(unknown))}")
+
+    def goal_weights(self, answers):
+        selected = answers.healthGoals or 0
+        weights = [1.0 if selected >> goal & 1 else 0.0 for goal in range(len(self.goal_field.option_ids))]
+        for key, option, goal, weight in self.boosts:
+            if getattr(answers, key) == option:
+                weights[goal] += weight
+        return weights
+
+    def _gain(self, goal_mask, weights):
+        gain = 0.0
+        while goal_mask:
+            low_bit = goal_mask & -goal_mask
+            gain += weights[low_bit.bit_length() - 1]
+            goal_mask ^= low_bit
+        return gain
+
+    def _fits(self, totals, product):
+        return all(total + dose <= limit for total, dose, limit in zip(totals, self.doses[product], self.upper_limits))
+
+    def _totals(self, bundle):
+        return [sum(column) for column in zip(*(self.doses[p] for p in bundle))] if bundle else [0] * len(self.nutrients)
+
+    def _score(self, bundle, weights):
+        covered = 0
+        for product in bundle:
+            covered |= self.goal_masks[product]
+        return self._gain(covered, weights), covered
+
+    def solve(self, answers, size_cap=BUNDLE_SIZE_CAP, budget=SOLVE_BUDGET_SECONDS):
+        deadline = time.perf_counter() + budget
+        weights = self.goal_weights(answers)
+
+        # Only eligible products that cover at least one weighted goal are worth considering
+        relevant = 0
+        for goal, weight in enumerate(weights):
+            if weight > 0:
+                relevant |= self.goal_products[goal]
+        candidates = []
+        mask = self.index.eligible_mask(answers) & relevant
+        while mask:
+            low_bit = mask & -mask
+            candidates.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+
+        bundle, covered, score = [], 0, 0.0
+        totals = [0] * len(self.nutrients)
+        complete = True
+
+        # Phase 1: greedy weighted max-coverage under the dosage limits
+        while len(bundle) < size_cap and complete:
+            best, best_gain = None, 0.0
+            for n, product in enumerate(candidates):
+                if n % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                    complete = False
+                    break
+                gain = self._gain(self.goal_masks[product] & ~covered, weights)
+                if gain > best_gain and product not in bundle and self._fits(totals, product):
+                    best, best_gain = product, gain
+            if best is None:
+                break
+            bundle.append(best)
+            covered |= self.goal_masks[best]
+            score += best_gain
+            totals = [total + dose for total, dose in zip(totals, self.doses[best])]
+
+        # Phase 2: single swaps, while they improve the score and time remains
+        improved = complete
+        while improved:
+            improved = False
+            for slot in range(len(bundle)):
+                rest = bundle[:slot] + bundle[slot + 1:]
+                rest_totals = self._totals(rest)
+                rest_score, rest_covered = self._score(rest, weights)
+                for n, product in enumerate(candidates):
+                    if n % DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                        complete = False
+                        break
+                    if product in bundle:
+                        continue
+                    gain = self._gain(self.goal_masks[product] & ~rest_covered, weights)
+                    if rest_score + gain > score + 1e-9 and self._fits(rest_totals, product):
+                        bundle = rest[:slot] + [product] + rest[slot:]
+                        score = rest_score + gain
+                        improved = True
+                        break
+                if not complete or improved:
+                    break
+            if not complete:
+                break
+
+        score, covered = self._score(bundle, weights)
+        goals = [goal_id for goal, goal_id in enumerate(self.goal_field.option_ids) if covered >> goal & 1]
+        return Bundle([self.index.skus[p] for p in bundle], goals, score, complete)
+
+# --- Command Line ---
+
+def main():
+    """Solves one bundle for an answers body on stdin: `python bundle_optimizer.py catalog.json < answers.json`."""
+    from answer_decoder import PayloadError, decode_answers, read_capped_body
+
+    if len(sys.argv) != 2:
+        print("Usage: python bundle_optimizer.py <catalog.json> < answers.json", file=sys.stderr)
+        sys.exit(1)
+    schema = get_schema()
+    optimizer = BundleOptimizer(load_catalog(sys.argv[1]), schema)
+    try:
+        answers = decode_answers(read_capped_body(sys.stdin.buffer, None), schema)
+    except PayloadError as e:
+        print(f"Rejected ({e.status}): {e}", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    bundle = optimizer.solve(answers)
+    print(bundle)
+    print(f"Solved in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
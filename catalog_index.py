@@ -0,0 +1,126 @@
+"""
+Inverted index from survey answers to the catalog products they rule out.
+
+Each product lists the option ids that exclude it, drawn from the
+`allergies`, `dietRestrictions` and `dietDescription` steps in surveySteps:
+
+    {"sku": "omega-3-fish-oil", "excludeFor": ["al_fish", "d_vegan", "d_vegetarian"]}
+
+The catalog file is either that list of products, or an object with the list
+under "products" plus the bundle optimizer's settings (see bundle_optimizer.py).
+
+The index keeps one bitset per option (bit i = product i), stored as Python
+ints so every AND/OR works on whole machine words of products at a time.
+A user's eligible products are `all & ~(OR of their options' bitsets)`, which
+lines up with the bitmasks answer_decoder produces for multi-select answers.
+
+Usage:
+
+    index = CatalogIndex.from_json("catalog.json", get_schema())
+    skus = index.eligible_skus(answers)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from answer_decoder import get_schema
+
+# --- Configuration ---
+EXCLUSION_KEYS = ('allergies', 'dietRestrictions', 'dietDescription') # Answer keys whose options can rule out products
+
+def load_catalog(path):
+    """Reads a catalog file, normalising the bare product-list form to {"products": [...]}."""
+    catalog = json.loads(Path(path).read_text(encoding='utf-8'))
+    return {'products': catalog} if isinstance(catalog, list) else catalog
+
+class CatalogIndex:
+    """Per-option product bitsets for one catalog, built against one schema version."""
+
+    def __init__(self, products, schema):
+        self.schema_version = schema.version
+        self.skus = [product['sku'] for product in products]
+        self.all_products = (1 << len(self.skus)) - 1
+        self.fields = [schema.fields[key] for key in EXCLUSION_KEYS]
+        # option_bits[k][i]: products excluded by option i of EXCLUSION_KEYS[k]
+        self.option_bits = [[0] * len(field.option_ids) for field in self.fields]
+
+        lookup = {option_id: (k, i) for k, field in enumerate(self.fields) for i, option_id in enumerate(field.option_ids)}
+        unknown = set()
+        for position, product in enumerate(products):
+            for option_id in product.get('excludeFor', ()):
+                if option_id not in lookup:
+                    unknown.add(option_id)
+                    continue
+                k, i = lookup[option_id]
+                self.option_bits[k][i] |= 1 << position
+        if unknown:
+            raise ValueError(f"Catalog uses option ids that are not in surveySteps: {', '.join(sorted(unknown))}")
+        self._excluded_cache = {}
+
+    @classmethod
+    def from_json(cls, path, schema):
+        return cls(load_catalog(path)['products'], schema)
+
+    def _signature(self, answers):
+        """The answers that matter for exclusion, as a hashable tuple of interned values."""
+        return tuple(getattr(answers, field.key) for field in self.fields)
+
+    def excluded_mask(self, answers):
+        """Bitset of products ruled out by a decoded answers record."""
+        signature = self._signature(answers)
+        excluded = self._excluded_cache.get(signature)
+        if excluded is None:
+            excluded = 0
+            for field, bits, value in zip(self.fields, self.option_bits, signature):
+                if value is None:
+                    continue
+                if field.kind == 'single':
+                    excluded |= bits[value]
+                    continue
+                while value: # Walk the set bits of the multi-select mask
+                    low_bit = value & -value
+                    excluded |= bits[low_bit.bit_length() - 1]
+                    value ^= low_bit
+            self._excluded_cache[signature] = excluded
+        return excluded
+
+    def eligible_mask(self, answers):
+        return self.all_products & ~self.excluded_mask(answers)
+
+    def eligible_masks(self, answers_list):
+        """Bulk version for re-scoring: users sharing the same allergies/diet share one computation."""
+        return [self.all_products & ~self.excluded_mask(answers) for answers in answers_list]
+
+    def skus_for(self, mask):
+        skus = []
+        while mask:
+            low_bit = mask & -mask
+            skus.append(self.skus[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return skus
+
+    def eligible_skus(self, answers):
+        return self.skus_for(self.eligible_mask(answers))
+
+# --- Command Line ---
+
+def main():
+    """Prints the eligible SKUs for an answers body on stdin: `python catalog_index.py catalog.json < answers.json`."""
+    from answer_decoder import PayloadError, decode_answers, read_capped_body
+
+    if len(sys.argv) != 2:
+        print("Usage: python catalog_index.py <catalog.json> < answers.json", file=sys.stderr)
+        sys.exit(1)
+    schema = get_schema()
+    index = CatalogIndex.from_json(sys.argv[1], schema)
+    try:
+        answers = decode_answers(read_capped_body(sys.stdin.buffer, None), schema)
+    except PayloadError as e:
+        print(f"Rejected ({e.status}): {e}", file=sys.stderr)
+        sys.exit(1)
+    for sku in index.eligible_skus(answers):
+        print(sku)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Critical CSS for the first screen, inlined into the built `dist/index.html`
+(the `postbuild` script runs this stage; the source index.html is left as
+it is).
+
+`src/styles/App.css` is loaded from `main.jsx` with a dynamic import, so it
+no longer blocks the first paint. What that first paint needs (the page
+shell, `survey-header`, the `welcome-screen` and the renderer of the first
+question) is extracted here and inlined as a `<style data-critical-css>`
+block at the end of `<head>`.
+
+A selector is critical when every class it names is in the critical set:
+the shell, header and welcome classes below, plus the classes of the first
+question's step type (found in `surveySteps`). Element-only selectors
+(`body`, `:root`, `*`) are always critical. Inside `@media`/`@supports`
+the same test applies; `@font-face` is always kept, and `@keyframes` only
+when a critical rule names its animation.
+
+The result is cached under `build/critical-css/` by a hash of the
+stylesheet and the critical set, so a re-run with unchanged CSS only hashes
+it, and `index.html` is only rewritten when the inlined block changes.
+
+    python critical_css.py        # after `npm run build`
+    python critical_css.py dist   # explicit build directory
+"""
+
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+# --- Configuration ---
+STYLESHEET_PATH = Path("src") / "styles" / "App.css"
+INDEX_HTML_PATH = Path("dist") / "index.html" # The built page; the source index.html is never rewritten
+CACHE_DIR = Path("build") / "critical-css"
+CRITICAL_CSS_VERSION = 1 # Bump when the extraction rules change, to invalidate the cache
+
+SHELL_CLASSES = ('background-elements', 'bg-element', 'el-1', 'el-2', 'el-3', 'el-4', 'el-5', 'el-6', 'el-7', 'el-8',
+                 'survey-container', 'section-nav-container', 'section-nav-item', 'active', 'viewed', 'survey-header-spacer',
+                 'step-wrapper', 'progress-bar-container', 'progress-bar', 'progress-segment')
+HEADER_CLASSES = ('survey-header',)
+WELCOME_CLASSES = ('welcome-screen', 'welcome-content', 'welcome-text', 'welcome-logo', 'welcome-title', 'welcome-tagline',
+                   'welcome-description', 'welcome-button', 'welcome-image-container', 'welcome-hero-image')
+NAVIGATION_CLASSES = ('navigation-buttons', 'center', 'nav-button', 'next', 'prev')
+# Classes each step renderer (src/components/steps/) puts on the page, by step type
+STEP_TYPE_CLASSES = {
+    'text': ('sub-text', 'text-input-container', 'text-input') + NAVIGATION_CLASSES,
+    'email': ('sub-text', 'text-input-container', 'text-input', 'consent-label', 'submit') + NAVIGATION_CLASSES,
+    'icon-select': ('sub-text', 'options-icon-container', 'option-button', 'icon-select-option', 'large-icon', 'selected') + NAVIGATION_CLASSES,
+    'yes-no-circle': ('sub-text', 'options-icon-container', 'yes-no-option', 'selected') + NAVIGATION_CLASSES,
+    'single-button': ('sub-text', 'options-container', 'option-button', 'selected') + NAVIGATION_CLASSES,
+    'multi-grid': ('sub-text', 'options-grid-container', 'option-button', 'grid-item', 'icon', 'selected') + NAVIGATION_CLASSES,
+    'checkbox': ('sub-text', 'options-container', 'options-grid-container', 'option-button', 'grid-item',
+                 'checkbox-option-simplified', 'selected') + NAVIGATION_CLASSES,
+}
+DEFAULT_FIRST_STEP_TYPE = 'text'
+
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+CLASS_PATTERN = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+ANIMATION_PATTERN = re.compile(r'animation(?:-name)?\s*:([^;}]*)')
+SELECTOR_LIST_PATTERN = re.compile(r',(?![^(]*\))') # Commas outside :is(...)/:not(...)
+INLINE_BLOCK_PATTERN = re.compile(r'[ \t]*<style data-critical-css="[^"]*">.*?</style>\n?', re.DOTALL)
+
+# --- Parsing ---
+
+def _block_end(css, start):
+    """Index of the '}' closing the block that opens just before `start`, skipping strings and nested blocks."""
+    depth, i, quote = 1, start, None
+    while i < len(css):
+        char = css[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced braces in stylesheet")
+
+def parse_stylesheet(css):
+    """Top-level nodes: ('rule', selectors, body), ('group', prelude, children), ('at', prelude, body or None)."""
+    css = COMMENT_PATTERN.sub('', css)
+    nodes, i = [], 0
+    while True:
+        while i < len(css) and css[i].isspace():
+            i += 1
+        if i >= len(css):
+            return nodes
+        brace, semicolon = css.find('{', i), css.find(';', i)
+        if css[i] == '@' and semicolon != -1 and (brace == -1 or semicolon < brace): # @import, @charset
+            nodes.append(('at', css[i:semicolon].strip(), None))
+            i = semicolon + 1
+            continue
+        if brace == -1:
+            return nodes
+        prelude = css[i:brace].strip()
+        end = _block_end(css, brace + 1)
+        body = css[brace + 1:end]
+        if prelude.startswith(('@media', '@supports', '@layer')):
+            nodes.append(('group', prelude, parse_stylesheet(body)))
+        elif prelude.startswith('@'):
+            nodes.append(('at', prelude, body))
+        else:
+            nodes.append(('rule', prelude, body))
+        i = end + 1
+
+def _minify(text):
+    text = re.sub(r'\s+', ' ', text).strip()
+    return re.sub(r'\s*([{};,>])\s*', r'\1', text).replace(';}', '}').rstrip(';')
+
+def _minify_declarations(body):
+    return re.sub(r'\s*:\s*', ':', _minify(body))
+
+# --- Extraction ---
+
+def first_question_type(steps):
+    """Type of the first step that asks a question, if a renderer for it is known."""
+    for step in steps:
+        if step.get('question') and step.get('type') in STEP_TYPE_CLASSES:
+            return step['type']
+    return DEFAULT_FIRST_STEP_TYPE
+
+def critical_classes(step_type):
+    return frozenset(SHELL_CLASSES + HEADER_CLASSES + WELCOME_CLASSES + STEP_TYPE_CLASSES.get(step_type, ()))
+
+def _critical_nodes(nodes, classes, animations):
+    """Minified critical rules; animation names used by them are added to `animations`."""
+    out = []
+    for kind, prelude, body in nodes:
+        if kind == 'rule':
+            selectors = [selector.strip() for selector in SELECTOR_LIST_PATTERN.split(prelude)]
+            kept = [selector for selector in selectors if set(CLASS_PATTERN.findall(selector)) <= classes]
+            if kept:
+                out.append(f"{_minify(', '.join(kept))}{{{_minify_declarations(body)}}}")
+                for value in ANIMATION_PATTERN.findall(body):
+                    animations.update(re.findall(r'[a-zA-Z_][\w-]*', value))
+        elif kind == 'group':
+            inner = _critical_nodes(body, classes, animations)
+            if inner:
+                out.append(f"{_minify(prelude)}{{{''.join(inner)}}}")
+        elif prelude.startswith('@font-face') or prelude.startswith(('@import', '@charset')):
+            out.append(f"{_minify(prelude)}{{{_minify_declarations(body)}}}" if body is not None else f"{_minify(prelude)};")
+    return out
+
+def extract_critical_css(css, classes):
+    nodes = parse_stylesheet(css)
+    animations = set()
+    rules = _critical_nodes(nodes, classes, animations)
+    keyframes = [f"{_minify(prelude)}{{{_minify(body)}}}" for kind, prelude, body in nodes
+                 if kind == 'at' and re.match(r'@(-webkit-)?keyframes\s', prelude) and prelude.split()[1] in animations]
+    return ''.join(rules + keyframes)
+
+def critical_css(stylesheet_path=STYLESHEET_PATH, steps=(), cache_dir=CACHE_DIR):
+    """Returns (critical CSS, cache key, whether it came from the cache)."""
+    css = Path(stylesheet_path).read_text(encoding='utf-8')
+    classes = critical_classes(first_question_type(steps))
+    key = hashlib.sha256(f"{CRITICAL_CSS_VERSION}\n{','.join(sorted(classes))}\n{css}".encode('utf-8')).hexdigest()[:16]
+    cache_path = Path(cache_dir) / f"{key}.css"
+    if cache_path.exists():
+        return cache_path.read_text(encoding='utf-8'), key, True
+    result = extract_critical_css(css, classes)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    tmp_path.write_text(result, encoding='utf-8')
+    os.replace(tmp_path, cache_path)
+    return result, key, False
+
+# --- Inlining ---
+
+def inline_critical_css(css, key, index_path=INDEX_HTML_PATH):
+    """Puts the block at the end of <head>, replacing an earlier one; returns False if index.html already had it."""
+    index_path = Path(index_path)
+    if not index_path.exists():
+        raise RuntimeError(f"{index_path} not found; run `npm run build` first")
+    html = index_path.read_text(encoding='utf-8')
+    block = f'    <style data-critical-css="{key}">{css}</style>\n'
+    if block in html:
+        return False
+    html = INLINE_BLOCK_PATTERN.sub('', html)
+    if '</head>' not in html:
+        raise RuntimeError(f"{index_path} has no </head> to inline the critical CSS into")
+    html = html.replace('  </head>', block + '  </head>', 1) if '  </head>' in html else html.replace('</head>', block + '</head>', 1)
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.write_text(html, encoding='utf-8')
+    os.replace(tmp_path, index_path)
+    return True
+
+def build_critical_css(steps=(), stylesheet_path=STYLESHEET_PATH, index_path=INDEX_HTML_PATH, cache_dir=CACHE_DIR):
+    """The whole stage; returns (critical bytes, stylesheet bytes, cached, index.html rewritten)."""
+    css, key, cached = critical_css(stylesheet_path, steps, cache_dir)
+    rewritten = inline_critical_css(css, key, index_path)
+    return len(css.encode('utf-8')), Path(stylesheet_path).stat().st_size, cached, rewritten
+
+# --- Command Line ---
+
+def main():
+    from answer_decoder import get_schema
+
+    index_path = Path(sys.argv[1]) / "index.html" if len(sys.argv) > 1 else INDEX_HTML_PATH
+    try:
+        critical, total, cached, rewritten = build_critical_css(get_schema().steps, index_path=index_path)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Inlined {critical} of {total} bytes of CSS{' (cached)' if cached else ''}; "
+          f"{index_path} {'updated' if rewritten else 'unchanged'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Materialized crosstab cube over the answer store (answer_store.py).
+
+Every single, pair and triple of closed-option answer keys in surveySteps
+gets a dense count array (a "cuboid"), so a dashboard asking for e.g.
+healthGoals x dietDescription x sunExposure reads precomputed cells instead
+of scanning rows:
+
+    cube = CrossTabCube(get_schema())
+    store.observers.append(cube)      # live rows are counted as they arrive
+    cube.refresh(store)               # catches up with blocks loaded from disk
+    cube.slice(['healthGoals', 'dietDescription'], fixed={'sunExposure': 'sun_rarely'})
+
+Each dimension has one cell per option plus UNANSWERED (no option picked).
+A multi-select answer counts once under each option it holds, so margins of
+a multi-select dimension can add up to more than the row count.
+
+Counts are kept in two layers: `sealed` covers the first `blocks_applied`
+sealed blocks, `tail` the rows appended since. Appended rows are buffered
+and counted in one batch when the next slice is read, the same way whole
+blocks are: one bitmap per option, then AND + popcount per cell. When the
+store seals its tail, the tail layer is dropped and the sealed block is
+counted into `sealed` instead. Erased rows are subtracted from `sealed` as
+the store resolves its tombstones, and compaction leaves the counts alone,
+since it only drops rows that were already subtracted.
+
+Only the sealed layer is saved, together with the store generation and
+tombstone position it matches, so refresh() after a restart only has to
+catch up on what happened since.
+"""
+
+import json
+import os
+import struct
+from array import array
+from itertools import combinations
+from pathlib import Path
+
+from answer_store import build_block, email_prefix
+
+# --- Configuration ---
+MAX_ORDER = 3 # Singles, pairs and triples
+UNANSWERED = '(unanswered)'
+CUBE_FILE_MAGIC = b'PVCB'
+CUBE_FILE_VERSION = 2
+
+class Cuboid:
+    __slots__ = ('keys', 'dims', 'strides', 'sealed', 'tail')
+
+    def __init__(self, keys, dims):
+        self.keys = keys # Key indexes, ascending
+        self.dims = dims # Cells per dimension (options + 1)
+        self.strides = []
+        stride = 1
+        for size in reversed(dims):
+            self.strides.insert(0, stride)
+            stride *= size
+        self.sealed = array('Q', bytes(8 * stride))
+        self.tail = array('Q', bytes(8 * stride))
+
+class CrossTabCube:
+    """All cuboids up to MAX_ORDER keys; an AnswerStore observer."""
+
+    def __init__(self, schema, max_order=MAX_ORDER):
+        self.fields = [field for field in schema.fields.values() if field.kind in ('single', 'multi')]
+        self.key_index = {field.key: i for i, field in enumerate(self.fields)}
+        self.layout = [[field.key, list(field.option_ids)] for field in self.fields] # Saved with the cube to detect schema changes
+        self.max_order = max_order
+        self.cuboids = {}
+        for order in range(1, max_order + 1):
+            for keys in combinations(range(len(self.fields)), order):
+                self.cuboids[keys] = Cuboid(keys, [len(self.fields[k].option_ids) + 1 for k in keys])
+        self.blocks_applied = 0 # Leading store blocks counted into the sealed layer
+        self.tombstones_applied = 0 # Store tombstones already subtracted; only meaningful right after load()
+        self.pending = [] # Appended rows not yet counted into the tail layer
+
+    # --- Updates ---
+
+    def row_appended(self, answers):
+        self.pending.append((answers, 0, 0, 0))
+
+    def block_sealed(self, block):
+        """The store sealed its tail: count the block itself and forget the rows counted so far."""
+        self.pending = []
+        for cuboid in self.cuboids.values():
+            cuboid.tail = array('Q', bytes(8 * len(cuboid.tail)))
+        self.add_block(block)
+
+    def rows_deleted(self, block, rows):
+        self._count(block, rows, self._layer('sealed'), -1)
+
+    def tail_rewritten(self, tail):
+        """Rows were erased from the store's tail: recount it from scratch."""
+        for cuboid in self.cuboids.values():
+            cuboid.tail = array('Q', bytes(8 * len(cuboid.tail)))
+        self.pending = [(answers, 0, 0, 0) for answers, *_ in tail]
+
+    def blocks_compacted(self, store):
+        """Compaction rewrote blocks without changing what they count; every store block is already in the sealed layer."""
+        self.blocks_applied = len(store.blocks)
+
+    def _count_pending(self):
+        if self.pending:
+            block = build_block(self.pending, {field.key: field for field in self.fields})
+            self._count(block, block.live_rows, self._layer('tail'), 1)
+            self.pending = []
+
+    def _layer(self, name):
+        return [getattr(cuboid, name) for cuboid in self.cuboids.values()]
+
+    def _code_bitmaps(self, block, rows):
+        """Per key: [unanswered rows, rows with option 0, rows with option 1, ...] as bitmaps, limited to `rows`."""
+        per_key = []
+        for field in self.fields:
+            columns = block.columns[field.key]
+            answered = 0
+            option_bitmaps = []
+            for option_id in field.option_ids:
+                bitmap = columns.get(option_id, 0) & rows
+                answered |= bitmap
+                option_bitmaps.append(bitmap)
+            per_key.append([rows & ~answered] + option_bitmaps)
+        return per_key
+
+    def add_block(self, block):
+        """Counts a sealed block's live rows into the sealed layer."""
+        self._count(block, block.live_rows, self._layer('sealed'), 1)
+        self.blocks_applied += 1
+
+    def _count(self, block, rows, layer, sign):
+        """Adds (sign 1) or subtracts (sign -1) the given rows of a block, with bitmap ANDs and popcounts."""
+        bitmaps = self._code_bitmaps(block, rows)
+        pairs = {} # (a, b) -> {(i, j): rows}, reused for the triples that start with a, b
+        for (keys, cuboid), cells in zip(self.cuboids.items(), layer):
+            strides = cuboid.strides
+            if len(keys) == 1:
+                for i, code_rows in enumerate(bitmaps[keys[0]]):
+                    cells[i] += sign * code_rows.bit_count()
+                continue
+            prefix = pairs.get(keys[:2])
+            if prefix is None:
+                a, b = keys[:2]
+                prefix = pairs[keys[:2]] = {}
+                for i, rows_a in enumerate(bitmaps[a]):
+                    if rows_a:
+                        for j, rows_b in enumerate(bitmaps[b]):
+                            rows_ab = rows_a & rows_b
+                            if rows_ab:
+                                prefix[i, j] = rows_ab
+            if len(keys) == 2:
+                for (i, j), rows_ab in prefix.items():
+                    cells[i * strides[0] + j] += sign * rows_ab.bit_count()
+                continue
+            last = bitmaps[keys[2]]
+            for (i, j), rows_ab in prefix.items():
+                base = i * strides[0] + j * strides[1]
+                for k, rows_c in enumerate(last):
+                    count = (rows_ab & rows_c).bit_count()
+                    if count:
+                        cells[base + k] += sign * count
+
+    def refresh(self, store):
+        """Catches a freshly loaded cube up with the store; returns the number of blocks counted.
+
+        Subtracts rows erased by tombstones the saved cube hadn't seen (in the
+        blocks it had counted), then counts the blocks it hadn't counted.
+        """
+        entries = store.tombstones.entries
+        if self.tombstones_applied < store.tombstones_applied:
+            seen = {email_prefix(email_hash) for email_hash in entries[store.compacted_tombstones:self.tombstones_applied]}
+            unseen = {email_prefix(email_hash) for email_hash in entries[self.tombstones_applied:store.tombstones_applied]} - seen
+            sealed = self._layer('sealed')
+            for block in store.blocks[:self.blocks_applied]:
+                rows = block.rows_for_emails(unseen)
+                if rows:
+                    self._count(block, rows, sealed, -1)
+        self.tombstones_applied = store.tombstones_applied
+        new_blocks = store.blocks[self.blocks_applied:]
+        for block in new_blocks:
+            self.add_block(block)
+        return len(new_blocks)
+
+    # --- Queries ---
+
+    def slice(self, keys, fixed=None):
+        """Counts for 1-3 keys as nested dicts keyed by option id (or UNANSWERED), in the order given.
+
+        `fixed` pins further keys to one option each, e.g. a 2-D slice of a
+        triple; len(keys) + len(fixed) may not exceed MAX_ORDER.
+        """
+        fixed = fixed or {}
+        names = list(keys) + list(fixed)
+        if not keys or len(set(names)) != len(names) or len(names) > self.max_order:
+            raise ValueError(f"Slice needs 1 to {self.max_order} distinct keys in total")
+        unknown = [name for name in names if name not in self.key_index]
+        if unknown:
+            raise ValueError(f"Unknown or non-closed answer key(s): {', '.join(unknown)}")
+        pins = {}
+        for name, option_id in fixed.items():
+            labels = self._labels(self.key_index[name])
+            if option_id not in labels:
+                raise ValueError(f"Unknown option for {name}: {option_id}")
+            pins[self.key_index[name]] = labels.index(option_id)
+
+        indexes = [self.key_index[name] for name in names]
+        cuboid = self.cuboids[tuple(sorted(indexes))]
+        position = {k: d for d, k in enumerate(cuboid.keys)}
+        free = [self.key_index[name] for name in keys]
+
+        def cell(codes):
+            flat = 0
+            for k, code in list(zip(free, codes)) + list(pins.items()):
+                flat += code * cuboid.strides[position[k]]
+            return cuboid.sealed[flat] + cuboid.tail[flat]
+
+        def nest(depth, codes):
+            labels = self._labels(free[depth])
+            if depth == len(free) - 1:
+                return {label: cell(codes + (code,)) for code, label in enumerate(labels)}
+            return {label: nest(depth + 1, codes + (code,)) for code, label in enumerate(labels)}
+
+        self._count_pending()
+        return nest(0, ())
+
+    def _labels(self, k):
+        return [UNANSWERED] + list(self.fields[k].option_ids)
+
+    # --- Persistence ---
+
+    def snapshot(self, store):
+        """The sealed layer as bytes, ready to be written off the event loop. The cube must be in sync with `store`."""
+        header = json.dumps({'version': CUBE_FILE_VERSION, 'maxOrder': self.max_order, 'layout': self.layout,
+                             'blocksApplied': self.blocks_applied, 'generation': store.generation,
+                             'tombstones': store.tombstones_applied}, separators=(',', ':')).encode('utf-8')
+        return b''.join([CUBE_FILE_MAGIC, struct.pack('<I', len(header)), header] + [cuboid.sealed.tobytes() for cuboid in self.cuboids.values()])
+
+    def load(self, path, store):
+        """Restores the sealed layer; returns False (leaving the cube empty) if the file is missing, was built
+        for another schema, or doesn't match the store's blocks (e.g. saved before a compaction finished)."""
+        path = Path(path)
+        if not path.exists():
+            return False
+        data = path.read_bytes()
+        if data[:4] != CUBE_FILE_MAGIC:
+            return False
+        (header_length,) = struct.unpack_from('<I', data, 4)
+        header = json.loads(data[8:8 + header_length])
+        if header['version'] != CUBE_FILE_VERSION or header['maxOrder'] != self.max_order or header['layout'] != self.layout:
+            return False
+        if header['generation'] != store.generation or header['blocksApplied'] > len(store.blocks) \
+                or not store.compacted_tombstones <= header['tombstones'] <= store.tombstones_applied:
+            return False
+        offset = 8 + header_length
+        for cuboid in self.cuboids.values():
+            size = 8 * len(cuboid.sealed)
+            cuboid.sealed = array('Q')
+            cuboid.sealed.frombytes(data[offset:offset + size])
+            offset += size
+        self.blocks_applied = header['blocksApplied']
+        self.tombstones_applied = header['tombstones']
+        return True
+
+def write_cube_file(payload, path):
+    """Writes snapshot() output atomically; runs in a worker thread."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
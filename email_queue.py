@@ -0,0 +1,626 @@
+"""
+Background delivery of the results email promised on the `email` step.
+
+The results request only enqueues: `enqueue_results_email()` inserts one row
+into a SQLite queue (`data/email_queue.sqlite3`, WAL mode) and returns. A
+separate worker drains it:
+
+    python email_queue.py work --catalog catalog.json [--weights weights.json] [--smtp-host 127.0.0.1] [--smtp-port 8025] [--once]
+    python email_queue.py stand-in [--port 8025] [--fail-every N]
+    python email_queue.py stats
+    python email_queue.py retry-failed
+    python email_queue.py erase (--email EMAIL | --email-hash SHA256)
+    python email_queue.py purge [--days 30]
+
+Each pass claims up to BATCH_SIZE due jobs under a lease: claiming pushes a
+job's due time LEASE_SECONDS ahead, so the jobs of a worker that dies
+mid-batch come due again by themselves. Claimed jobs are rendered, then sent
+over a small pool of persistent SMTP connections (no connect and EHLO per
+message), paced by a token bucket that keeps the pool under the relay's rate
+limit.
+
+Rendering is mostly reuse. A product card depends only on (sku, reason
+sentence), and the goal summary only on the goal set. Users with the same
+bundle get the same reason sentences (explanations.py computes them once per
+answer pattern), so cards and whole email bodies come from LRU caches. Only
+the greeting and headers are per user. The worker reads product names
+through live_catalog.LiveCatalog, so an edited catalog reaches the next
+batch (with fresh caches) without a restart.
+
+Temporary failures are retried with exponential backoff up to MAX_ATTEMPTS:
+connection errors, 4xx replies, and a refused sender (a relay setting, not
+the recipient's fault). Permanent failures are 5xx replies and refused
+recipients; they fail at once. Sent jobs are deleted, so the queue holds an
+address only until its email goes out. Failed jobs stay for `stats` and
+`retry-failed` for FAILED_RETENTION_DAYS, then the worker deletes them.
+Message-IDs derive from the job id, so a retried send after an ambiguous
+failure carries the same id.
+
+Each job also stores its recipient's hash (answer_store.hash_email), so a
+privacy erasure can find it: `erase` (and survey_server.py's
+/answers/erase, through erase_queued_emails()) deletes the address's
+pending and failed jobs. An email a worker has already claimed may still go
+out.
+
+`stand-in` is a local SMTP server that accepts everything and saves it to
+`data/outbox/`; tests can run it in-process with `SmtpStandIn().start_thread()`.
+
+Usage from the results handler (after the bundle and explanations exist):
+
+    email_queue = EmailQueue()
+    enqueue_results_email(email_queue, answers, bundle, explainer.explain(answers, bundle.skus))
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import smtplib
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+from functools import lru_cache
+from pathlib import Path
+
+from answer_store import EMAIL_HASH_PATTERN, hash_email
+from live_catalog import LiveCatalog
+
+# --- Configuration ---
+QUEUE_PATH = Path("data") / "email_queue.sqlite3"
+OUTBOX_DIR = Path("data") / "outbox" # Where the SMTP stand-in saves what it receives
+DEFAULT_SMTP_HOST = "127.0.0.1"
+DEFAULT_SMTP_PORT = 8025 # The stand-in's port; point --smtp-port at the real relay in production
+SENDER = "PROVIT <recommendations@provit.example>"
+MESSAGE_ID_DOMAIN = "provit.example"
+SUBJECT = "Your PROVIT recommendations"
+BATCH_SIZE = 100 # Jobs claimed per pass
+LEASE_SECONDS = 300.0 # A claimed job comes due again if its worker hasn't finished it by then
+POLL_INTERVAL = 2.0 # Seconds between passes while nothing is due
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30.0 # Doubles per attempt: 30s, 1m, 2m, 4m, 8m
+RETRY_MAX_SECONDS = 3600.0
+FAILED_RETENTION_DAYS = 30 # Failed jobs (with their address) are deleted this long after failing
+PURGE_INTERVAL = 3600.0 # Seconds between the worker's retention purges
+POOL_SIZE = 4 # Concurrent SMTP connections
+CONNECTION_MAX_MESSAGES = 100 # Reconnect after this many messages (relays cap messages per session)
+IDLE_CHECK_SECONDS = 30.0 # Connections idle longer than this get a NOOP before reuse
+SMTP_TIMEOUT = 30.0
+SEND_RATE = 10.0 # Messages per second, across the pool
+SEND_BURST = 20
+FRAGMENT_CACHE_SIZE = 4096
+MAX_MESSAGE_BYTES = 1024 * 1024 # Stand-in only
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    recipient TEXT NOT NULL,
+    recipient_hash TEXT NOT NULL DEFAULT '', -- hash_email(recipient): what an erasure matches
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending', -- 'pending' or 'failed'; sent jobs are deleted
+    attempts INTEGER NOT NULL DEFAULT 0,
+    due_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    failed_at REAL, -- Set while failed; starts the retention period
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, due_at);
+"""
+INDEX_SQL = "CREATE INDEX IF NOT EXISTS jobs_recipient ON jobs (recipient_hash)" # After _add_columns(): older files lack the column
+
+# --- Queue ---
+
+class Job:
+    __slots__ = ('id', 'recipient', 'payload', 'attempts')
+
+    def __init__(self, id, recipient, payload, attempts):
+        self.id = id
+        self.recipient = recipient
+        self.payload = payload
+        self.attempts = attempts
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+class EmailQueue:
+    """Durable job queue in one SQLite file. An instance holds one connection: use it from one thread."""
+
+    def __init__(self, path=QUEUE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, isolation_level=None) # Autocommit; multi-statement changes use transaction()
+        self.db.execute("PRAGMA journal_mode=WAL") # Enqueues don't wait for the worker, nor it for them
+        self.db.execute("PRAGMA synchronous=NORMAL") # Safe against process crashes; skips an fsync per enqueue
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.executescript(SCHEMA_SQL)
+        self._add_columns()
+        self.db.execute(INDEX_SQL)
+
+    def _add_columns(self):
+        """Brings a queue file from before recipient_hash and failed_at up to date."""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        if {'recipient_hash', 'failed_at'} <= columns:
+            return
+        with self.transaction():
+            if 'failed_at' not in columns:
+                self.db.execute("ALTER TABLE jobs ADD COLUMN failed_at REAL")
+                self.db.execute("UPDATE jobs SET failed_at = ? WHERE status = 'failed'", (time.time(),)) # Their retention starts now
+            if 'recipient_hash' not in columns:
+                self.db.execute("ALTER TABLE jobs ADD COLUMN recipient_hash TEXT NOT NULL DEFAULT ''")
+                self.db.executemany("UPDATE jobs SET recipient_hash = ? WHERE id = ?",
+                                    [(hash_email(recipient), job_id) for job_id, recipient in self.db.execute("SELECT id, recipient FROM jobs").fetchall()])
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE") # Takes the write lock up front: two workers never claim the same job
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def enqueue(self, recipient, payload):
+        """Adds one job, due now; returns its id. One INSERT: cheap enough for the request path."""
+        now = time.time()
+        cursor = self.db.execute("INSERT INTO jobs (recipient, recipient_hash, payload, due_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                                 (recipient, hash_email(recipient), json.dumps(payload, separators=(',', ':')), now, now))
+        return cursor.lastrowid
+
+    def claim(self, limit=BATCH_SIZE, now=None):
+        """Leases up to `limit` due jobs, oldest due first."""
+        now = time.time() if now is None else now
+        with self.transaction():
+            rows = self.db.execute("SELECT id, recipient, payload, attempts FROM jobs WHERE status = 'pending' AND due_at <= ? "
+                                   "ORDER BY due_at LIMIT ?", (now, limit)).fetchall()
+            self.db.executemany("UPDATE jobs SET due_at = ? WHERE id = ?", [(now + LEASE_SECONDS, row[0]) for row in rows])
+        return [Job(job_id, recipient, json.loads(payload), attempts) for job_id, recipient, payload, attempts in rows]
+
+    def finish(self, sent_ids, failures, now=None):
+        """Deletes sent jobs; reschedules or fails the others. `failures`: (job, error message, permanent)."""
+        now = time.time() if now is None else now
+        with self.transaction():
+            self.db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in sent_ids])
+            for job, error, permanent in failures:
+                attempts = job.attempts + 1
+                if permanent or attempts >= MAX_ATTEMPTS:
+                    self.db.execute("UPDATE jobs SET status = 'failed', attempts = ?, failed_at = ?, last_error = ? WHERE id = ?",
+                                    (attempts, now, error, job.id))
+                else:
+                    self.db.execute("UPDATE jobs SET attempts = ?, due_at = ?, last_error = ? WHERE id = ?",
+                                    (attempts, now + retry_delay(attempts), error, job.id))
+
+    def retry_failed(self):
+        """Puts failed jobs back in the queue with fresh attempts; returns how many."""
+        return self.db.execute("UPDATE jobs SET status = 'pending', attempts = 0, due_at = ?, failed_at = NULL WHERE status = 'failed'",
+                               (time.time(),)).rowcount
+
+    def erase(self, email_hash):
+        """Deletes every pending or failed job for this address (hash_email() of it); returns how many."""
+        if type(email_hash) is not str or not EMAIL_HASH_PATTERN.fullmatch(email_hash):
+            raise ValueError("Expected a lower-case hex SHA-256")
+        return self.db.execute("DELETE FROM jobs WHERE recipient_hash = ?", (email_hash,)).rowcount
+
+    def purge_expired(self, retention_days=FAILED_RETENTION_DAYS, now=None):
+        """Deletes jobs that failed more than `retention_days` ago; returns how many."""
+        now = time.time() if now is None else now
+        return self.db.execute("DELETE FROM jobs WHERE status = 'failed' AND failed_at <= ?", (now - retention_days * 86400,)).rowcount
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        counts = {'pending': 0, 'due': 0, 'failed': 0}
+        for status, due, count in self.db.execute("SELECT status, due_at <= ?, COUNT(*) FROM jobs GROUP BY 1, 2", (now,)):
+            counts[status] += count
+            if status == 'pending' and due:
+                counts['due'] += count
+        return counts
+
+    def close(self):
+        self.db.close()
+
+def enqueue_results_email(queue, answers, bundle, reasons):
+    """Queues the results email for one decoded submission; returns the job id, or None without an address or consent.
+
+    The payload is what the results page already computed (goal ids, SKUs and
+    reason sentences), so the worker renders without re-solving anything.
+    """
+    if not answers.email or not answers.hasConsented:
+        return None
+    payload = {'name': (answers.userName or '').strip(), 'goals': list(bundle.goals),
+               'products': [[sku, reasons.get(sku, '')] for sku in bundle.skus]}
+    return queue.enqueue(answers.email, payload)
+
+def erase_queued_emails(email_hash, path=QUEUE_PATH):
+    """Erasure from outside the worker: deletes the address's jobs from the queue file, if there is one; returns how many.
+
+    Opens its own connection, so it can run on any thread.
+    """
+    if not Path(path).is_file():
+        return 0
+    queue = EmailQueue(path)
+    try:
+        return queue.erase(email_hash)
+    finally:
+        queue.close()
+
+# --- Rendering ---
+
+class ResultEmailRenderer:
+    """Builds result emails from cached fragments; everything but the greeting and headers is shared."""
+
+    def __init__(self, catalog, schema, cache_size=FRAGMENT_CACHE_SIZE):
+        self.product_names = {product['sku']: product.get('name', product['sku']) for product in catalog['products']}
+        goal_step = next(step for step in schema.steps if step.get('inputKey') == 'healthGoals')
+        self.goal_text = {option['id']: option['text'] for option in goal_step.get('options', [])}
+        # Per-instance caches: they hold this catalog's names
+        self.product_card = lru_cache(maxsize=cache_size)(self._product_card)
+        self.goal_summary = lru_cache(maxsize=cache_size)(self._goal_summary)
+        self.body = lru_cache(maxsize=cache_size)(self._body)
+
+    def _product_card(self, sku, reason):
+        """(text, html) for one recommended product."""
+        name = self.product_names.get(sku, sku)
+        text = f"- {name}" + (f"\n  {reason}." if reason else "")
+        reason_html = f'<br><span style="color:#555555">{html.escape(reason)}.</span>' if reason else ''
+        return text, f'<tr><td style="padding:12px 0;border-bottom:1px solid #e0e0e0"><strong>{html.escape(name)}</strong>{reason_html}</td></tr>'
+
+    def _goal_summary(self, goals):
+        names = [self.goal_text.get(goal, goal) for goal in goals]
+        if not names:
+            return "", ""
+        text = f"Your bundle covers: {', '.join(names)}."
+        return text, f"<p>{html.escape(text)}</p>"
+
+    def _body(self, goals, products):
+        """(text, html) below the greeting, for one bundle; `products` is a tuple of (sku, reason)."""
+        summary_text, summary_html = self.goal_summary(goals)
+        cards = [self.product_card(sku, reason) for sku, reason in products]
+        text = "\n\n".join(part for part in ("Here are the supplements we recommend for you.", summary_text,
+                                              "\n".join(card[0] for card in cards)) if part)
+        rows = "".join(card[1] for card in cards)
+        return text, f'<p>Here are the supplements we recommend for you.</p>{summary_html}<table role="presentation" width="100%">{rows}</table>'
+
+    def render(self, job):
+        payload = job.payload
+        body_text, body_html = self.body(tuple(payload['goals']), tuple((sku, reason) for sku, reason in payload['products']))
+        greeting = f"Hi {payload['name']}," if payload.get('name') else "Hi,"
+        message = EmailMessage()
+        message['From'] = SENDER
+        message['To'] = job.recipient
+        message['Subject'] = SUBJECT
+        message['Message-ID'] = f"<results-{job.id}@{MESSAGE_ID_DOMAIN}>"
+        message.set_content(f"{greeting}\n\n{body_text}\n")
+        message.add_alternative(f'<!doctype html><html><body style="font-family:sans-serif;color:#333333">'
+                                f'<p>{html.escape(greeting)}</p>{body_html}</body></html>', subtype='html')
+        return message
+
+# --- Sending ---
+
+class TokenBucket:
+    """Thread-safe rate limiter: `rate` tokens a second, up to `burst` saved up."""
+
+    def __init__(self, rate=SEND_RATE, burst=SEND_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Blocks until a token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class PooledConnection:
+    __slots__ = ('smtp', 'sent', 'last_used')
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+class SmtpPool:
+    """Up to `size` persistent SMTP connections, shared by the sending threads and kept across batches."""
+
+    def __init__(self, host=DEFAULT_SMTP_HOST, port=DEFAULT_SMTP_PORT, size=POOL_SIZE, starttls=False):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.starttls = starttls
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if self.starttls:
+            smtp.starttls()
+        return PooledConnection(smtp)
+
+    def _take(self):
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+        if conn is not None and time.monotonic() - conn.last_used > IDLE_CHECK_SECONDS:
+            try:
+                if conn.smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected()
+            except (smtplib.SMTPException, OSError): # The relay dropped it while idle
+                self._close(conn)
+                conn = None
+        return conn or self._connect()
+
+    def _give_back(self, conn):
+        conn.last_used = time.monotonic()
+        if conn.sent >= CONNECTION_MAX_MESSAGES:
+            self._close(conn)
+        else:
+            with self.lock:
+                self.idle.append(conn)
+
+    def _close(self, conn):
+        try:
+            conn.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.smtp.close()
+
+    def send(self, message):
+        with self.slots:
+            conn = self._take()
+            try:
+                conn.smtp.send_message(message)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                self._give_back(conn) # smtplib has reset the transaction: the session is still usable
+                raise
+            except BaseException:
+                self._close(conn)
+                raise
+            conn.sent += 1
+            self._give_back(conn)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            self._close(conn)
+
+def is_permanent(error):
+    """Whether a send error should fail the job instead of retrying it."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPSenderRefused): # Our sender, not this recipient: retry once the relay accepts it
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+def deliver_batch(queue, renderer, pool, bucket, executor, limit=BATCH_SIZE):
+    """One pass: claims due jobs, renders them, sends them across the pool; returns (sent, failed) counts."""
+    jobs = queue.claim(limit)
+    if not jobs:
+        return 0, 0
+
+    def send(message):
+        bucket.take()
+        pool.send(message)
+
+    failures = []
+    in_flight = {}
+    for job in jobs:
+        try:
+            message = renderer.render(job)
+        except (KeyError, TypeError, ValueError) as e: # Malformed payload: retrying won't help
+            failures.append((job, f"Render: {e!r}", True))
+            continue
+        in_flight[executor.submit(send, message)] = job
+    sent_ids = []
+    for future, job in in_flight.items():
+        error = future.exception()
+        if error is None:
+            sent_ids.append(job.id)
+        else:
+            failures.append((job, f"{type(error).__name__}: {error}"[:500], is_permanent(error)))
+    queue.finish(sent_ids, failures)
+    return len(sent_ids), len(failures)
+
+def run_worker(queue, live, pool, rate=SEND_RATE, once=False):
+    """Delivers due jobs until interrupted; with `once`, until nothing is due. `live` is a LiveCatalog."""
+    bucket = TokenBucket(rate, max(1, min(SEND_BURST, rate * 2)))
+    version = renderer = None
+    next_purge = 0.0
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        try:
+            while True:
+                if time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + PURGE_INTERVAL
+                    purged = queue.purge_expired()
+                    if purged:
+                        print(f"Deleted {purged} job(s) failed over {FAILED_RETENTION_DAYS} days ago")
+                if live.current is not version: # A reloaded catalog: new product names, fresh fragment caches
+                    version = live.current
+                    renderer = ResultEmailRenderer(version.catalog, version.schema)
+                sent, failed = deliver_batch(queue, renderer, pool, bucket, executor)
+                if sent or failed:
+                    print(f"Sent {sent}, failed {failed} ({queue.stats()['pending']} pending)")
+                elif once:
+                    break
+                else:
+                    time.sleep(POLL_INTERVAL)
+        finally:
+            pool.close()
+
+# --- SMTP Stand-In ---
+
+class SmtpStandIn:
+    """Local SMTP server for development and tests: accepts every message and keeps it.
+
+    Messages are appended to `messages` as (sender, recipients, raw bytes) and,
+    with an `outbox_dir`, saved there as .eml files. `fail_every=n` answers
+    every nth message with a temporary 451, to exercise the retry path.
+    """
+
+    def __init__(self, outbox_dir=None, fail_every=0):
+        self.outbox_dir = Path(outbox_dir) if outbox_dir else None
+        self.fail_every = fail_every
+        self.messages = []
+        self.received = 0
+        self.loop = None
+        self.server = None
+
+    def store(self, sender, recipients, data):
+        self.received += 1
+        if self.fail_every and self.received % self.fail_every == 0:
+            return "451 Try again later"
+        self.messages.append((sender, recipients, data))
+        if self.outbox_dir:
+            self.outbox_dir.mkdir(parents=True, exist_ok=True)
+            (self.outbox_dir / f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{self.received}.eml").write_bytes(data)
+        return "250 OK"
+
+    async def handle(self, reader, writer):
+        def reply(*lines):
+            writer.write(''.join(f"{line}\r\n" for line in lines).encode('ascii'))
+        reply("220 localhost SMTP stand-in")
+        sender, recipients = None, []
+        try:
+            while True:
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode('utf-8', 'replace').rstrip('\r\n')
+                verb, _, argument = command.partition(' ')
+                verb = verb.upper()
+                if verb == 'EHLO':
+                    reply("250-localhost", "250-8BITMIME", "250-SMTPUTF8", f"250 SIZE {MAX_MESSAGE_BYTES}")
+                elif verb == 'HELO':
+                    reply("250 localhost")
+                elif verb == 'MAIL':
+                    sender, recipients = argument.partition('<')[2].partition('>')[0], []
+                    reply("250 OK")
+                elif verb == 'RCPT':
+                    if sender is None:
+                        reply("503 MAIL first")
+                    else:
+                        recipients.append(argument.partition('<')[2].partition('>')[0])
+                        reply("250 OK")
+                elif verb == 'DATA':
+                    if not recipients:
+                        reply("503 RCPT first")
+                        continue
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines, size = [], 0
+                    while (line := await reader.readline()) not in (b'.\r\n', b'.\n', b''):
+                        size += len(line)
+                        lines.append(line[1:] if line.startswith(b'..') else line) # Dot-unstuffing
+                    reply("552 Message too large" if size > MAX_MESSAGE_BYTES else self.store(sender, recipients, b''.join(lines)))
+                    sender, recipients = None, []
+                elif verb == 'RSET':
+                    sender, recipients = None, []
+                    reply("250 OK")
+                elif verb == 'NOOP':
+                    reply("250 OK")
+                elif verb == 'QUIT':
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_SMTP_HOST, port=DEFAULT_SMTP_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"SMTP stand-in listening on {host}:{port}" + (f", saving to {self.outbox_dir}" if self.outbox_dir else ""))
+        async with server:
+            await server.serve_forever()
+
+    def start_thread(self, host=DEFAULT_SMTP_HOST, port=0):
+        """Runs the server on a daemon thread (for tests); returns the port it listens on."""
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, host, port))
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+# --- Main Script Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description="PROVIT results email queue")
+    commands = parser.add_subparsers(dest='command', required=True)
+    work = commands.add_parser('work', help="deliver queued emails")
+    work.add_argument('--catalog', required=True, help="catalog JSON (see catalog_index.py)")
+    work.add_argument('--weights', help="weights JSON overriding the catalog's (see live_catalog.py)")
+    work.add_argument('--smtp-host', default=DEFAULT_SMTP_HOST)
+    work.add_argument('--smtp-port', type=int, default=DEFAULT_SMTP_PORT)
+    work.add_argument('--starttls', action='store_true')
+    work.add_argument('--pool-size', type=int, default=POOL_SIZE)
+    work.add_argument('--rate', type=float, default=SEND_RATE, help="messages per second")
+    work.add_argument('--once', action='store_true', help="exit when nothing is due")
+    stand_in = commands.add_parser('stand-in', help="local SMTP server that keeps what it receives")
+    stand_in.add_argument('--host', default=DEFAULT_SMTP_HOST)
+    stand_in.add_argument('--port', type=int, default=DEFAULT_SMTP_PORT)
+    stand_in.add_argument('--outbox', default=str(OUTBOX_DIR))
+    stand_in.add_argument('--fail-every', type=int, default=0, help="answer every nth message with 451")
+    commands.add_parser('stats', help="queue counts")
+    commands.add_parser('retry-failed', help="requeue failed jobs")
+    erase = commands.add_parser('erase', help="delete an address's jobs (privacy erasure)")
+    erase_target = erase.add_mutually_exclusive_group(required=True)
+    erase_target.add_argument('--email')
+    erase_target.add_argument('--email-hash', help="hex SHA-256 of the trimmed, lower-cased address")
+    purge = commands.add_parser('purge', help="delete jobs that failed long ago")
+    purge.add_argument('--days', type=float, default=FAILED_RETENTION_DAYS)
+    for command in commands.choices.values():
+        if command is not stand_in:
+            command.add_argument('--queue', default=str(QUEUE_PATH))
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'stand-in':
+            asyncio.run(SmtpStandIn(args.outbox, args.fail_every).serve(args.host, args.port))
+            return
+        queue = EmailQueue(args.queue)
+        if args.command == 'stats':
+            print(json.dumps(queue.stats()))
+        elif args.command == 'retry-failed':
+            print(f"Requeued {queue.retry_failed()} failed job(s)")
+        elif args.command == 'erase':
+            print(f"Deleted {queue.erase(hash_email(args.email) if args.email else args.email_hash)} job(s)")
+        elif args.command == 'purge':
+            print(f"Deleted {queue.purge_expired(args.days)} expired job(s)")
+        else:
+            live = LiveCatalog(args.catalog, args.weights)
+            if not args.once:
+                live.start()
+            pool = SmtpPool(args.smtp_host, args.smtp_port, args.pool_size, args.starttls)
+            run_worker(queue, live, pool, args.rate, args.once)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+"Why was this recommended?" explanations for bundle products.
+
+They reuse the bundle optimizer's scoring: a product scores through the goals
+it covers, and each goal's weight comes from answers (the goal being picked
+in `healthGoals`, or a catalog `answerWeights` boost such as `sun_rarely`).
+So an answer's contribution to a product is the weight it adds across that
+product's goals. The top contributing answers are mapped back to the
+question and option text in surveySteps:
+
+    'Because you chose Sleep and Energy and you answered "Yes" to "Do you often wake up feeling sluggish?"'
+
+Users who share the same active answers share one computation, which is what
+keeps batch re-scoring from doing per-user work.
+"""
+
+import heapq
+
+# --- Configuration ---
+MAX_REASONS = 3 # Answers quoted per product
+
+class Explainer:
+    """Contribution table (product x answer feature) for one BundleOptimizer."""
+
+    def __init__(self, optimizer, schema):
+        self.optimizer = optimizer
+        self.fields = schema.fields
+        self.question_text = {}
+        self.option_text = {}
+        for step in schema.steps:
+            if step.get('inputKey'):
+                self.question_text[step['inputKey']] = step.get('question', '')
+                self.option_text[step['inputKey']] = {option['id']: option['text'] for option in step.get('options', [])}
+
+        # Features: one per goal option (chosen in healthGoals), then one per catalog boost
+        goal_field = optimizer.goal_field
+        self.features = [('healthGoals', goal, {goal: 1.0}) for goal in range(len(goal_field.option_ids))]
+        boosts = {}
+        for key, option, goal, weight in optimizer.boosts:
+            boosts.setdefault((key, option), {})[goal] = weight
+        self.features += [(key, option, goal_weights) for (key, option), goal_weights in boosts.items()]
+
+        # contributions[p]: {feature index: weight it adds to product p}, non-zero entries only
+        self.contributions = []
+        for goal_mask in optimizer.goal_masks:
+            row = {}
+            for f, (_, _, goal_weights) in enumerate(self.features):
+                weight = sum(w for goal, w in goal_weights.items() if goal_mask >> goal & 1)
+                if weight:
+                    row[f] = weight
+            self.contributions.append(row)
+        self.positions = {sku: p for p, sku in enumerate(optimizer.index.skus)}
+        self._cache = {}
+
+    def active_features(self, answers):
+        """Bitmask of the features this user's answers switch on."""
+        selected_goals = answers.healthGoals or 0
+        active = 0
+        for f, (key, option, _) in enumerate(self.features):
+            if key == 'healthGoals':
+                if selected_goals >> option & 1:
+                    active |= 1 << f
+            elif getattr(answers, key) == option:
+                active |= 1 << f
+        return active
+
+    def top_features(self, product, active, limit=MAX_REASONS):
+        """Indexes of the `limit` largest contributions among the active features (partial selection, no full sort)."""
+        row = self.contributions[product]
+        return heapq.nlargest(limit, (f for f in row if active >> f & 1), key=row.__getitem__)
+
+    def describe(self, feature_indexes):
+        goal_field = self.optimizer.goal_field
+        goals, other = [], []
+        for f in feature_indexes:
+            key, option, _ = self.features[f]
+            if key == 'healthGoals':
+                goals.append(self.option_text['healthGoals'].get(goal_field.option_ids[option], ''))
+            else:
+                option_id = self.fields[key].option_ids[option]
+                other.append(f'you answered "{self.option_text[key].get(option_id, option_id)}" to "{self.question_text[key]}"')
+        parts = []
+        if goals:
+            parts.append("you chose " + _join(goals))
+        parts.extend(other)
+        return f"Because {_join(parts)}" if parts else ""
+
+    def explain(self, answers, skus):
+        """Explanations for one user's recommended SKUs, as {sku: sentence}."""
+        return self.explain_batch([answers], [skus])[0]
+
+    def explain_batch(self, answers_list, skus_list):
+        """Explanations for many users at once; identical (active answers, product) pairs are computed once."""
+        positions = self.positions
+        results = []
+        for answers, skus in zip(answers_list, skus_list):
+            active = self.active_features(answers)
+            explained = {}
+            for sku in skus:
+                cache_key = (active, positions[sku])
+                sentence = self._cache.get(cache_key)
+                if sentence is None:
+                    sentence = self._cache[cache_key] = self.describe(self.top_features(positions[sku], active))
+                explained[sku] = sentence
+            results.append(explained)
+        return results
+
+def _join(items):
+    if len(items) <= 1:
+        return ''.join(items)
+    return f"{', '.join(items[:-1])} and {items[-1]}"
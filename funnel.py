@@ -0,0 +1,152 @@
+"""
+Streaming funnel over the session-log events that survey_server.py ingests.
+
+Events are folded into hourly windows as they arrive, so dashboard queries
+only merge a few in-memory rollups instead of rescanning raw events. Per
+step (in survey order, with its sectionId) each window tracks:
+
+  - reach: distinct sessions that viewed the step
+  - drop-offs: sessions whose last step this was when they went idle
+    for SESSION_TIMEOUT_MS without submitting
+  - dwell: time from viewing the step to the session's next view, kept as a
+    bucketed histogram so the median can be read without storing samples
+  - back-navigation: views of the step that were left by going back
+
+On startup the server replays recent segment files from data/events/ through
+the same code path, so rollups survive restarts.
+"""
+
+import bisect
+import json
+import time
+from pathlib import Path
+
+# --- Configuration ---
+WINDOW_MS = 3600 * 1000 # Hourly windows
+RETENTION_HOURS = 72
+SESSION_TIMEOUT_MS = 30 * 60 * 1000
+DWELL_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000, 120000, 300000) # Upper bounds; the last bucket is open
+
+class StepStats:
+    __slots__ = ('sessions', 'views', 'backs', 'drop_offs', 'dwell')
+
+    def __init__(self):
+        self.sessions = set()
+        self.views = 0
+        self.backs = 0
+        self.drop_offs = 0
+        self.dwell = [0] * (len(DWELL_BUCKETS_MS) + 1)
+
+class SessionState:
+    __slots__ = ('step', 'viewed_at', 'seen_at', 'submitted')
+
+    def __init__(self, step, viewed_at, seen_at):
+        self.step = step
+        self.viewed_at = viewed_at # Client time of the current step's view
+        self.seen_at = seen_at # Server time of the session's latest event
+        self.submitted = False
+
+class FunnelAggregator:
+    """Incrementally maintained hourly funnel rollups, keyed by step id."""
+
+    def __init__(self, schema):
+        self.steps = [(step['id'], step.get('sectionId')) for step in schema.steps]
+        self.windows = {} # window start (ms) -> {step id: StepStats}
+        self.sessions = {} # sid -> SessionState
+
+    def _stats(self, ts, step_id):
+        window = self.windows.setdefault(ts - ts % WINDOW_MS, {})
+        stats = window.get(step_id)
+        if stats is None:
+            stats = window[step_id] = StepStats()
+        return stats
+
+    def ingest(self, records, now_ms=None):
+        """Folds (sid, type, step, ts, extra) records into the rollups."""
+        now_ms = now_ms or int(time.time() * 1000)
+        for sid, event_type, step_id, ts, extra in records:
+            session = self.sessions.get(sid)
+            if event_type == 'submit':
+                if session:
+                    session.submitted = True
+                    session.seen_at = now_ms
+                continue
+            if event_type != 'view':
+                if session:
+                    session.seen_at = now_ms
+                continue
+
+            stats = self._stats(ts, step_id)
+            stats.sessions.add(sid)
+            stats.views += 1
+            if session is None:
+                self.sessions[sid] = SessionState(step_id, ts, now_ms)
+                continue
+            if ts >= session.viewed_at: # Late, out-of-order views don't count towards dwell
+                previous = self._stats(session.viewed_at, session.step)
+                previous.dwell[bisect.bisect_left(DWELL_BUCKETS_MS, ts - session.viewed_at)] += 1
+                if extra == -1:
+                    previous.backs += 1
+                session.step, session.viewed_at = step_id, ts
+            session.seen_at = now_ms
+
+    def expire_sessions(self, now_ms=None):
+        """Counts idle, unsubmitted sessions as drop-offs at their last step; call periodically."""
+        now_ms = now_ms or int(time.time() * 1000)
+        expired = [sid for sid, session in self.sessions.items() if now_ms - session.seen_at > SESSION_TIMEOUT_MS]
+        for sid in expired:
+            session = self.sessions.pop(sid)
+            if not session.submitted:
+                self._stats(session.viewed_at, session.step).drop_offs += 1
+        cutoff = now_ms - RETENTION_HOURS * WINDOW_MS
+        for start in [start for start in self.windows if start < cutoff]:
+            del self.windows[start]
+        return len(expired)
+
+    def funnel(self, hours=24, now_ms=None):
+        """Merged rollup for the last `hours` windows, one row per step in survey order."""
+        now_ms = now_ms or int(time.time() * 1000)
+        since = now_ms - now_ms % WINDOW_MS - (hours - 1) * WINDOW_MS
+        windows = [window for start, window in self.windows.items() if start >= since]
+        rows = []
+        for step_id, section_id in self.steps:
+            parts = [window[step_id] for window in windows if step_id in window]
+            if not parts:
+                continue
+            sessions = set().union(*(stats.sessions for stats in parts))
+            views = sum(stats.views for stats in parts)
+            dwell = [sum(counts) for counts in zip(*(stats.dwell for stats in parts))]
+            rows.append({
+                'step': step_id,
+                'section': section_id,
+                'reach': len(sessions),
+                'dropOffs': sum(stats.drop_offs for stats in parts),
+                'medianDwellMs': median_from_histogram(dwell),
+                'backRate': round(sum(stats.backs for stats in parts) / views, 4) if views else 0.0,
+            })
+        return rows
+
+def median_from_histogram(counts):
+    """Upper bound of the bucket holding the median (None for no samples, or the open top bucket)."""
+    total = sum(counts)
+    if not total:
+        return None
+    running = 0
+    for bound, count in zip(DWELL_BUCKETS_MS + (None,), counts):
+        running += count
+        if running * 2 >= total:
+            return bound
+    return None
+
+def replay_segments(aggregator, events_dir, hours=RETENTION_HOURS):
+    """Feeds recent segment files back through the aggregator (used at startup)."""
+    cutoff = time.time() - hours * 3600
+    fields = ('sid', 'type', 'step', 'ts', 'extra')
+    paths = sorted(path for path in Path(events_dir).glob('events-*.jsonl') if path.stat().st_mtime >= cutoff)
+    for path in paths:
+        with path.open(encoding='utf-8') as f:
+            records = [tuple(json.loads(line)[field] for field in fields) for line in f]
+        if records: # Event time stands in for arrival time, so replayed sessions expire on schedule
+            aggregator.ingest(records, now_ms=records[-1][3])
+    aggregator.expire_sessions()
+    return len(paths)
@@ -0,0 +1,165 @@
+"""
+Responsive image variants for the raster images in `public/`.
+
+Every PNG/JPEG in `public/` is resized to the IMAGE_WIDTHS it is at least as
+wide as (plus its own width), in each of IMAGE_FORMATS, and written to
+`public/img/` as `<name>-<width>.<source hash>.<format>`. A manifest at
+`src/data/imageManifest.json` lists, per public path, the intrinsic size and
+one `srcset` per MIME type; `src/components/ResponsiveImage.jsx` turns an
+entry into a `<picture>`:
+
+    {"/provit-hero-image.png": {"width": 837, "height": 1066, "hash": "3f9c...",
+                                "srcset": {"image/avif": "/img/provit-hero-image-320.3f9c0a1b.avif 320w, ...",
+                                           "image/webp": "..."}}}
+
+Variant names carry a hash of the source bytes, so a re-run only encodes
+variants whose file doesn't exist yet: unchanged images cost one hash each.
+Encoding runs on a process pool, one variant per task. Variants no longer
+in the manifest are removed.
+
+Resizing needs Pillow (AVIF needs Pillow 11.3+ or pillow-avif-plugin).
+Without it the manifest still records every image's intrinsic size, read
+from the file header, so the page reserves the right space; the original
+file is served as-is.
+
+Zero-byte files are an error: they are the placeholders populate_project.py
+writes, and shipping one means a broken image on the page.
+
+    python image_assets.py        # same stage populate_project.py runs
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image  # Optional: without it only intrinsic sizes are recorded
+except ImportError:
+    Image = None
+
+# --- Configuration ---
+PUBLIC_DIR = Path("public")
+VARIANTS_DIR_NAME = "img" # Inside PUBLIC_DIR, so Vite copies the variants as they are
+MANIFEST_PATH = Path("src") / "data" / "imageManifest.json"
+SOURCE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+IMAGE_WIDTHS = (320, 640, 960, 1280, 1920)
+IMAGE_FORMATS = (('avif', 'AVIF', 'image/avif', {'quality': 55}), # Listed first: browsers take the first <source> they support
+                 ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 6}))
+HASH_LENGTH = 8
+
+# --- Source Images ---
+
+def _intrinsic_size(data):
+    """(width, height) from a PNG or JPEG header, or None for anything else."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    if data[:2] == b'\xff\xd8':
+        offset = 2
+        while offset + 9 < len(data) and data[offset] == 0xFF:
+            marker = data[offset + 1]
+            (length,) = struct.unpack('>H', data[offset + 2:offset + 4])
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC): # Start-of-frame markers
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + length
+    return None
+
+def source_images(public_dir=PUBLIC_DIR):
+    return sorted(path for path in Path(public_dir).iterdir() if path.is_file() and path.suffix.lower() in SOURCE_SUFFIXES)
+
+def empty_placeholders(public_dir=PUBLIC_DIR):
+    return [path for path in source_images(public_dir) if path.stat().st_size == 0]
+
+def variant_widths(width):
+    """IMAGE_WIDTHS up to the image's own width, which is always included; images are never upscaled."""
+    widths = [w for w in IMAGE_WIDTHS if w < width]
+    return widths + [width]
+
+def supported_formats():
+    if Image is None:
+        return []
+    Image.init()
+    return [image_format for image_format in IMAGE_FORMATS if image_format[1] in Image.SAVE]
+
+# --- Encoding ---
+
+def _encode_variant(job):
+    """Worker: resizes one source image to one width and format, writing through a temporary file."""
+    source_path, out_path, width, pil_format, options = job
+    with Image.open(source_path) as image:
+        if image.width != width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        tmp_path = Path(out_path).with_name(Path(out_path).name + '.tmp')
+        image.save(tmp_path, pil_format, **options)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+def build_image_variants(public_dir=PUBLIC_DIR, manifest_path=MANIFEST_PATH, workers=None):
+    """Writes the missing variants and the manifest; returns (variants encoded, variants reused).
+
+    Raises RuntimeError, before encoding anything, if a source image is empty
+    or unreadable.
+    """
+    public_dir = Path(public_dir)
+    empty = empty_placeholders(public_dir)
+    if empty:
+        raise RuntimeError("Empty placeholder image(s), replace them with real files: " + ', '.join(str(path) for path in empty))
+
+    variants_dir = public_dir / VARIANTS_DIR_NAME
+    formats = supported_formats()
+    manifest, jobs, wanted = {}, [], set()
+    for path in source_images(public_dir):
+        data = path.read_bytes()
+        size = _intrinsic_size(data)
+        if size is None:
+            raise RuntimeError(f"{path} is not a readable PNG or JPEG")
+        width, height = size
+        digest = hashlib.sha256(data).hexdigest()
+        srcset = {}
+        for extension, pil_format, mime_type, options in formats:
+            candidates = []
+            for variant_width in variant_widths(width):
+                out_path = variants_dir / f"{path.stem}-{variant_width}.{digest[:HASH_LENGTH]}.{extension}"
+                wanted.add(out_path.name)
+                if not out_path.exists():
+                    jobs.append((str(path), str(out_path), variant_width, pil_format, options))
+                candidates.append(f"/{VARIANTS_DIR_NAME}/{out_path.name} {variant_width}w")
+            srcset[mime_type] = ', '.join(candidates)
+        manifest[f"/{path.name}"] = {'width': width, 'height': height, 'hash': digest, 'srcset': srcset}
+
+    if jobs:
+        variants_dir.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_encode_variant, jobs))
+    if variants_dir.is_dir():
+        for stale in variants_dir.iterdir():
+            if stale.name not in wanted:
+                stale.unlink()
+
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(manifest, indent=2) + '\n'
+    if not manifest_path.exists() or manifest_path.read_text(encoding='utf-8') != text: # Unchanged manifest: no rebuild for Vite
+        tmp_path = manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, manifest_path)
+    return len(jobs), len(wanted) - len(jobs)
+
+# --- Command Line ---
+
+def main():
+    if Image is None:
+        print("Pillow is not installed: recording image sizes only (pip install Pillow for WebP/AVIF variants)")
+    try:
+        encoded, reused = build_image_variants()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Encoded {encoded} image variant(s), reused {reused}; wrote {MANIFEST_PATH}")
+
+if __name__ == "__main__":
+    main()
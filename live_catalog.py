@@ -0,0 +1,149 @@
+"""
+Hot reload of the product catalog and recommendation weights.
+
+A CatalogVersion bundles everything built from one catalog file, one
+optional weights file and one survey schema: the exclusion index
+(catalog_index.py), the bundle optimizer and the explainer. Building it
+validates the catalog against the option ids in surveySteps. The index and
+optimizer constructors reject unknown `excludeFor`, goal and
+`answerWeights` ids, and this module also checks that weights and limits
+are numbers.
+
+LiveCatalog keeps two references: `current`, which requests read, and
+`previous`, the version it replaced. A poller thread watches both files and
+the schema version (get_schema(), which watch_schema_artifact() can swap).
+When any of them changes, the poller builds a new version off to the side
+and publishes it with a single reference assignment. A request reads
+`live.current` once and uses that version throughout, so in-flight work
+finishes on the old catalog. Each version owns its caches (excluded masks,
+explanation sentences), so they are dropped with the version, and `tag`
+changes for caches kept elsewhere. An invalid file is reported and the
+current version stays live.
+
+Usage:
+
+    live = LiveCatalog("catalog.json", weights_path="weights.json")
+    live.start()
+    version = live.current
+    bundle = version.optimizer.solve(answers)
+    reasons = version.explainer.explain(answers, bundle.skus)
+
+The weights file is optional. It holds the catalog's tunable settings, which
+override the catalog file's own:
+
+    {"answerWeights": {"sunExposure": {"sun_rarely": {"g_bones": 0.5}}}, "upperLimits": {"zinc_mg": 40}}
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+from answer_decoder import get_schema, watch_schema_artifact
+from bundle_optimizer import BundleOptimizer
+from catalog_index import load_catalog
+from explanations import Explainer
+
+# --- Configuration ---
+WATCH_INTERVAL = 2.0 # Seconds between file checks
+WEIGHT_KEYS = ('answerWeights', 'upperLimits') # Settings a weights file may override
+
+class CatalogVersion:
+    """Index, optimizer and explainer for one (catalog, weights, schema) combination."""
+
+    def __init__(self, catalog, schema, tag):
+        self.catalog = catalog
+        self.schema = schema
+        self.tag = tag
+        self.optimizer = BundleOptimizer(catalog, schema)
+        self.index = self.optimizer.index # One set of exclusion bitsets per version
+        self.explainer = Explainer(self.optimizer, schema)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+def check_weights(catalog):
+    """Problems with the numeric settings; ids are checked by the index and optimizer constructors."""
+    problems = []
+    for key, options in catalog.get('answerWeights', {}).items():
+        for option_id, goal_weights in options.items():
+            problems += [f"answerWeights {key}:{option_id}:{goal} must be a non-negative number"
+                         for goal, weight in goal_weights.items() if not _is_number(weight)]
+    problems += [f"upperLimits {nutrient} must be a non-negative number"
+                 for nutrient, limit in catalog.get('upperLimits', {}).items() if not _is_number(limit)]
+    if not isinstance(catalog.get('products'), list) or not catalog['products']:
+        problems.append("catalog has no products")
+    return problems
+
+def load_catalog_version(catalog_path, weights_path=None, schema=None):
+    """Reads and validates the files, then builds a CatalogVersion; raises ValueError with every problem found."""
+    schema = schema or get_schema()
+    catalog = load_catalog(catalog_path)
+    if weights_path:
+        weights = json.loads(Path(weights_path).read_text(encoding='utf-8'))
+        unknown = set(weights) - set(WEIGHT_KEYS)
+        if unknown:
+            raise ValueError(f"Weights file has unknown keys: {', '.join(sorted(unknown))}")
+        catalog = {**catalog, **weights}
+    problems = check_weights(catalog)
+    if problems:
+        raise ValueError('; '.join(problems))
+    # Hashed as loaded (each file read once); a reformatted file keeps its tag, so it doesn't swap
+    digest = hashlib.sha256(json.dumps(catalog, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return CatalogVersion(catalog, schema, f"{digest.hexdigest()[:12]}-{schema.version}")
+
+class LiveCatalog:
+    """Double-buffered CatalogVersion reference, refreshed by a poller thread."""
+
+    def __init__(self, catalog_path, weights_path=None):
+        self.paths = [Path(catalog_path)] + ([Path(weights_path)] if weights_path else [])
+        self.listeners = [] # Callables receiving (old version, new version) after each swap
+        self.previous = None
+        self._stamp = self._current_stamp()
+        self.current = load_catalog_version(catalog_path, weights_path) # A broken file at startup is an error, not a warning
+
+    def _current_stamp(self):
+        """What a change is detected on: file mtimes and sizes, and the live schema version."""
+        stamps = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps), get_schema().version
+
+    def reload(self):
+        """Rebuilds and swaps if a file or the schema changed; returns True when a new version went live."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            candidate = load_catalog_version(*self.paths)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: keeping catalog {self.current.tag}: {e}", file=sys.stderr)
+            return False
+        if candidate.tag == self.current.tag:
+            return False
+        self.previous, self.current = self.current, candidate
+        print(f"Loaded catalog {candidate.tag}")
+        for listener in self.listeners:
+            listener(self.previous, candidate)
+        return True
+
+    def start(self, interval=WATCH_INTERVAL, watch_schema=True):
+        """Starts the poller (and, with `watch_schema`, the schema artifact watcher) on daemon threads."""
+        if watch_schema:
+            watch_schema_artifact(interval=interval)
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.reload()
+
+        thread = threading.Thread(target=poll, name='catalog-watcher', daemon=True)
+        thread.start()
+        return thread
@@ -1013,7 +1013,6 @@ APP_CSS_CONTENT = dedent("""\
 PROGRESS_BAR_JSX_CONTENT = dedent("""\
     // src/components/ProgressBar.jsx
     import React from 'react';
-    import '../styles/App.css'; // Import shared styles
 
     const ProgressBar = ({ current, total }) => {
       // current is 1-based index of current step in progress
@@ -1048,9 +1047,10 @@ APP_JSX_CONTENT = dedent("""\
     // src/App.jsx
     import React, { useState, useEffect, useMemo, useCallback } from 'react';
     import { motion, AnimatePresence } from 'framer-motion';
-    import { surveySteps, getProgressSteps, PROVIT_GRADIENT_GREEN, PROVIT_GRADIENT_BLUE } from './data/surveyData';
+    // Steps load per section (survey_split.py); later steps are outlines until ensureStepLoaded() fills them in
+    import { surveySteps, getProgressSteps, PROVIT_GRADIENT_GREEN, PROVIT_GRADIENT_BLUE, stepRenderers, ensureStepLoaded, prefetchNextSection } from './data/surveySections';
     import ProgressBar from './components/ProgressBar';
-    import './styles/App.css'; // Main styles
+    import { assetUrl } from './utils/assets';
 
     // Calculate steps relevant for progress bar calculation ONCE
     const progressSteps = getProgressSteps(surveySteps);
@@ -1109,6 +1109,13 @@ APP_JSX_CONTENT = dedent("""\
         return -1; // No valid step found (reached start or end)
       }, [answers]); // Recalculate this function only if answers change
 
+      // Moves to a step once its section has loaded (an outline step has nothing to render yet)
+      const goToStep = useCallback((index) => {
+        ensureStepLoaded(index)
+          .then(() => setCurrentStepIndex(index))
+          .catch(() => setValidationError('Connection error. Please try again.'));
+      }, []);
+
       // --- Event Handlers ---
 
       // Handles moving to the next step, including validation
@@ -1138,7 +1145,7 @@ APP_JSX_CONTENT = dedent("""\
         const nextIndex = findValidStepIndex(currentStepIndex, 1);
 
         if (nextIndex !== -1) {
-          setCurrentStepIndex(nextIndex); // Move to the next valid step
+          goToStep(nextIndex); // Move to the next valid step
         } else {
           // Reached the end of survey logic
           console.log("End of survey path.");
@@ -1146,13 +1153,13 @@ APP_JSX_CONTENT = dedent("""\
           if (currentStepData?.type === 'email') {
             const loadingIndex = surveySteps.findIndex(s => s.type === 'loading');
             if (loadingIndex > -1) {
-              setCurrentStepIndex(loadingIndex);
+              goToStep(loadingIndex);
             } else {
               console.error("Critical: Loading step not found in surveyData.js");
             }
           }
         }
-      }, [currentStepIndex, findValidStepIndex, currentStepData, answers]); // Dependencies for useCallback
+      }, [currentStepIndex, findValidStepIndex, goToStep, currentStepData, answers]); // Dependencies for useCallback
 
       // Handles moving to the previous step
       const handlePrev = useCallback(() => {
@@ -1161,11 +1168,11 @@ APP_JSX_CONTENT = dedent("""\
         setDirection(-1); // Set animation direction to backward
         const prevIndex = findValidStepIndex(currentStepIndex, -1);
         if (prevIndex !== -1) {
-          setCurrentStepIndex(prevIndex); // Move to previous valid step
+          goToStep(prevIndex); // Move to previous valid step
         } else {
           console.warn("Could not find a valid previous step (should normally find welcome).");
         }
-      }, [currentStepIndex, findValidStepIndex]);
+      }, [currentStepIndex, findValidStepIndex, goToStep]);
 
       // Handles text/email/number input changes
       const handleInputChange = (e) => {
@@ -1256,7 +1263,7 @@ APP_JSX_CONTENT = dedent("""\
           timerId = setTimeout(() => {
             const resultsIndex = surveySteps.findIndex(s => s.type === 'results');
             if (resultsIndex > -1) {
-              setCurrentStepIndex(resultsIndex);
+              goToStep(resultsIndex);
             } else {
               console.error("Critical: Results step not found!");
             }
@@ -1276,7 +1283,12 @@ APP_JSX_CONTENT = dedent("""\
         return () => {
           if (timerId) clearTimeout(timerId);
         };
-      }, [currentStepIndex, currentStepData, handleNext]); // Dependencies: run effect when these change
+      }, [currentStepIndex, currentStepData, handleNext, goToStep]); // Dependencies: run effect when these change
+
+      // Fetch the next section while this step is answered
+      useEffect(() => {
+        prefetchNextSection(currentStepIndex);
+      }, [currentStepIndex]);
 
       // --- Framer Motion Animation Variants ---
       const variants = {
@@ -1300,17 +1312,8 @@ APP_JSX_CONTENT = dedent("""\
       const renderStepContent = () => {
         if (!currentStepData) return <div className="question-step">Loading...</div>; // Should not happen normally
 
-        // Destructure step data properties
-        const {
-          type, id, question, subText, placeholder, options = [], inputKey,
-          title, text, buttonText, stepNumber, inputType = 'text',
-          consentText, gridColumns, consentInputKey
-        } = currentStepData;
-
-        // Get the currently stored answer for this step's key
-        const currentAnswer = answers[inputKey];
-        // Determine if there's an active validation error for this step
-        const hasError = !!validationError; // Simpler: error exists = show (context determined in input/area)
+        // Destructure step data properties (question steps hand the whole step to their renderer)
+        const { type, id, question, subText, title, text, buttonText, stepNumber } = currentStepData;
 
 
         // Render different components based on step 'type'
@@ -1330,49 +1333,6 @@ APP_JSX_CONTENT = dedent("""\
               </div>
             );
 
-          case 'text':
-          case 'email':
-            return (
-              <div className="question-step">
-                <h2>{question}</h2>
-                {subText && <p className="sub-text">{subText}</p>}
-                <div className="text-input-container">
-                  <input
-                    id={inputKey} // Associate label/error message
-                    type={inputType}
-                    name={inputKey}
-                    placeholder={placeholder}
-                    value={currentAnswer || ''}
-                    onChange={handleInputChange}
-                    className={`text-input ${hasError ? 'error' : ''}`}
-                    aria-invalid={hasError}
-                    aria-describedby={hasError ? `${inputKey}-error` : undefined}
-                    autoFocus={id !== 'email'} // Focus most text inputs on load
-                    key={id} // Add key to help React focus correctly
-                  />
-                  {/* Display validation error message */}
-                  {hasError && <p id={`${inputKey}-error`} className="validation-error-msg" role="alert">{validationError}</p>}
-                </div>
-
-                {/* Render consent checkbox only for 'email' type */}
-                {type === 'email' && consentInputKey && (
-                  <label className="consent-label">
-                    <input
-                      type="checkbox"
-                      name={consentInputKey}
-                      checked={!!answers[consentInputKey]}
-                      onChange={handleInputChange}
-                      aria-describedby={hasError && !answers[consentInputKey] ? `${inputKey}-error` : undefined} // Link error to checkbox too if consent failed
-                    />
-                     {/* UPDATE: Replace <a> with Link component if using React Router */}
-                    <span dangerouslySetInnerHTML={{ __html: consentText?.replace('Privacy Policy', '<a href="/privacy" target="_blank" rel="noopener noreferrer">Privacy Policy</a>') || "I agree to the terms." }}>
-                       {/* Using dangerouslySetInnerHTML assumes consentText is safe or sanitized */}
-                    </span>
-                  </label>
-                )}
-              </div>
-            );
-
            case 'info':
              const infoText = id === 'greeting' && answers.userName
                ? `Nice to meet you, ${answers.userName}!`
@@ -1388,113 +1348,10 @@ APP_JSX_CONTENT = dedent("""\
                </div>
              );
 
-           case 'single-button':
-           case 'multi-grid':
-           case 'checkbox':
-             // Determine container and styling based on type
-             const isGrid = type === 'multi-grid' || !!gridColumns;
-             const ContainerComponent = isGrid ? 'div' : 'div'; // Just a div for layout
-             const containerClass = isGrid ? 'options-grid-container' : 'options-container';
-             const gridStyle = isGrid ? { gridTemplateColumns: `repeat(${gridColumns || (type === 'multi-grid' ? 3 : 1)}, 1fr)` } : {};
-
-             return (
-               <div className="question-step">
-                 <h2>{question}</h2>
-                 {subText && <p className="sub-text">{subText}</p>}
-                 <ContainerComponent className={containerClass} style={gridStyle} role={type === 'checkbox' ? 'group' : undefined} aria-labelledby={question ? id + '-q' : undefined}>
-                   {/* Assign id to question if needed for aria-labelledby */}
-                    {question && <h2 id={id + '-q'} style={{ display: 'none' }}>{question}</h2>}
-
-                   {options.map(opt => {
-                     // Determine if the current option is selected
-                     const isSelected = type === 'single-button'
-                       ? currentAnswer === opt.id
-                       : (Array.isArray(currentAnswer) && currentAnswer.includes(opt.id));
-
-                     // Use <label> for checkboxes for better accessibility
-                     const ButtonComponent = type === 'checkbox' ? 'label' : 'button';
-                     const clickHandler = type === 'checkbox'
-                       ? () => handleCheckboxGroupClick(opt.id)
-                       : () => handleSelect(opt.id, type === 'multi-grid', opt.exclusive);
-
-                     return (
-                       <ButtonComponent
-                         key={opt.id}
-                         className={`option-button ${type === 'multi-grid' ? 'grid-item' : ''} ${type === 'checkbox' ? 'checkbox-option' : ''} ${isSelected ? 'selected' : ''}`}
-                         onClick={clickHandler}
-                         // Add type='button' for actual buttons to prevent form submission
-                         type={ButtonComponent === 'button' ? 'button' : undefined}
-                         // Link label to hidden input for checkboxes
-                         htmlFor={type === 'checkbox' ? `${inputKey}-${opt.id}` : undefined}
-                         // Add ARIA roles and states
-                         role={type !== 'checkbox' ? 'button' : undefined} // Button role if not label
-                         aria-pressed={type !== 'checkbox' ? isSelected : undefined} // Indicate toggle state
-                         tabIndex={0} // Ensure focusability
-                         onKeyDown={(e) => { if(e.key === 'Enter' || e.key === ' ') clickHandler() }} // Keyboard activation
-                       >
-                         {/* Hidden actual checkbox, state managed visually */}
-                         {type === 'checkbox' && (
-                           <input
-                             id={`${inputKey}-${opt.id}`}
-                             type="checkbox"
-                             value={opt.id}
-                             checked={isSelected || false}
-                             onChange={() => {}} // Handler is on the label/button
-                             style={{ // Visually hide, but keep accessible
-                               position: 'absolute',
-                               opacity: 0,
-                               width: '1px',
-                               height: '1px',
-                               overflow: 'hidden'
-                              }}
-                             tabIndex={-1} // Remove from tab order, label handles focus
-                           />
-                         )}
-                          {/* Custom styled checkbox indicator */}
-                         {type === 'checkbox' && (<span className="checkbox-custom" aria-hidden="true"></span>)}
-                         {/* Icon for grid items */}
-                         {opt.icon && <span className="icon" aria-hidden="true">{opt.icon}</span>}
-                         {/* Option Text */}
-                         <span>{opt.text}</span>
-                          {/* REFINEMENT: Add logic for numbered badges for goal priority */}
-                       </ButtonComponent>
-                     );
-                   })}
-                 </ContainerComponent>
-                 {/* Display validation errors for multi-select steps if needed */}
-                 {hasError && type !== 'single-button' && <p className="validation-error-msg" role="alert" style={{marginTop: '15px'}}>{validationError}</p>}
-               </div>
-             );
-
-           case 'yes-no-circle':
-             return (
-               <div className="question-step">
-                 <h2>{question}</h2>
-                 {subText && <p className="sub-text">{subText}</p>}
-                 <div className="yes-no-container" role="radiogroup" aria-labelledby={id + '-q'}>
-                     {/* Hidden label */}
-                    {question && <h2 id={id + '-q'} style={{ display: 'none' }}>{question}</h2>}
-                   {options.map(opt => (
-                     <span
-                       key={opt.id}
-                       className={`yes-no-option ${currentAnswer === opt.id ? 'selected' : ''}`}
-                       onClick={() => handleSelect(opt.id, false, false)}
-                       role="radio"
-                       aria-checked={currentAnswer === opt.id}
-                       tabIndex={currentAnswer === opt.id || (currentAnswer == null && opt.id === options[0].id) ? 0 : -1} // Manage focus within group
-                       onKeyDown={(e) => { if (e.key === 'Enter' || e.key === ' ') handleSelect(opt.id, false, false)}}
-                     >
-                       {opt.text}
-                     </span>
-                   ))}
-                 </div>
-               </div>
-             );
-
            case 'loading':
              return (
                <div className="question-step loader">
-                 <img src="/provit-icon.png" alt="" /> {/* Decorative image */}
+                 <img src={assetUrl("/provit-icon.png")} alt="" /> {/* Decorative image; hashed path from asset_manifest.py */}
                  <p>Personalising your results...</p>
                </div>
              );
@@ -1515,9 +1372,28 @@ APP_JSX_CONTENT = dedent("""\
                </div>
              );
 
-           default:
-             console.error(`Unknown step type: ${type}`);
-             return <div className="question-step">Error: Step type not configured.</div>;
+           default: {
+             // Question steps: the renderer comes from components/steps/ (see renderers.js), loaded with its section
+             const StepRenderer = stepRenderers[type];
+             if (!StepRenderer) {
+               console.error(`Unknown step type: ${type}`);
+               return <div className="question-step">Error: Step type not configured.</div>;
+             }
+             return (
+               <div className="question-step">
+                 <h2>{question}</h2>
+                 {subText && <p className="sub-text">{subText}</p>}
+                 <StepRenderer
+                   step={currentStepData}
+                   answers={answers}
+                   validationError={validationError}
+                   onInputChange={handleInputChange}
+                   onSelect={handleSelect}
+                   onCheckboxClick={handleCheckboxGroupClick}
+                 />
+               </div>
+             );
+           }
         }
       };
 
@@ -1526,7 +1402,7 @@ APP_JSX_CONTENT = dedent("""\
         <div className="survey-container">
           {/* Logo */}
           <header className="survey-header">
-            <img src="/provit-logo-white.png" alt="PROVIT Logo" />
+            <img src={assetUrl("/provit-logo-white.png")} alt="PROVIT Logo" />
           </header>
 
           {/* Progress Bar (conditionally rendered) */}
@@ -1609,12 +1485,229 @@ APP_JSX_CONTENT = dedent("""\
 
 """)
 
+SURVEY_SECTIONS_JS_CONTENT = dedent("""\
+    // src/data/surveySections.js
+    // Loads the survey section by section (modules written by survey_split.py from surveyData.js).
+    // `surveySteps` starts as the welcome screen and first section plus an outline of the rest; loading a
+    // section fills its outline entries in place, so the same step objects stay valid everywhere.
+
+    import { surveySteps, sectionLoaders } from './sections/index.js';
+    import { sectionRendererLoaders } from '../components/steps/renderers.js';
+
+    export * from './sections/index.js'; // surveySteps, SECTIONS and the rest of surveyData.js's exports
+    export { stepRenderers } from '../components/steps/renderers.js';
+
+    const stepsById = new Map(surveySteps.map(step => [step.id, step]));
+    const pending = new Map(); // chunk -> promise, kept once loaded
+
+    // Loads a section's steps and any renderer it needs first; a failed load is retried on the next call
+    export const loadSection = (chunk) => {
+      if (!chunk || !sectionLoaders[chunk]) return Promise.resolve();
+      if (!pending.has(chunk)) {
+        const loading = Promise.all([sectionLoaders[chunk](), sectionRendererLoaders[chunk]?.()])
+          .then(([{ default: steps }]) => { steps.forEach(step => Object.assign(stepsById.get(step.id), step)); })
+          .catch(error => { pending.delete(chunk); throw error; });
+        pending.set(chunk, loading);
+      }
+      return pending.get(chunk);
+    };
+
+    export const ensureStepLoaded = (index) => loadSection(surveySteps[index]?.chunk);
+
+    // Every section up to and including the one at `index`, for resuming a draft part-way through
+    export const ensureStepsLoadedThrough = (index) => {
+      const chunks = new Set(surveySteps.slice(0, index + 1).map(step => step.chunk));
+      return Promise.all([...chunks].map(loadSection));
+    };
+
+    // The section after the one at `index`, fetched while the user answers this one
+    export const prefetchNextSection = (index) => {
+      const chunk = surveySteps[index]?.chunk;
+      const next = surveySteps.slice(index + 1).find(step => step.chunk && step.chunk !== chunk);
+      if (next) loadSection(next.chunk).catch(() => {}); // Navigation retries and reports it
+    };
+""")
+
+TEXT_STEP_JSX_CONTENT = dedent("""\
+    // src/components/steps/TextStep.jsx
+    import React from 'react';
+
+    // 'text' and 'email' steps: one input, plus the consent checkbox on the email step
+    const TextStep = ({ step, answers, validationError, onInputChange }) => {
+      const { type, id, placeholder, inputKey, inputType = 'text', consentText, consentInputKey } = step;
+      const currentAnswer = answers[inputKey];
+      const hasError = !!validationError;
+
+      return (
+        <>
+          <div className="text-input-container">
+            <input
+              id={inputKey} // Associate label/error message
+              type={inputType}
+              name={inputKey}
+              placeholder={placeholder}
+              value={currentAnswer || ''}
+              onChange={onInputChange}
+              className={`text-input ${hasError ? 'error' : ''}`}
+              aria-invalid={hasError}
+              aria-describedby={hasError ? `${inputKey}-error` : undefined}
+              autoFocus={id !== 'email'} // Focus most text inputs on load
+              key={id} // Add key to help React focus correctly
+            />
+            {/* Display validation error message */}
+            {hasError && <p id={`${inputKey}-error`} className="validation-error-msg" role="alert">{validationError}</p>}
+          </div>
+
+          {/* Render consent checkbox only for 'email' type */}
+          {type === 'email' && consentInputKey && (
+            <label className="consent-label">
+              <input
+                type="checkbox"
+                name={consentInputKey}
+                checked={!!answers[consentInputKey]}
+                onChange={onInputChange}
+                aria-describedby={hasError && !answers[consentInputKey] ? `${inputKey}-error` : undefined} // Link error to checkbox too if consent failed
+              />
+               {/* UPDATE: Replace <a> with Link component if using React Router */}
+              <span dangerouslySetInnerHTML={{ __html: consentText?.replace('Privacy Policy', '<a href="/privacy" target="_blank" rel="noopener noreferrer">Privacy Policy</a>') || "I agree to the terms." }}>
+                 {/* Using dangerouslySetInnerHTML assumes consentText is safe or sanitized */}
+              </span>
+            </label>
+          )}
+        </>
+      );
+    };
+
+    export default TextStep;
+""")
+
+CHOICE_STEP_JSX_CONTENT = dedent("""\
+    // src/components/steps/ChoiceStep.jsx
+    import React from 'react';
+
+    // Option steps: 'single-button' and 'yes-no-circle' pick one, 'multi-grid' and 'checkbox' pick several
+    const ChoiceStep = ({ step, answers, validationError, onSelect, onCheckboxClick }) => {
+      const { type, id, question, options = [], inputKey, gridColumns } = step;
+      const currentAnswer = answers[inputKey];
+      const hasError = !!validationError;
+
+      if (type === 'yes-no-circle') {
+        return (
+          <div className="yes-no-container" role="radiogroup" aria-labelledby={id + '-q'}>
+              {/* Hidden label */}
+             {question && <h2 id={id + '-q'} style={{ display: 'none' }}>{question}</h2>}
+            {options.map(opt => (
+              <span
+                key={opt.id}
+                className={`yes-no-option ${currentAnswer === opt.id ? 'selected' : ''}`}
+                onClick={() => onSelect(opt.id, false, false)}
+                role="radio"
+                aria-checked={currentAnswer === opt.id}
+                tabIndex={currentAnswer === opt.id || (currentAnswer == null && opt.id === options[0].id) ? 0 : -1} // Manage focus within group
+                onKeyDown={(e) => { if (e.key === 'Enter' || e.key === ' ') onSelect(opt.id, false, false)}}
+              >
+                {opt.text}
+              </span>
+            ))}
+          </div>
+        );
+      }
+
+      // Determine container and styling based on type
+      const isGrid = type === 'multi-grid' || !!gridColumns;
+      const containerClass = isGrid ? 'options-grid-container' : 'options-container';
+      const gridStyle = isGrid ? { gridTemplateColumns: `repeat(${gridColumns || (type === 'multi-grid' ? 3 : 1)}, 1fr)` } : {};
+
+      return (
+        <>
+          <div className={containerClass} style={gridStyle} role={type === 'checkbox' ? 'group' : undefined} aria-labelledby={question ? id + '-q' : undefined}>
+            {/* Assign id to question if needed for aria-labelledby */}
+             {question && <h2 id={id + '-q'} style={{ display: 'none' }}>{question}</h2>}
+
+            {options.map(opt => {
+              // Determine if the current option is selected
+              const isSelected = type === 'multi-grid' || type === 'checkbox'
+                ? (Array.isArray(currentAnswer) && currentAnswer.includes(opt.id))
+                : currentAnswer === opt.id;
+
+              // Use <label> for checkboxes for better accessibility
+              const ButtonComponent = type === 'checkbox' ? 'label' : 'button';
+              const clickHandler = type === 'checkbox'
+                ? () => onCheckboxClick(opt.id)
+                : () => onSelect(opt.id, type === 'multi-grid', opt.exclusive);
+
+              return (
+                <ButtonComponent
+                  key={opt.id}
+                  className={`option-button ${type === 'multi-grid' ? 'grid-item' : ''} ${type === 'checkbox' ? 'checkbox-option' : ''} ${isSelected ? 'selected' : ''}`}
+                  onClick={clickHandler}
+                  // Add type='button' for actual buttons to prevent form submission
+                  type={ButtonComponent === 'button' ? 'button' : undefined}
+                  // Link label to hidden input for checkboxes
+                  htmlFor={type === 'checkbox' ? `${inputKey}-${opt.id}` : undefined}
+                  // Add ARIA roles and states
+                  role={type !== 'checkbox' ? 'button' : undefined} // Button role if not label
+                  aria-pressed={type !== 'checkbox' ? isSelected : undefined} // Indicate toggle state
+                  tabIndex={0} // Ensure focusability
+                  onKeyDown={(e) => { if(e.key === 'Enter' || e.key === ' ') clickHandler() }} // Keyboard activation
+                >
+                  {/* Hidden actual checkbox, state managed visually */}
+                  {type === 'checkbox' && (
+                    <input
+                      id={`${inputKey}-${opt.id}`}
+                      type="checkbox"
+                      value={opt.id}
+                      checked={isSelected || false}
+                      onChange={() => {}} // Handler is on the label/button
+                      style={{ // Visually hide, but keep accessible
+                        position: 'absolute',
+                        opacity: 0,
+                        width: '1px',
+                        height: '1px',
+                        overflow: 'hidden'
+                       }}
+                      tabIndex={-1} // Remove from tab order, label handles focus
+                    />
+                  )}
+                   {/* Custom styled checkbox indicator */}
+                  {type === 'checkbox' && (<span className="checkbox-custom" aria-hidden="true"></span>)}
+                  {/* Icon for grid items */}
+                  {opt.icon && <span className="icon" aria-hidden="true">{opt.icon}</span>}
+                  {/* Option Text */}
+                  <span>{opt.text}</span>
+                   {/* REFINEMENT: Add logic for numbered badges for goal priority */}
+                </ButtonComponent>
+              );
+            })}
+          </div>
+          {/* Display validation errors for multi-select steps if needed */}
+          {hasError && type !== 'single-button' && <p className="validation-error-msg" role="alert" style={{marginTop: '15px'}}>{validationError}</p>}
+        </>
+      );
+    };
+
+    export default ChoiceStep;
+""")
+
+ASSETS_JS_CONTENT = dedent("""\
+    // src/utils/assets.js
+    // Content-hashed paths for files in public/ (asset_manifest.py), served with immutable caching.
+
+    // Written by asset_manifest.py (run by populate_project.py); the glob is empty when the stage hasn't run yet
+    const manifests = import.meta.glob('../data/assetManifest.json', { eager: true, import: 'default' });
+    const assetManifest = Object.values(manifests)[0] || {};
+
+    // '/provit-icon.png' -> '/static/provit-icon.3f9c0a1b.png'; unknown paths are returned as they are
+    export const assetUrl = (path) => assetManifest[path] || path;
+""")
+
 MAIN_JSX_CONTENT = dedent("""\
     // src/main.jsx
     import React from 'react';
     import ReactDOM from 'react-dom/client';
     import App from './App.jsx'; // Main survey component
-    // Global styles imported within App.jsx now
+    // The full stylesheet loads without blocking the first paint; the built index.html inlines what the first screen needs (critical_css.py)
+    import('./styles/App.css');
 
     ReactDOM.createRoot(document.getElementById('root')).render(
       <React.StrictMode>
@@ -1630,9 +1723,13 @@ FILES_TO_CREATE = {
     Path("src") / "data" / "surveyData.js": SURVEY_DATA_JS_CONTENT,
     Path("src") / "styles" / "App.css": APP_CSS_CONTENT,
     Path("src") / "components" / "ProgressBar.jsx": PROGRESS_BAR_JSX_CONTENT,
+    Path("src") / "data" / "surveySections.js": SURVEY_SECTIONS_JS_CONTENT,
+    Path("src") / "components" / "steps" / "TextStep.jsx": TEXT_STEP_JSX_CONTENT,
+    Path("src") / "components" / "steps" / "ChoiceStep.jsx": CHOICE_STEP_JSX_CONTENT,
+    Path("src") / "utils" / "assets.js": ASSETS_JS_CONTENT,
     Path("src") / "App.jsx": APP_JSX_CONTENT,
     Path("src") / "main.jsx": MAIN_JSX_CONTENT,
-    # Placeholder files for images (must be replaced manually)
+    # Placeholder files for images (must be replaced manually; existing images are kept)
     Path("public") / "provit-logo-white.png": "",
     Path("public") / "provit-icon.png": "",
     # Placeholder for default Vite files (can be deleted by user or script)
@@ -1675,6 +1772,128 @@ def run_npm_install(packages):
         return False
     return True
 
+def build_image_assets():
+    """Writes WebP/AVIF variants of the images in public/ plus the srcset manifest ResponsiveImage reads."""
+    try:
+        import image_assets # Lives next to this script
+    except ImportError:
+        print("  Skipping: image_assets.py not found next to this script.")
+        return False
+    if image_assets.Image is None:
+        print("  Pillow is not installed: recording image sizes only (pip install Pillow for WebP/AVIF variants).")
+    try:
+        encoded, reused = image_assets.build_image_variants()
+    except RuntimeError as e:
+        print(f"  Error building image variants: {e}", file=sys.stderr)
+        return False
+    print(f"  Encoded {encoded} image variant(s), reused {reused}.")
+    print(f"  Created: {image_assets.MANIFEST_PATH}")
+    return True
+
+def build_hashed_assets():
+    """Copies the files in public/ to content-hashed names, for immutable caching; `npm run build` points the built index.html at them."""
+    try:
+        import asset_manifest # Lives next to this script
+    except ImportError:
+        print("  Skipping: asset_manifest.py not found next to this script.")
+        return False
+    try:
+        assets, copied, _ = asset_manifest.build_hashed_assets()
+    except OSError as e:
+        print(f"  Error hashing public assets: {e}", file=sys.stderr)
+        return False
+    print(f"  Hashed {assets} public file(s), {copied} copied.")
+    print(f"  Created: {asset_manifest.MANIFEST_PATH}")
+    return True
+
+def build_offline_support():
+    """Writes the service worker into an existing build; `npm run build` does this itself afterwards (postbuild)."""
+    try:
+        import service_worker # Lives next to this script
+    except ImportError:
+        print("  Skipping: service_worker.py not found next to this script.")
+        return False
+    if not (service_worker.BUILD_DIR / "index.html").exists():
+        print(f"  Skipping: no build in {service_worker.BUILD_DIR}/ yet; `npm run build` writes the service worker.")
+        return False
+    try:
+        count = service_worker.build_service_worker()
+    except (OSError, RuntimeError) as e:
+        print(f"  Error writing the service worker: {e}", file=sys.stderr)
+        return False
+    print(f"  Created: {service_worker.BUILD_DIR / service_worker.SERVICE_WORKER_NAME} ({count} precached file(s))")
+    return True
+
+def build_prerendered_welcome():
+    """Renders the welcome step into an existing build's index.html; `npm run build` does this itself afterwards (postbuild)."""
+    try:
+        import prerender # Lives next to this script
+    except ImportError:
+        print("  Skipping: prerender.py not found next to this script.")
+        return False
+    if not prerender.INDEX_HTML_PATH.exists():
+        print(f"  Skipping: no build at {prerender.INDEX_HTML_PATH} yet; `npm run build` prerenders the welcome screen.")
+        return False
+    try:
+        rewritten = prerender.prerender_index()
+    except RuntimeError as e:
+        print(f"  Error prerendering the welcome screen: {e}", file=sys.stderr)
+        return False
+    print(f"  {'Updated' if rewritten else 'Unchanged'}: {prerender.INDEX_HTML_PATH}")
+    return True
+
+def build_critical_css():
+    """Inlines the CSS the first screen needs into an existing build's index.html; `npm run build` does this itself (postbuild)."""
+    try:
+        import critical_css # Lives next to this script
+        from answer_decoder import get_schema
+    except ImportError:
+        print("  Skipping: critical_css.py or answer_decoder.py not found next to this script.")
+        return False
+    if not critical_css.INDEX_HTML_PATH.exists():
+        print(f"  Skipping: no build at {critical_css.INDEX_HTML_PATH} yet; `npm run build` inlines the critical CSS.")
+        return False
+    try:
+        critical, total, cached, rewritten = critical_css.build_critical_css(get_schema().steps)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"  Error extracting critical CSS: {e}", file=sys.stderr)
+        return False
+    print(f"  Inlined {critical} of {total} bytes of CSS{' (cached)' if cached else ''}.")
+    if rewritten:
+        print(f"  Updated: {critical_css.INDEX_HTML_PATH}")
+    return True
+
+def build_survey_split():
+    """Splits surveyData.js into per-section modules, so the first screen doesn't wait for the whole survey."""
+    try:
+        import survey_split # Lives next to this script
+    except ImportError:
+        print("  Skipping: survey_split.py not found next to this script.")
+        return False
+    try:
+        written, unchanged = survey_split.split_survey()
+    except RuntimeError as e:
+        print(f"  Error splitting the survey: {e}", file=sys.stderr)
+        return False
+    print(f"  Wrote {written} section module(s), {unchanged} unchanged, in {survey_split.SECTIONS_DIR}.")
+    return True
+
+def build_schema_artifact():
+    """Prebuilds the compiled survey schema so the results backend doesn't compile it at startup."""
+    try:
+        import answer_decoder # Lives next to this script
+    except ImportError:
+        print("  Skipping: answer_decoder.py not found next to this script.")
+        return False
+    try:
+        artifact_path = answer_decoder.write_schema_artifact(
+            Path("src") / "data" / "surveyData.js", Path("build") / "survey-schema.json")
+    except RuntimeError as e:
+        print(f"  Error building schema artifact: {e}", file=sys.stderr)
+        return False
+    print(f"  Created: {artifact_path}")
+    return True
+
 # --- Main Script Logic ---
 
 def main():
@@ -1697,6 +1916,9 @@ def main():
     error_count = 0
 
     for filepath, content in FILES_TO_CREATE.items():
+        if filepath.parent == Path("public") and filepath.exists():
+            print(f"  Kept existing: {filepath}") # Never replace a real image with an empty placeholder
+            continue
         # For files expected to be overwritten/replaced (like main.jsx, index.html), just create them
         # For optional files/dirs to delete, just create placeholders
         if create_file_with_content(filepath, content):
@@ -1749,6 +1971,34 @@ def main():
         else:
              print(f"\nInstalled required packages: {', '.join(REQUIRED_NPM_PACKAGES)}")
 
+    # Prebuild the results backend's schema artifact (rebuild whenever surveyData.js changes)
+    print("\nBuilding survey schema artifact...")
+    build_schema_artifact()
+
+    # Per-section step modules (rerun whenever surveyData.js changes)
+    print("\nSplitting the survey into sections...")
+    build_survey_split()
+
+    # Resized image variants (rerun after replacing images; unchanged images are skipped)
+    print("\nBuilding responsive image variants...")
+    images_ok = build_image_assets()
+
+    # Content-hashed copies of public/ (rerun after replacing a file there)
+    print("\nHashing public assets...")
+    build_hashed_assets()
+
+    # Static welcome screen (uses the image and asset manifests, so it runs after those stages)
+    print("\nPrerendering the welcome screen into the build...")
+    build_prerendered_welcome()
+
+    # Critical CSS (rerun after editing App.css; an unchanged stylesheet is served from the cache)
+    print("\nInlining critical CSS into the build...")
+    build_critical_css()
+
+    # Service worker for offline sessions (needs a build; `npm run build` regenerates it)
+    print("\nGenerating the service worker...")
+    build_offline_support()
+
     print("\n--- Setup Complete ---")
     print("\nNext Steps:")
     print("1. IMPORTANT: Replace placeholder image files in `public/` with your actual images:")
@@ -1758,6 +2008,11 @@ def main():
     print("3. Add any custom fonts to `src/styles/App.css`.")
     print("4. Run the development server: `npm run dev`")
     print("5. Start coding and refining!")
+    print("6. Serve a production build: `npm run build`, then `python serve_dist.py --api`")
+    print("7. Deliver results emails: `python email_queue.py stand-in` (local SMTP), then `python email_queue.py work --catalog <catalog.json>`")
+    if not images_ok:
+        print("\nImage variants were NOT built: replace the placeholders above, then run `python image_assets.py`.", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Static welcome screen in the built `dist/index.html`, so the first
+meaningful paint doesn't wait for React, framer-motion and `surveySteps` to
+download and run. The source index.html is left as it is (the dev server
+renders the welcome screen with React alone); `postbuild` runs this stage.
+
+The `welcome` step (title, text, description, buttonText) and SECTIONS are
+read from `src/data/surveyData.js` and rendered into `<div id="root">` as
+the same DOM App.jsx produces for step 0: background elements, header, the
+section nav and the welcome screen. The hero and logo use the srcsets from
+image_assets.py's manifest, so the browser's preload scanner finds the
+largest contentful paint image in the HTML itself. The fallback `src` is
+the content-hashed path from asset_manifest.py's manifest, as assetUrl()
+gives App.jsx.
+
+When the bundle runs, `createRoot().render()` replaces the markup with the
+live App. App.jsx skips the welcome entry animation when it finds
+`data-prerendered="welcome"` on the root, so the swap is not visible.
+This is a takeover rather than React hydration: hydrating needs markup
+byte-identical to React's own render, framer-motion's inline styles
+included, which only a JSX render in node could produce.
+
+    python prerender.py           # after `npm run build`
+    python prerender.py dist      # explicit build directory
+"""
+
+import json
+import os
+import re
+import sys
+from html import escape
+from pathlib import Path
+from textwrap import dedent
+
+from answer_decoder import SURVEY_DATA_PATH, run_survey_script
+from asset_manifest import MANIFEST_PATH as ASSET_MANIFEST_PATH, load_manifest
+
+# --- Configuration ---
+INDEX_HTML_PATH = Path("dist") / "index.html" # The built page; the source index.html is never rewritten
+IMAGE_MANIFEST_PATH = Path("src") / "data" / "imageManifest.json"
+BACKGROUND_ELEMENTS = 8 # App.jsx's decorative `bg-element`s
+LOGO_SRC = "/provit-logo-white.png"
+HERO_SRC = "/provit-hero-image.png"
+END_MARKER = "<!-- /prerendered -->"
+
+# Defaults App.jsx falls back to when the welcome step leaves a field out
+DEFAULT_TITLE = "Nutrition tailored..."
+DEFAULT_TEXT = "Let's find..."
+DEFAULT_BUTTON_TEXT = "Let's Get Started"
+
+# Prints the welcome step and SECTIONS (older surveys have none) as JSON
+DUMP_WELCOME_JS = dedent("""\
+    const survey = await import(process.argv[1]);
+    const welcome = survey.surveySteps.find(step => step.type === 'welcome') ?? null;
+    process.stdout.write(JSON.stringify({ welcome, sections: survey.SECTIONS ?? [] }));
+""")
+
+ROOT_PATTERN = re.compile(r'<div id="root"(?: data-prerendered="[^"]*")?>(?:.*?' + re.escape(END_MARKER) + r')?</div>', re.DOTALL)
+
+# --- Rendering ---
+
+def _attributes(**attributes):
+    return ''.join(f' {name.replace("_", "-")}="{escape(str(value))}"' for name, value in attributes.items() if value is not None)
+
+def render_image(src, manifest, alt, sizes, class_name=None, assets=None):
+    """Same markup as ResponsiveImage with `priority`: a <picture> when the manifest has variants."""
+    entry = manifest.get(src, {})
+    img = (f'<img{_attributes(src=(assets or {}).get(src, src), width=entry.get("width"), height=entry.get("height"), loading="eager", fetchpriority="high", decoding="async", alt=alt)}'
+           f'{_attributes(**{"class": class_name})}>')
+    sources = entry.get('srcset', {})
+    if not sources:
+        return img
+    return '<picture>' + ''.join(f'<source{_attributes(type=mime_type, srcset=srcset, sizes=sizes)}>' for mime_type, srcset in sources.items()) + img + '</picture>'
+
+def render_welcome(welcome, sections, manifest, assets=None):
+    """Markup for App at step 0, without the React-only wrappers' inline styles."""
+    background = ''.join(f'<div class="bg-element el-{i}"></div>' for i in range(1, BACKGROUND_ELEMENTS + 1))
+    nav = ''.join(f'<div class="section-nav-item">{escape(section["title"])}</div>' for section in sections)
+    screen = (
+        '<div class="welcome-screen"><div class="welcome-content"><div class="welcome-text">'
+        + render_image(LOGO_SRC, manifest, "PROVIT Logo", "96px", "welcome-logo", assets)
+        + f'<h1 class="welcome-title">{escape(welcome.get("title") or DEFAULT_TITLE)}</h1>'
+        + f'<p class="welcome-tagline">{escape(welcome.get("text") or DEFAULT_TEXT)}</p>'
+        + (f'<p class="welcome-description">{escape(welcome["description"])}</p>' if welcome.get("description") else '')
+        + f'<button class="welcome-button">{escape(welcome.get("buttonText") or DEFAULT_BUTTON_TEXT)}</button>'
+        + '</div><div class="welcome-image-container">'
+        + render_image(HERO_SRC, manifest, "Personalized vitamins", "(max-width: 850px) 80vw, 40vh", "welcome-hero-image", assets)
+        + '</div></div></div>'
+    )
+    return (
+        f'<div class="background-elements" aria-hidden="true">{background}</div>'
+        '<div class="survey-container">'
+        f'<header class="survey-header">{render_image(LOGO_SRC, manifest, "PROVIT Logo", "84px", assets=assets)}</header>'
+        f'<div class="section-nav-container" aria-label="Survey Sections">{nav}</div>'
+        '<div class="survey-header-spacer"></div>'
+        f'<div class="step-wrapper"><div><div><div>{screen}</div></div></div></div>'
+        '</div>'
+    )
+
+# --- Inlining ---
+
+def prerender_index(survey_data_path=SURVEY_DATA_PATH, index_path=INDEX_HTML_PATH, manifest_path=IMAGE_MANIFEST_PATH,
+                    asset_manifest_path=ASSET_MANIFEST_PATH):
+    """Writes the static welcome screen into index.html; returns False if the file already had this markup.
+
+    Raises RuntimeError if the survey has no welcome step or index.html is missing or has no root div.
+    """
+    index_path = Path(index_path)
+    if not index_path.exists():
+        raise RuntimeError(f"{index_path} not found; run `npm run build` first")
+    survey = run_survey_script(DUMP_WELCOME_JS, survey_data_path)
+    if survey['welcome'] is None:
+        raise RuntimeError(f"{survey_data_path} has no 'welcome' step to prerender")
+    manifest_path = Path(manifest_path)
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    root = f'<div id="root" data-prerendered="welcome">{render_welcome(survey["welcome"], survey["sections"], manifest, load_manifest(asset_manifest_path))}{END_MARKER}</div>'
+
+    html = index_path.read_text(encoding='utf-8')
+    if root in html:
+        return False
+    if not ROOT_PATTERN.search(html):
+        raise RuntimeError(f'{index_path} has no <div id="root"> to prerender into')
+    html = ROOT_PATTERN.sub(lambda match: root, html, count=1)
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.write_text(html, encoding='utf-8')
+    os.replace(tmp_path, index_path)
+    return True
+
+# --- Command Line ---
+
+def main():
+    index_path = Path(sys.argv[1]) / "index.html" if len(sys.argv) > 1 else INDEX_HTML_PATH
+    try:
+        rewritten = prerender_index(index_path=index_path)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Prerendered the welcome screen; {index_path} {'updated' if rewritten else 'unchanged'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+// scripts/analyze-survey-paths.js
+// Offline report on every reachable path through the survey's conditional steps.
+// Usage: npm run analyze:paths [-- --json]
+// Exits with 1 if a conditional step can never be shown or a condition reads an answer it can't have yet.
+
+import { surveySteps } from '../src/data/surveyData.js';
+import { analyzeSurveyPaths, conditionalSteps, getProgressTableEntry } from '../src/data/surveyPaths.js';
+
+const report = analyzeSurveyPaths(surveySteps);
+
+// Remaining-steps table for each reachable combination of shown/hidden conditional steps
+const table = report.signatures.map(signature => {
+  const { total, positions } = getProgressTableEntry(signature);
+  return {
+    shown: conditionalSteps.filter((_, i) => (signature >> i) & 1).map(step => step.id),
+    total,
+    remaining: Object.fromEntries(Object.entries(positions).map(([id, position]) => [id, total - position])),
+  };
+});
+
+if (process.argv.includes('--json')) {
+  console.log(JSON.stringify({ ...report, table }, null, 2));
+} else {
+  console.log(`Steps: ${surveySteps.length}, conditional: ${conditionalSteps.map(step => step.id).join(', ') || 'none'}`);
+  console.log(`Answers read by conditions: ${report.relevantKeys.join(', ') || 'none'} (${report.combinations} combinations)`);
+  console.log(`Progress path length: min ${report.minLength}, max ${report.maxLength}, distinct ${report.distinctLengths.join(', ')}`);
+  console.log(`Reachable shown/hidden combinations: ${table.length}`);
+  table.forEach(({ shown, total }) => console.log(`  ${total} steps, showing: ${shown.join(', ') || '(no conditional steps)'}`));
+  if (report.unreachable.length) console.log(`Unreachable steps: ${report.unreachable.join(', ')}`);
+  report.problems.forEach(problem => console.log(`Problem: ${problem}`));
+}
+
+if (report.unreachable.length || report.problems.length) process.exit(1);
@@ -0,0 +1,220 @@
+// scripts/bench-render.js
+// Render cost per survey step: mounts App in a headless DOM (jsdom), walks the survey with scripted
+// answers, and records React Profiler commits, render durations and heap growth for every step.
+// Usage: npm run bench:render [-- --runs 5] [-- --out baseline.json] [-- --baseline baseline.json]
+//        npm run bench:render:baseline   writes scripts/bench-render.baseline.json
+//        npm run bench:render:check      compares with it
+//   --out       write the result as JSON (printed to stdout otherwise)
+//   --baseline  compare with an earlier result; exits with 1 if a step commits more often, or renders
+//               more than --tolerance (default 0.25) slower by over MIN_REGRESSION_MS; refuses (exit 2)
+//               a baseline taken with another React or jsdom version, whose numbers aren't comparable
+// jsdom is pinned (JSDOM_VERSION) for the same reason: a newer one changes what a render costs. It is
+// installed next to the project, not listed in package.json: npm install --no-save jsdom@<JSDOM_VERSION>
+// The baseline is scripts/bench-render.baseline.json: create it with bench:render:baseline on a quiet
+// machine, commit it, and rewrite it the same way when React, jsdom or the survey changes on purpose.
+//
+// React runs its production profiling build (react-dom/profiling), so durations are close to what
+// users get. framer-motion animations are skipped: the walk measures rendering, not animation time.
+// App and its modules are loaded through Vite (JSX, import.meta.glob) and reloaded for every run,
+// so each run starts from empty answers (jsdom has no IndexedDB, so no draft is restored either).
+
+process.env.NODE_ENV = 'production'; // Before React loads: selects its production builds
+
+import { existsSync, readFileSync, writeFileSync } from 'node:fs';
+import { createRequire } from 'node:module';
+import { surveySteps as allSteps, SECTIONS } from '../src/data/surveyData.js';
+
+const JSDOM_VERSION = '26.1.0';
+const STEP_TIMEOUT_MS = 5000; // Section markers wait 1.8s and info steps their autoAdvanceDelay before moving on
+const POLL_MS = 10;
+const MIN_REGRESSION_MS = 0.5; // Smaller differences are timer noise
+const TEXT_ANSWERS = { userName: 'Alexandra', age: '34', email: 'alexandra@example.com' }; // Typed one key at a time
+const MAX_CHECKBOX_PICKS = 3; // multi-grid picks every non-exclusive option, so every conditional step is shown
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => { const i = args.indexOf(`--${name}`); return i === -1 ? fallback : args[i + 1]; };
+const runs = Number(option('runs', 5));
+const tolerance = Number(option('tolerance', 0.25));
+const baselinePath = option('baseline');
+if (baselinePath && !existsSync(baselinePath)) { // Before the runs: they take a while
+  console.error(`No baseline at ${baselinePath}; create it with: npm run bench:render:baseline`);
+  process.exit(2);
+}
+
+// --- Headless DOM ---
+const { JSDOM } = await import('jsdom').catch(() => {
+  console.error(`The render benchmark needs jsdom: npm install --no-save jsdom@${JSDOM_VERSION}`);
+  process.exit(1);
+});
+const jsdomVersion = createRequire(import.meta.url)('jsdom/package.json').version;
+if (jsdomVersion !== JSDOM_VERSION) {
+  console.error(`The render benchmark is pinned to jsdom ${JSDOM_VERSION}, found ${jsdomVersion}: npm install --no-save jsdom@${JSDOM_VERSION}`);
+  process.exit(1);
+}
+const dom = new JSDOM('<!doctype html><html><body><div id="root"></div></body></html>', { url: 'http://localhost/', pretendToBeVisual: true });
+const { window } = dom;
+window.scrollTo = () => {};
+window.open = () => null;
+window.navigator.sendBeacon = () => true; // Session log batches go nowhere
+for (const key of ['window', 'document', 'navigator', 'sessionStorage', 'localStorage', 'requestAnimationFrame', 'cancelAnimationFrame', 'getComputedStyle',
+  'HTMLElement', 'HTMLInputElement', 'Element', 'Node', 'Event', 'MouseEvent', 'KeyboardEvent', 'MutationObserver']) {
+  Object.defineProperty(globalThis, key, { value: window[key], configurable: true, writable: true });
+}
+globalThis.fetch = async () => new Response('', { status: 503 }); // The walk stops before submitting
+
+// React and framer-motion are loaded after the globals exist: react-dom checks for a DOM when it loads
+const React = await import('react');
+const { createRoot } = await import('react-dom/profiling');
+const { MotionGlobalConfig } = await import('framer-motion');
+MotionGlobalConfig.skipAnimations = true;
+const { createServer } = await import('vite');
+const vite = await createServer({ server: { middlewareMode: true, hmr: false }, appType: 'custom', logLevel: 'error' });
+
+// --- Walk ---
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+const byQuestion = new Map(allSteps.filter(step => step.question).map(step => [step.question, step]));
+const byTitle = new Map(SECTIONS.map(section => [section.title, allSteps.find(step => step.type === 'section-marker' && step.sectionId === section.id)]));
+const welcomeStep = allSteps.find(step => step.type === 'welcome');
+
+// The step on screen, from its question (or the welcome screen, or a section title); null between steps
+const currentStep = () => {
+  if (document.querySelector('.welcome-screen')) return welcomeStep;
+  const sectionTitle = document.querySelector('.section-header-display h2');
+  if (sectionTitle) return byTitle.get(sectionTitle.textContent) || null;
+  const heading = document.querySelector('.step-wrapper h2');
+  return (heading && byQuestion.get(heading.textContent)) || null;
+};
+
+const waitForStepChange = async (step) => {
+  for (let waited = 0; waited < STEP_TIMEOUT_MS; waited += POLL_MS) {
+    const now = currentStep();
+    if (now && now !== step) return now;
+    await sleep(POLL_MS);
+  }
+  throw new Error(`Walk stuck at step '${step.id}'`);
+};
+
+const valueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+const typeInto = async (input, text) => {
+  for (let i = 1; i <= text.length; i++) {
+    valueSetter.call(input, text.slice(0, i));
+    input.dispatchEvent(new window.Event('input', { bubbles: true }));
+    await sleep(0);
+  }
+  return text.length;
+};
+const click = async (element) => { element.click(); await sleep(0); return 1; };
+const nextButton = () => document.querySelector('.nav-button.next');
+
+// Answers the step on screen; returns the number of interactions (keystrokes and clicks)
+const answerStep = async (step) => {
+  const options = () => [...document.querySelectorAll('.step-wrapper [data-id], .step-wrapper .option-button')];
+  switch (step.type) {
+    case 'welcome': return click(document.querySelector('.welcome-button'));
+    case 'text': return (await typeInto(document.querySelector('.text-input'), TEXT_ANSWERS[step.inputKey] || 'benchmark')) + await click(nextButton());
+    case 'email': { // Typing and consent only: submitting is a network request, not rendering
+      const typed = await typeInto(document.querySelector('.text-input'), TEXT_ANSWERS.email);
+      const consent = document.querySelector('.consent-label input');
+      return typed + (consent ? await click(consent) : 0);
+    }
+    case 'multi-grid': case 'checkbox': {
+      const exclusive = step.options.filter(opt => opt.exclusive).map(opt => opt.text); // 'None' would clear the others
+      const picks = options().filter(el => !exclusive.some(text => el.textContent.endsWith(text)));
+      let count = 0;
+      for (const el of step.type === 'checkbox' ? picks.slice(0, MAX_CHECKBOX_PICKS) : picks) count += await click(el);
+      return count + await click(nextButton());
+    }
+    default: { // icon-select, yes-no-circle, single-button: the first option; most advance by themselves
+      const count = await click(options()[0]);
+      return step.autoAdvance ? count : count + await click(nextButton());
+    }
+  }
+};
+
+// --- One run ---
+const runOnce = async () => {
+  vite.moduleGraph.invalidateAll(); // Fresh answer store and section state
+  const { default: App } = await vite.ssrLoadModule('/src/App.jsx');
+  const stats = new Map(); // step id -> per-step counters
+  const statsFor = (step) => {
+    if (!stats.has(step.id)) stats.set(step.id, { id: step.id, type: step.type, options: step.options?.length || 0, interactions: 0, commits: 0, mountMs: 0, updateMs: 0, maxCommitMs: 0, heapGrowthKB: 0 });
+    return stats.get(step.id);
+  };
+  // Called in the commit phase, with the DOM already updated: the commit belongs to the step on screen
+  const onRender = (id, phase, actualDuration) => {
+    const step = currentStep();
+    if (!step) return;
+    const entry = statsFor(step);
+    entry.commits += 1;
+    entry[phase === 'mount' || entry.commits === 1 ? 'mountMs' : 'updateMs'] += actualDuration;
+    entry.maxCommitMs = Math.max(entry.maxCommitMs, actualDuration);
+  };
+
+  const container = document.getElementById('root');
+  const root = createRoot(container);
+  root.render(React.createElement(React.Profiler, { id: 'App', onRender }, React.createElement(App)));
+  let step = null;
+  for (let waited = 0; !step && waited < STEP_TIMEOUT_MS; waited += POLL_MS) { await sleep(POLL_MS); step = currentStep(); }
+  if (!step) throw new Error('App did not render the welcome screen');
+
+  while (step) {
+    globalThis.gc?.();
+    const heapBefore = process.memoryUsage().heapUsed;
+    const entry = statsFor(step);
+    entry.interactions += await answerStep(step);
+    if (step.type === 'email') { entry.heapGrowthKB = (process.memoryUsage().heapUsed - heapBefore) / 1024; break; }
+    const next = await waitForStepChange(step);
+    entry.heapGrowthKB = (process.memoryUsage().heapUsed - heapBefore) / 1024;
+    step = next;
+  }
+  root.unmount();
+  return [...stats.values()];
+};
+
+// --- Report ---
+const median = (values) => { const sorted = [...values].sort((a, b) => a - b); const mid = sorted.length >> 1; return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2; };
+const round = (value) => Math.round(value * 1000) / 1000;
+const METRICS = ['interactions', 'commits', 'mountMs', 'updateMs', 'maxCommitMs', 'heapGrowthKB'];
+
+const results = [];
+await runOnce(); // Warm-up: JIT and Vite's transform cache
+for (let i = 0; i < runs; i++) results.push(await runOnce());
+await vite.close();
+
+const steps = results[0].map(({ id, type, options }) => {
+  const samples = results.map(run => run.find(entry => entry.id === id)).filter(Boolean);
+  return { id, type, options, ...Object.fromEntries(METRICS.map(metric => [metric, round(median(samples.map(sample => sample[metric])))])) };
+});
+steps.forEach(step => { step.totalMs = round(step.mountMs + step.updateMs); step.msPerInteraction = step.interactions ? round(step.updateMs / step.interactions) : 0; });
+const report = {
+  benchmark: 'render', version: 1, runs, react: React.version, jsdom: jsdomVersion, node: process.version,
+  heapGrowth: globalThis.gc ? 'after gc' : 'without gc (run with --expose-gc)',
+  totals: { commits: steps.reduce((sum, step) => sum + step.commits, 0), totalMs: round(steps.reduce((sum, step) => sum + step.totalMs, 0)) },
+  steps,
+};
+
+const outPath = option('out');
+if (outPath) writeFileSync(outPath, JSON.stringify(report, null, 2) + '\n');
+else console.log(JSON.stringify(report, null, 2));
+
+if (baselinePath) {
+  const baselineReport = JSON.parse(readFileSync(baselinePath, 'utf-8'));
+  const mismatched = ['react', 'jsdom'].filter(name => baselineReport[name] !== report[name]);
+  if (mismatched.length) {
+    console.error(`Baseline ${baselinePath} was taken with ${mismatched.map(name => `${name} ${baselineReport[name] ?? 'unknown'}`).join(', ')}; `
+      + `this run has ${mismatched.map(name => `${name} ${report[name]}`).join(', ')}. Rewrite the baseline with --out instead of comparing.`);
+    process.exit(2);
+  }
+  if (baselineReport.node !== report.node) console.error(`Note: baseline ran on Node ${baselineReport.node}, this run on ${report.node}`);
+  const baseline = new Map(baselineReport.steps.map(step => [step.id, step]));
+  const regressions = [];
+  for (const step of steps) {
+    const before = baseline.get(step.id);
+    if (!before) continue;
+    const slower = step.totalMs - before.totalMs > MIN_REGRESSION_MS && step.totalMs > before.totalMs * (1 + tolerance);
+    const flag = step.commits > before.commits || slower ? '  <-- regression' : '';
+    if (flag) regressions.push(step.id);
+    console.error(`${step.id.padEnd(18)} ${step.type.padEnd(15)} commits ${String(before.commits).padStart(4)} -> ${String(step.commits).padEnd(4)} ms ${before.totalMs.toFixed(2).padStart(8)} -> ${step.totalMs.toFixed(2)}${flag}`);
+  }
+  if (regressions.length) { console.error(`Render regressions: ${regressions.join(', ')}`); process.exit(1); }
+}
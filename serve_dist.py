@@ -0,0 +1,202 @@
+"""
+Static server for the built survey (`dist/`), on survey_server.py's asyncio
+HTTP layer.
+
+    python serve_dist.py [--host 127.0.0.1] [--port 4173] [--dir dist]
+    python serve_dist.py --api        # plus survey_server.py's routes (/events, /funnel, ...)
+    python serve_dist.py --precompress [--dir dist]   # write .br/.gz siblings, then exit
+
+Files go out with loop.sendfile, which is os.sendfile on a plain socket:
+the bytes go from the page cache to the socket without passing through
+Python. Requests are answered like this:
+
+  encoding      a `.br` (or `.gz`) sibling is sent instead of the file when
+                the client accepts that encoding and the sibling is at least
+                as new as the file. `--precompress` writes them (brotli only
+                when the `brotli` package is installed) for text files above
+                MIN_COMPRESS_BYTES, keeping only those that come out smaller.
+                `npm run build` runs it after service_worker.py.
+  ETag          strong: a hash of the bytes sent, so each encoding has its own.
+                Cached per file by mtime and size; If-None-Match gets a 304.
+  Cache-Control asset_manifest.cache_control(): immutable for the
+                content-hashed paths (/assets/, /static/, /img/), `no-cache`
+                for index.html, sw.js and everything else.
+
+With `--api` one process serves the survey and the analytics endpoints
+together (the routes win over files). Paths outside the build directory,
+dotfiles and directories without an index.html are 404s.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+from pathlib import Path
+from urllib.parse import unquote
+
+try:
+    import brotli  # Optional: without it only .gz siblings are written
+except ImportError:
+    brotli = None
+
+import survey_server
+from asset_manifest import cache_control
+from survey_server import BACKLOG, FileBody, HttpError, handle_connection
+
+# --- Configuration ---
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4173 # Same as `vite preview`
+BUILD_DIR = Path("dist")
+ENCODINGS = (('br', '.br'), ('gzip', '.gz')) # Preferred first
+COMPRESSIBLE_SUFFIXES = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.xml', '.webmanifest')
+MIN_COMPRESS_BYTES = 1024 # Below this the headers outweigh the savings
+ETAG_CHUNK_BYTES = 1 << 20
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+# --- Precompression ---
+
+def _compressors():
+    compressors = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))] # mtime=0: same input, same bytes
+    if brotli is not None:
+        compressors.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+def precompress(build_dir=BUILD_DIR):
+    """Writes missing or outdated .br/.gz siblings; returns (siblings written, siblings up to date)."""
+    written = current = 0
+    for path in sorted(Path(build_dir).rglob('*')):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        stat = path.stat()
+        if stat.st_size < MIN_COMPRESS_BYTES:
+            continue
+        data = None
+        for extension, compress in _compressors():
+            sibling = path.with_name(path.name + extension)
+            if sibling.exists() and sibling.stat().st_mtime_ns >= stat.st_mtime_ns:
+                current += 1
+                continue
+            data = data if data is not None else path.read_bytes()
+            compressed = compress(data)
+            if len(compressed) >= len(data): # Not worth it: serve the file itself
+                sibling.unlink(missing_ok=True)
+                continue
+            tmp_path = sibling.with_name(sibling.name + '.tmp')
+            tmp_path.write_bytes(compressed)
+            os.replace(tmp_path, sibling)
+            written += 1
+    return written, current
+
+# --- Static Files ---
+
+def accepted_encodings(header):
+    """Content codings from an Accept-Encoding header, without those refused with q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+class StaticFiles:
+    """Maps URL paths to files under one directory, with strong ETags cached per file."""
+
+    def __init__(self, root=BUILD_DIR):
+        self.root = Path(root).resolve()
+        self.etags = {} # path -> (mtime_ns, size, etag)
+
+    def resolve(self, url_path):
+        """The file for a URL path, or None. Never leaves the root, never serves dotfiles."""
+        relative = unquote(url_path).lstrip('/')
+        if any(part.startswith('.') for part in relative.split('/') if part):
+            return None
+        path = (self.root / relative).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / 'index.html'
+        return path if path.is_file() else None
+
+    def etag(self, path, stat):
+        cached = self.etags.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(ETAG_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        self.etags[path] = (stat.st_mtime_ns, stat.st_size, etag)
+        return etag
+
+    async def __call__(self, request):
+        """survey_server.handle_connection fallback: GET and HEAD for files under the root."""
+        if request.method not in ('GET', 'HEAD'):
+            raise HttpError(405)
+        path = self.resolve(request.path)
+        if path is None:
+            raise HttpError(404)
+        stat = path.stat()
+        content_type, _ = mimetypes.guess_type(path.name)
+        content_type = content_type or 'application/octet-stream'
+        headers = {'Content-Type': f"{content_type}; charset=utf-8" if content_type.startswith('text/') else content_type,
+                   'Cache-Control': cache_control(request.path)}
+        if path.suffix in COMPRESSIBLE_SUFFIXES:
+            headers['Vary'] = 'Accept-Encoding'
+            accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+            for coding, extension in ENCODINGS:
+                sibling = path.with_name(path.name + extension)
+                if coding in accepted and sibling.is_file():
+                    sibling_stat = sibling.stat()
+                    if sibling_stat.st_mtime_ns >= stat.st_mtime_ns: # An older sibling is from a previous build
+                        path, stat = sibling, sibling_stat
+                        headers['Content-Encoding'] = coding
+                        break
+        headers['ETag'] = self.etag(path, stat)
+        if_none_match = request.headers.get('if-none-match', '')
+        if if_none_match == '*' or headers['ETag'] in (tag.strip() for tag in if_none_match.split(',')):
+            return 304, headers, FileBody(path, 0, send=False)
+        return 200, headers, FileBody(path, stat.st_size, send=request.method == 'GET')
+
+# --- Main Script Logic ---
+
+async def serve(host, port, files):
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(reader, writer, {}, files), host, port, backlog=BACKLOG)
+    print(f"Serving {files.root} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="PROVIT survey static server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--dir', type=Path, default=BUILD_DIR, help="build directory to serve")
+    parser.add_argument('--api', action='store_true', help="also serve survey_server.py's analytics routes")
+    parser.add_argument('--precompress', action='store_true', help="write .br/.gz siblings and exit")
+    args = parser.parse_args()
+    if not (args.dir / 'index.html').exists():
+        print(f"Error: {args.dir}/index.html not found; run `npm run build` first", file=sys.stderr)
+        sys.exit(1)
+    if args.precompress:
+        written, current = precompress(args.dir)
+        print(f"Precompressed {written} file(s), {current} already current{'' if brotli else ' (gzip only: pip install brotli)'}")
+        return
+    files = StaticFiles(args.dir)
+    try:
+        if args.api:
+            asyncio.run(survey_server.serve(args.host, args.port, lambda reader, writer: handle_connection(reader, writer, survey_server.ROUTES, files)))
+        else:
+            asyncio.run(serve(args.host, args.port, files))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+if __name__ == "__main__":
+    main()
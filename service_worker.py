@@ -0,0 +1,203 @@
+"""
+Service worker for the built survey, written to `dist/sw.js` after
+`vite build` (the `postbuild` script in package.json runs it).
+
+  precache      index.html (served for `/`), Vite's content-hashed
+                bundle (`assets/`, the lazily loaded section chunks
+                included) and the hashed public files (asset_manifest.py's
+                `static/`), cached on install. A repeat visit, online or not, loads from the
+                cache. The cache name carries a hash of the precached
+                files, so a new build installs a new cache and drops the old.
+  runtime       the `img/` variants (image_assets.py) are cached as the
+                page requests them: precaching every width would download
+                sizes this device never shows.
+  submissions   a POST to RESULTS_PATH that fails on the network goes into
+                the 'outbox' store of the 'provit-survey' IndexedDB database
+                and the page gets a 202 (App.jsx then shows the fallback
+                results page). The outbox is replayed on a Background Sync
+                `sync` event and, where the browser lacks Background Sync,
+                whenever the page loads. An entry is dropped once the server
+                answers with anything but a 5xx. A request the page aborted
+                (its RESULTS_TIMEOUT_MS deadline) is not queued: the page has
+                already shown the fallback, and replaying it would send the
+                results and email twice.
+
+The in-progress answers themselves are saved by the page
+(src/utils/answerDraft.js), in the same database.
+
+    python service_worker.py           # after `npm run build`
+    python service_worker.py dist      # explicit build directory
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+from asset_manifest import HASHED_DIR_NAME
+
+# --- Configuration ---
+BUILD_DIR = Path("dist")
+SERVICE_WORKER_NAME = "sw.js"
+PRECACHE_DIRS = ("assets", HASHED_DIR_NAME) # Content-hashed directories inside BUILD_DIR
+RUNTIME_CACHE_PREFIXES = ("/img/",)
+RESULTS_PATH = "/generate-results"
+SYNC_TAG = "submit-results"
+DB_NAME = "provit-survey" # Same database, version and stores as src/utils/answerDraft.js
+DB_VERSION = 1
+
+SERVICE_WORKER_JS = dedent("""\
+    // sw.js: generated by service_worker.py, do not edit
+    const CACHE = 'provit-precache-__VERSION__';
+    const RUNTIME_CACHE = 'provit-runtime';
+    const PRECACHE_URLS = __PRECACHE_URLS__;
+    const RUNTIME_CACHE_PREFIXES = __RUNTIME_CACHE_PREFIXES__;
+    const RESULTS_PATH = __RESULTS_PATH__;
+    const SYNC_TAG = __SYNC_TAG__;
+
+    self.addEventListener('install', (event) => {
+      event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(PRECACHE_URLS)).then(() => self.skipWaiting()));
+    });
+
+    self.addEventListener('activate', (event) => {
+      event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys.filter(key => key.startsWith('provit-precache-') && key !== CACHE).map(key => caches.delete(key))))
+        .then(() => self.clients.claim()));
+    });
+
+    // --- Outbox (IndexedDB) ---
+    const openDb = () => new Promise((resolve, reject) => {
+      const request = indexedDB.open(__DB_NAME__, __DB_VERSION__);
+      request.onupgradeneeded = () => { ['drafts', 'outbox'].forEach(name => { if (!request.result.objectStoreNames.contains(name)) request.result.createObjectStore(name, { autoIncrement: name === 'outbox' }); }); };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+    const withOutbox = (mode, action) => openDb().then(db => new Promise((resolve, reject) => {
+      const tx = db.transaction('outbox', mode);
+      const result = action(tx.objectStore('outbox'));
+      tx.oncomplete = () => resolve(result.result);
+      tx.onerror = () => reject(tx.error);
+    }));
+
+    const queueSubmission = async (request) => {
+      const entry = { url: request.url, headers: [...request.headers], body: await request.text(), queuedAt: Date.now() };
+      await withOutbox('readwrite', store => store.add(entry));
+      if (self.registration.sync) await self.registration.sync.register(SYNC_TAG).catch(() => {});
+    };
+
+    // Sends every queued submission; rejects (so Background Sync retries later) if any is still undelivered
+    const replayOutbox = async () => {
+      const keys = await withOutbox('readonly', store => store.getAllKeys());
+      let undelivered = 0;
+      for (const key of keys) {
+        const entry = await withOutbox('readonly', store => store.get(key));
+        if (!entry) continue;
+        try {
+          const response = await fetch(entry.url, { method: 'POST', headers: entry.headers, body: entry.body });
+          if (response.status >= 500) { undelivered += 1; continue; }
+        } catch { undelivered += 1; continue; }
+        await withOutbox('readwrite', store => store.delete(key)); // Delivered, or rejected for good (4xx)
+      }
+      if (undelivered) throw new Error(`${undelivered} queued submission(s) still undelivered`);
+    };
+
+    self.addEventListener('sync', (event) => {
+      if (event.tag === SYNC_TAG) event.waitUntil(replayOutbox());
+    });
+
+    // --- Fetch ---
+    const submit = async (request) => {
+      const copy = request.clone();
+      try {
+        return await fetch(request);
+      } catch (error) {
+        // The page gave up waiting (its own deadline): it shows the fallback page, so queueing would deliver twice
+        if (request.signal.aborted || error.name === 'AbortError') throw error;
+        await queueSubmission(copy);
+        return new Response(JSON.stringify({ queued: true }), { status: 202, headers: { 'Content-Type': 'application/json' } });
+      }
+    };
+
+    const cacheFirst = async (request, cacheName) => {
+      const cached = await caches.match(request);
+      if (cached) return cached;
+      const response = await fetch(request);
+      if (response.ok && cacheName) { const cache = await caches.open(cacheName); await cache.put(request, response.clone()); }
+      return response;
+    };
+
+    self.addEventListener('fetch', (event) => {
+      const { request } = event;
+      const url = new URL(request.url);
+      if (request.method === 'POST' && url.pathname === RESULTS_PATH) { event.respondWith(submit(request)); return; }
+      if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+      if (request.mode === 'navigate' && (url.pathname === '/' || url.pathname === '/index.html')) { // Other pages (privacy policy) go to the network
+        if (!self.registration.sync) event.waitUntil(replayOutbox().catch(() => {})); // No Background Sync: retry on each visit
+        event.respondWith(caches.match('/index.html').then(cached => cached || fetch(request)));
+        return;
+      }
+      if (PRECACHE_URLS.includes(url.pathname)) { event.respondWith(cacheFirst(request)); return; }
+      if (RUNTIME_CACHE_PREFIXES.some(prefix => url.pathname.startsWith(prefix))) event.respondWith(cacheFirst(request, RUNTIME_CACHE));
+    });
+""")
+
+# --- Generation ---
+
+def precache_files(build_dir=BUILD_DIR):
+    """index.html plus every file in the content-hashed directories, as (URL path, file) pairs."""
+    build_dir = Path(build_dir)
+    files = [build_dir / "index.html"]
+    for name in PRECACHE_DIRS:
+        if (build_dir / name).is_dir():
+            files += sorted(path for path in (build_dir / name).rglob('*') if path.is_file() and path.suffix != '.map')
+    return [('/' + path.relative_to(build_dir).as_posix(), path) for path in files]
+
+def render_service_worker(precache):
+    """sw.js source for the given (URL path, file) pairs."""
+    digest = hashlib.sha256()
+    for url_path, path in precache:
+        digest.update(url_path.encode('utf-8') + b'\0' + path.read_bytes())
+    values = {
+        '__VERSION__': digest.hexdigest()[:12],
+        '__PRECACHE_URLS__': json.dumps([url_path for url_path, _ in precache]),
+        '__RUNTIME_CACHE_PREFIXES__': json.dumps(list(RUNTIME_CACHE_PREFIXES)),
+        '__RESULTS_PATH__': json.dumps(RESULTS_PATH),
+        '__SYNC_TAG__': json.dumps(SYNC_TAG),
+        '__DB_NAME__': json.dumps(DB_NAME),
+        '__DB_VERSION__': str(DB_VERSION),
+    }
+    source = SERVICE_WORKER_JS
+    for marker, value in values.items():
+        source = source.replace(marker, value)
+    return source
+
+def build_service_worker(build_dir=BUILD_DIR):
+    """Writes <build_dir>/sw.js; returns the number of precached files.
+
+    Raises RuntimeError if the build directory has no index.html (no build yet).
+    """
+    build_dir = Path(build_dir)
+    if not (build_dir / "index.html").exists():
+        raise RuntimeError(f"{build_dir}/index.html not found; run `npm run build` first")
+    precache = precache_files(build_dir)
+    out_path = build_dir / SERVICE_WORKER_NAME
+    tmp_path = out_path.with_suffix('.tmp')
+    tmp_path.write_text(render_service_worker(precache), encoding='utf-8')
+    os.replace(tmp_path, out_path)
+    return len(precache)
+
+# --- Command Line ---
+
+def main():
+    build_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else BUILD_DIR
+    try:
+        count = build_service_worker(build_dir)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {build_dir / SERVICE_WORKER_NAME}: {count} precached file(s)")
+
+if __name__ == "__main__":
+    main()
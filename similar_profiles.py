@@ -0,0 +1,199 @@
+"""
+"People like you" index over submitted answer profiles.
+
+A profile is the bitset of every option a user selected across the
+closed-option steps in surveySteps (one bit per option, laid out field by
+field in schema order). Similarity is Jaccard over those bitsets, computed
+with popcounts.
+
+To avoid comparing against every stored profile, each one gets a MinHash
+signature that is split into LSH bands; profiles sharing any band bucket
+with the query are the candidates, and only they are reranked by exact
+Jaccard. Profiles are added one at a time as submissions arrive.
+
+survey_server.py feeds it: on startup from the answer store's live rows,
+then from every accepted submit event (ingest() is an event listener).
+Erasures reach it through erase(), with the same email prefixes the answer
+store uses, and erased profiles are never returned again.
+
+Usage:
+
+    index = SimilarProfiles(get_schema())
+    index.add(answers, payload={"kept": ["p21", "p6"]})
+    for similarity, profile_id, payload in index.query(answers):
+        chosen = index.chosen_options(profile_id)
+
+Limits, as built (pure Python, in memory):
+
+  - Recall is capped: a query reads only the newest MAX_BUCKET_CANDIDATES
+    profiles of each bucket it hits, so in a popular bucket older
+    look-alikes are never considered.
+  - Memory is about 240 bytes per profile: bitset words, one bucket slot
+    per band, and the email-prefix entry used for erasure. Ten million
+    profiles would take a few GB.
+  - Signatures are computed in Python. On 100k uniformly random profiles,
+    an add took about 170 us and a query about 12 ms. Clustered,
+    survey-like profiles query in about 1.2 ms at 200k. Tens of millions
+    of profiles are untested. The startup load (one add per stored row)
+    and the per-process memory would both need a native or sharded
+    implementation before that scale.
+"""
+
+import heapq
+import random
+from array import array
+
+from answer_decoder import PayloadError
+from answer_store import decode_rows, submission_row
+
+# --- Configuration ---
+NUM_HASHES = 32
+BANDS = 8 # NUM_HASHES / BANDS rows per band; ~0.5 similarity is the 50% candidate threshold
+MAX_BUCKET_CANDIDATES = 250 # Newest entries read per bucket, keeps hot buckets from dominating query time
+DEFAULT_TOP_K = 10
+HASH_SEED = 20250401 # Fixed so signatures stay comparable across processes
+
+class SimilarProfiles:
+    """Incremental MinHash/LSH index over profile bitsets, with exact Jaccard reranking."""
+
+    def __init__(self, schema, num_hashes=NUM_HASHES, bands=BANDS):
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.schema = schema
+        self.schema_version = schema.version
+        self.layout = [] # (key, kind, bit offset)
+        offset = 0
+        for key, field in schema.fields.items():
+            if field.kind in ('single', 'multi'):
+                self.layout.append((key, field.kind, offset))
+                offset += len(field.option_ids)
+        self.universe = offset
+        self.words = (self.universe + 63) // 64
+        self.rows = num_hashes // bands
+        self.bands = bands
+
+        # Each hash is a random permutation of bit positions; its MinHash is the
+        # first position (in permutation order) that is set in the profile
+        rng = random.Random(HASH_SEED)
+        self.permutations = []
+        for _ in range(num_hashes):
+            order = list(range(self.universe))
+            rng.shuffle(order)
+            self.permutations.append(order)
+
+        # Profiles are stored as 64-bit words, `self.words` per profile
+        self.profile_words = array('Q')
+        self.payloads = []
+        self.by_email = {} # Email prefix -> profile ids, for erasure
+        self.erased = set()
+        self.buckets = [{} for _ in range(bands)] # band -> {band signature: array of profile ids}
+
+    def __len__(self):
+        return len(self.payloads) - len(self.erased)
+
+    def profile_bits(self, answers):
+        bits = 0
+        for key, kind, offset in self.layout:
+            value = getattr(answers, key)
+            if value is None:
+                continue
+            bits |= (1 << value if kind == 'single' else value) << offset
+        return bits
+
+    def signature(self, bits):
+        signature = []
+        for order in self.permutations:
+            for position in order:
+                if bits >> position & 1:
+                    signature.append(position)
+                    break
+            else:
+                signature.append(-1)
+        return signature
+
+    def _band_keys(self, bits):
+        signature = self.signature(bits)
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _profile(self, profile_id):
+        start = profile_id * self.words
+        bits = 0
+        for i, word in enumerate(self.profile_words[start:start + self.words]):
+            bits |= word << (64 * i)
+        return bits
+
+    def add(self, answers, payload=None, email=0):
+        """Indexes one submission; returns its profile id. `email` is its email prefix (answer_store.email_prefix), 0 if none."""
+        bits = self.profile_bits(answers)
+        profile_id = len(self.payloads)
+        self.profile_words.extend((bits >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(self.words))
+        self.payloads.append(payload)
+        if email:
+            known = self.by_email.get(email)
+            self.by_email[email] = profile_id if known is None else (known if isinstance(known, list) else [known]) + [profile_id]
+        for band, key in enumerate(self._band_keys(bits)):
+            bucket = self.buckets[band].get(key)
+            if bucket is None:
+                bucket = self.buckets[band][key] = array('I')
+            bucket.append(profile_id)
+        return profile_id
+
+    def ingest(self, records):
+        """Event listener: indexes the answers carried by submit events (already validated by the server)."""
+        for _, event_type, _, _, extra in records:
+            if event_type == 'submit' and extra:
+                try:
+                    answers, _, email = submission_row(extra, self.schema)
+                except PayloadError:
+                    continue
+                self.add(answers, email=email)
+
+    def load(self, store):
+        """Indexes every live row of an AnswerStore (blocks and tail); returns the number added."""
+        rows = [staged for block in store.blocks for staged in decode_rows(block, store.schema, store.fields)] + store.tail
+        for answers, _, _, email in rows:
+            self.add(answers, email=email)
+        return len(rows)
+
+    def erase(self, prefixes):
+        """Drops the profiles of erased emails; returns how many."""
+        erased = 0
+        for prefix in prefixes:
+            profile_ids = self.by_email.pop(prefix, [])
+            for profile_id in profile_ids if isinstance(profile_ids, list) else [profile_ids]:
+                self.erased.add(profile_id)
+                self.payloads[profile_id] = None
+                start = profile_id * self.words
+                self.profile_words[start:start + self.words] = array('Q', bytes(8 * self.words))
+                erased += 1
+        return erased
+
+    def chosen_options(self, profile_id):
+        """A stored profile's selected options as {key: [option ids]}."""
+        bits = self._profile(profile_id)
+        chosen = {}
+        for key, _, offset in self.layout:
+            option_ids = self.schema.fields[key].option_ids
+            selected = [option_id for i, option_id in enumerate(option_ids) if bits >> (offset + i) & 1]
+            if selected:
+                chosen[key] = selected
+        return chosen
+
+    def query(self, answers, top_k=DEFAULT_TOP_K, exclude=None):
+        """Most similar stored profiles as (jaccard, profile id, payload) triples, best first."""
+        bits = self.profile_bits(answers)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(bits)):
+            bucket = self.buckets[band].get(key)
+            if bucket:
+                candidates.update(bucket[-MAX_BUCKET_CANDIDATES:])
+        candidates.discard(exclude)
+        candidates -= self.erased
+
+        scored = []
+        for profile_id in candidates:
+            other = self._profile(profile_id)
+            union = (bits | other).bit_count()
+            if union:
+                scored.append(((bits & other).bit_count() / union, profile_id))
+        return [(similarity, profile_id, self.payloads[profile_id]) for similarity, profile_id in heapq.nlargest(top_k, scored)]
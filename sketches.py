@@ -0,0 +1,315 @@
+"""
+Fixed-size sketches for the high-cardinality analytics questions, fed by the
+same event stream as funnel.py:
+
+  - distinct sessions that reached each step: one HyperLogLog per step
+  - most common answer combinations (goals, diet): a count-min sketch plus a
+    small heavy-hitter table per combination family, fed by submit events
+
+Sketches live in daily windows. Every sketch merges with another of the same
+shape (register max for HyperLogLog, cell sums for count-min), so windows
+can be combined into "this week" and files written by several server
+processes can be combined into one view. Memory per window is constant no
+matter how much traffic arrives.
+
+Events carry session ids, not emails, so "distinct users" means distinct
+survey sessions.
+
+Each process writes its live windows to its own file under data/sketches/
+(`sketches-<day>-<process token>.json`); on startup every file inside the
+retention period is loaded and merged read-only.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import os
+import secrets
+import time
+from array import array
+from pathlib import Path
+
+# --- Configuration ---
+HLL_PRECISION = 12 # 4096 registers, ~1.6% standard error
+CMS_WIDTH = 2048
+CMS_DEPTH = 4 # Overestimates by more than total/CMS_WIDTH*e with probability < e^-4
+HEAVY_HITTER_CAPACITY = 100 # Candidates tracked per family; top-N queries should stay well below this
+WINDOW_MS = 24 * 3600 * 1000 # Daily windows
+RETENTION_DAYS = 35
+HASH_KEY = b'provit-sketch-v1' # Fixed so sketches from different processes stay mergeable
+
+# Combination families: name -> answer keys that make up one combination
+COMBINATION_FAMILIES = {
+    'healthGoals': ('healthGoals',),
+    'diet': ('dietDescription', 'dietRestrictions', 'allergies'),
+}
+
+def _hash64(value, salt=b''):
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8, key=HASH_KEY, salt=salt).digest()
+    return int.from_bytes(digest, 'big')
+
+# --- Sketches ---
+
+class HyperLogLog:
+    """Distinct-count estimator in 2**precision one-byte registers."""
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+
+    def add(self, value):
+        h = _hash64(value)
+        rest_bits = 64 - self.precision
+        index = h >> rest_bits
+        rank = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1 # Leading zeros + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros: # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_dict(self):
+        return {'p': self.precision, 'registers': base64.b64encode(self.registers).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['p'], base64.b64decode(data['registers']))
+
+class CountMinSketch:
+    """Frequency estimator: never underestimates, overestimates by a bounded share of the total."""
+
+    __slots__ = ('width', 'depth', 'cells', 'total')
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, cells=None, total=0):
+        self.width = width
+        self.depth = depth
+        self.cells = array('Q', cells) if cells is not None else array('Q', bytes(8 * width * depth))
+        self.total = total
+
+    def _indexes(self, key):
+        h1, h2 = _hash64(key), _hash64(key, salt=b'h2') | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        """Adds `count` occurrences of `key` and returns its new estimate."""
+        self.total += count
+        estimate = None
+        for i in self._indexes(key):
+            self.cells[i] += count
+            estimate = self.cells[i] if estimate is None else min(estimate, self.cells[i])
+        return estimate
+
+    def estimate(self, key):
+        return min(self.cells[i] for i in self._indexes(key))
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different shapes")
+        self.cells = array('Q', map(sum, zip(self.cells, other.cells)))
+        self.total += other.total
+        return self
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'total': self.total,
+                'cells': base64.b64encode(self.cells.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        cells = array('Q')
+        cells.frombytes(base64.b64decode(data['cells']))
+        return cls(data['width'], data['depth'], cells, data['total'])
+
+class HeavyHitters:
+    """Count-min sketch plus a bounded table of the keys with the highest estimates."""
+
+    __slots__ = ('sketch', 'capacity', 'candidates', 'floor')
+
+    def __init__(self, capacity=HEAVY_HITTER_CAPACITY, sketch=None, candidates=None):
+        self.sketch = sketch or CountMinSketch()
+        self.capacity = capacity
+        self.candidates = dict(candidates or {}) # key -> estimate when last seen
+        self.floor = min(self.candidates.values()) if len(self.candidates) >= capacity else 0
+
+    def add(self, key, count=1):
+        estimate = self.sketch.add(key, count)
+        if key in self.candidates or len(self.candidates) < self.capacity:
+            self.candidates[key] = estimate
+        elif estimate > self.floor:
+            del self.candidates[min(self.candidates, key=self.candidates.get)]
+            self.candidates[key] = estimate
+            self.floor = min(self.candidates.values())
+
+    def top(self, n):
+        """The n most frequent keys as (key, estimated count), highest first."""
+        ranked = sorted(((self.sketch.estimate(key), key) for key in self.candidates), reverse=True)
+        return [(key, count) for count, key in ranked[:n]]
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        keys = self.candidates.keys() | other.candidates.keys() # Re-ranked against the merged sketch
+        ranked = sorted(((self.sketch.estimate(key), key) for key in keys), reverse=True)[:self.capacity]
+        self.candidates = {key: count for count, key in ranked}
+        self.floor = min(self.candidates.values()) if len(self.candidates) >= self.capacity else 0
+        return self
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'sketch': self.sketch.to_dict(), 'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['capacity'], CountMinSketch.from_dict(data['sketch']), data['candidates'])
+
+# --- Windows ---
+
+class SketchWindow:
+    """All sketches for one day."""
+
+    def __init__(self):
+        self.steps = {} # step id -> HyperLogLog of session ids
+        self.combinations = {family: HeavyHitters() for family in COMBINATION_FAMILIES}
+
+    def merge(self, other):
+        for step_id, hll in other.steps.items():
+            if step_id in self.steps:
+                self.steps[step_id].merge(hll)
+            else:
+                self.steps[step_id] = HyperLogLog(hll.precision, hll.registers)
+        for family, hitters in other.combinations.items():
+            self.combinations[family].merge(hitters)
+        return self
+
+    def to_dict(self):
+        return {'steps': {step_id: hll.to_dict() for step_id, hll in self.steps.items()},
+                'combinations': {family: hitters.to_dict() for family, hitters in self.combinations.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        window = cls()
+        window.steps = {step_id: HyperLogLog.from_dict(hll) for step_id, hll in data['steps'].items()}
+        for family, hitters in data['combinations'].items():
+            if family in window.combinations:
+                window.combinations[family] = HeavyHitters.from_dict(hitters)
+        return window
+
+def combination_key(schema, answers, keys):
+    """Canonical text for one answer combination: option ids in survey order, so selection order doesn't matter."""
+    parts = []
+    for key in keys:
+        value = answers.get(key)
+        if value is None:
+            continue
+        option_index = schema.fields[key].option_index
+        values = sorted(value, key=option_index.get) if isinstance(value, list) else [value]
+        parts.append(f"{key}={'+'.join(values)}")
+    return ';'.join(parts)
+
+class SketchStore:
+    """Daily sketch windows: live ones fed by ingest(), plus read-only ones loaded from disk."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.step_order = [step['id'] for step in schema.steps]
+        self.live = {} # window start (ms) -> SketchWindow
+        self.loaded = {} # window start (ms) -> SketchWindow merged from files on disk
+        self.dirty = set()
+        self.token = f"{os.getpid()}{secrets.token_hex(3)}" # Names this process's files
+
+    def _window(self, ts):
+        start = ts - ts % WINDOW_MS
+        window = self.live.get(start)
+        if window is None:
+            window = self.live[start] = SketchWindow()
+        self.dirty.add(start)
+        return window
+
+    def ingest(self, records):
+        """Folds (sid, type, step, ts, extra) records in; submit events carry the closed answers in `extra`."""
+        for sid, event_type, step_id, ts, extra in records:
+            if event_type == 'view':
+                window = self._window(ts)
+                hll = window.steps.get(step_id)
+                if hll is None:
+                    hll = window.steps[step_id] = HyperLogLog()
+                hll.add(sid)
+            elif event_type == 'submit' and extra:
+                window = self._window(ts)
+                for family, keys in COMBINATION_FAMILIES.items():
+                    key = combination_key(self.schema, extra, keys)
+                    if key:
+                        window.combinations[family].add(key)
+
+    def merged(self, days, now_ms=None):
+        """One SketchWindow covering the last `days` days (today included)."""
+        now_ms = now_ms or int(time.time() * 1000)
+        since = now_ms - now_ms % WINDOW_MS - (days - 1) * WINDOW_MS
+        result = SketchWindow()
+        for windows in (self.loaded, self.live):
+            for start, window in windows.items():
+                if start >= since:
+                    result.merge(window)
+        return result
+
+    def distinct_sessions(self, days=1, now_ms=None):
+        steps = self.merged(days, now_ms).steps
+        return [{'step': step_id, 'sessions': steps[step_id].count()} for step_id in self.step_order if step_id in steps]
+
+    def top_combinations(self, family, n=50, days=7, now_ms=None):
+        if family not in COMBINATION_FAMILIES:
+            raise KeyError(family)
+        return [{'combination': key, 'count': count} for key, count in self.merged(days, now_ms).combinations[family].top(n)]
+
+    # --- Persistence ---
+
+    def snapshot(self):
+        """Serializable copies of the windows changed since the last snapshot; cheap enough for the event loop."""
+        payloads = {start: self.live[start].to_dict() for start in self.dirty if start in self.live}
+        self.dirty.clear()
+        return payloads
+
+    def expire(self, now_ms=None):
+        now_ms = now_ms or int(time.time() * 1000)
+        cutoff = now_ms - RETENTION_DAYS * WINDOW_MS
+        for windows in (self.live, self.loaded):
+            for start in [start for start in windows if start < cutoff]:
+                del windows[start]
+
+    def load(self, sketches_dir):
+        """Merges every retained sketch file on disk into the read-only windows; returns the file count."""
+        cutoff = int(time.time() * 1000) - RETENTION_DAYS * WINDOW_MS
+        count = 0
+        for path in sorted(Path(sketches_dir).glob('sketches-*.json')):
+            start = int(path.name.split('-')[1])
+            if start < cutoff:
+                continue
+            window = SketchWindow.from_dict(json.loads(path.read_text(encoding='utf-8')))
+            if start in self.loaded:
+                self.loaded[start].merge(window)
+            else:
+                self.loaded[start] = window
+            count += 1
+        return count
+
+def write_sketch_files(payloads, token, sketches_dir):
+    """Writes snapshot() output atomically, one file per window; runs in a worker thread."""
+    sketches_dir = Path(sketches_dir)
+    sketches_dir.mkdir(parents=True, exist_ok=True)
+    for start, payload in payloads.items():
+        path = sketches_dir / f"sketches-{start}-{token}.json"
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, path)
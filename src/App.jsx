@@ -1,16 +1,24 @@
 // src/App.jsx
 // Version: Redesigned Welcome Screen, Connects final button to backend, Staggering
 
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useEffect, useMemo, useCallback, useRef, memo } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-// Import SECTIONS array and ensure surveyData path is correct
-import { surveySteps, getProgressSteps, SECTIONS, PROVIT_GRADIENT_GREEN, PROVIT_GRADIENT_BLUE } from './data/surveyData';
+// Steps load per section (survey_split.py); later steps are outlines until ensureStepLoaded() fills them in
+import { surveySteps, SECTIONS, PROVIT_GRADIENT_GREEN, PROVIT_GRADIENT_BLUE, stepRenderers, ensureStepLoaded, ensureStepsLoadedThrough, prefetchNextSection } from './data/surveySections';
+import { conditionSignature, getProgress } from './data/surveyPaths';
 import ProgressBar from './components/ProgressBar';
-import './styles/App.css';
-
-// Calculate progress steps outside component
-const actualProgressSteps = getProgressSteps(surveySteps);
-const totalProgressSteps = actualProgressSteps.length;
+import NavigationButtons from './components/NavigationButtons';
+import ResponsiveImage from './components/ResponsiveImage';
+import { assetUrl } from './utils/assets';
+import { buildFallbackResultsHtml } from './utils/fallbackResults';
+import { logEvent, closedAnswers, hashEmail, flush as flushSessionLog } from './utils/sessionLog';
+import { loadDraft, saveDraft, clearDraft } from './utils/answerDraft';
+import { getAnswers, setAnswer, updateAnswer, mergeAnswers, subscribeAnswers, useAnswer, useAnswerSelector } from './utils/answerStore';
+
+// Results request budget (ms). Past this, or on a gateway timeout, users get the fallback page
+const RESULTS_TIMEOUT_MS = 8000;
+const DEGRADED_STATUSES = [503, 504];
+const QUEUED_STATUS = 202; // Offline: the service worker queued the submission and sends it when the connection is back
 
 // --- Framer Motion Variants ---
 const stepVariants = {
@@ -18,20 +26,35 @@ const stepVariants = {
   center: { zIndex: 1, y: 0, opacity: 1 },
   exit: (direction) => ({ zIndex: 0, y: direction < 0 ? 30 : -30, opacity: 0 }),
 };
+// index.html carries a static welcome screen (prerender.py) until the first render replaces it
+const PRERENDERED_WELCOME = typeof document !== 'undefined' && document.getElementById('root')?.dataset.prerendered === 'welcome';
 const stepContentVariants = {
   hidden: { opacity: 0, y: 15 },
   visible: (i = 1) => ({ opacity: 1, y: 0, transition: { delay: i * 0.1, duration: 0.4, ease: "easeOut" }, }),
   exit: { opacity: 0, y: -10, transition: {duration: 0.2} }
 };
 
+// Decorative and static: memoized so nothing App does re-renders the eight animated elements
+const BackgroundElements = memo(() => <div className="background-elements" aria-hidden="true">{[1,2,3,4,5,6,7,8].map(i=><div key={i} className={`bg-element el-${i}`}></div>)}</div>);
+
+// Validation message under the step; reads the step's answers itself, like the step renderers
+const StepError = ({ step, validationError }) => {
+  const { id, inputKey, consentInputKey, validation } = step;
+  const answer = useAnswer(inputKey);
+  const consent = useAnswer(consentInputKey);
+  const shouldShowError = (fieldKey) => { if (!validationError) return false; const isConsentError = fieldKey === consentInputKey && !consent; const isMainInputError = fieldKey === inputKey && validation && !validation(answer); return isConsentError || isMainInputError; };
+  if (!shouldShowError(inputKey || consentInputKey)) return null;
+  return (<motion.p key={`${id}-error`} id={shouldShowError(inputKey) ? `${inputKey}-error` : `${consentInputKey}-error`} className="validation-error-msg" role="alert" custom={2.5} variants={stepContentVariants} initial="hidden" animate="visible" exit="exit">{validationError}</motion.p>);
+};
+
 function App() {
   // ============================================
   // ===== 1. STATE HOOKS ==========
   // ============================================
   const [currentStepIndex, setCurrentStepIndex] = useState(0);
-  const [answers, setAnswers] = useState({});
+  // Answers live in utils/answerStore: App reads them when it acts (getAnswers), so typing doesn't re-render it
   const [direction, setDirection] = useState(1);
-  const [showProgress, setShowProgress] = useState(true); // Changed default? Check useEffect logic
+  const [showProgress, setShowProgress] = useState(false); // Step 0 is the welcome screen, which has no progress bar
   const [validationError, setValidationError] = useState('');
   const [viewedSectionHeaders, setViewedSectionHeaders] = useState({});
   const [isLoadingResults, setIsLoadingResults] = useState(false);
@@ -41,38 +64,52 @@ function App() {
   // ==========================================================
   const currentStepData = useMemo(() => surveySteps[currentStepIndex], [currentStepIndex]);
   const currentSectionId = useMemo(() => { if (!currentStepData || ['welcome','loading','results'].includes(currentStepData.type)) return null; let activeSection = null; for(let i = currentStepIndex; i >= 0; i--) { if(surveySteps[i].type === 'section-marker' || surveySteps[i].sectionId) { activeSection = surveySteps[i].sectionId; break; }} return activeSection; }, [currentStepData, currentStepIndex]);
-  const findValidStepIndex = useCallback((startIndex, moveDirection) => { let nextIndex = startIndex + moveDirection; while (nextIndex >= 0 && nextIndex < surveySteps.length) { const step = surveySteps[nextIndex]; if (step.type === 'section-marker') { nextIndex += moveDirection; continue; } if (!step.condition || step.condition(answers)) { return nextIndex; } nextIndex += moveDirection; } return -1; }, [answers]);
-  const updateMultiSelectState = useCallback((key, optionId, isExclusive) => { if (!key) return; setAnswers(prev => { const currentArray = Array.isArray(prev[key]) ? [...prev[key]] : []; let newSelection; if (isExclusive) { newSelection = currentArray.includes(optionId) ? [] : [optionId]; } else { const exclusiveOptionId = currentStepData?.options?.find(opt => opt.exclusive)?.id; newSelection = currentArray.filter(id => id !== exclusiveOptionId); const index = newSelection.indexOf(optionId); if (index > -1) newSelection.splice(index, 1); else newSelection.push(optionId); } return { ...prev, [key]: newSelection }; }); setValidationError(''); }, [currentStepData, setAnswers, setValidationError]);
+  const goToStep = useCallback((index) => ensureStepLoaded(index).then(() => setCurrentStepIndex(index)).catch(() => setValidationError('Connection error. Please try again.')), [setValidationError]); // Moves only once the step's section has loaded
+  const findValidStepIndex = useCallback((startIndex, moveDirection) => { let nextIndex = startIndex + moveDirection; while (nextIndex >= 0 && nextIndex < surveySteps.length) { const step = surveySteps[nextIndex]; if (step.type === 'section-marker') { nextIndex += moveDirection; continue; } if (!step.condition || step.condition(getAnswers())) { return nextIndex; } nextIndex += moveDirection; } return -1; }, []);
+  const updateMultiSelectState = useCallback((key, optionId, isExclusive) => { if (!key) return; updateAnswer(key, prev => { const currentArray = Array.isArray(prev) ? [...prev] : []; let newSelection; if (isExclusive) { newSelection = currentArray.includes(optionId) ? [] : [optionId]; } else { const exclusiveOptionId = currentStepData?.options?.find(opt => opt.exclusive)?.id; newSelection = currentArray.filter(id => id !== exclusiveOptionId); const index = newSelection.indexOf(optionId); if (index > -1) newSelection.splice(index, 1); else newSelection.push(optionId); } return newSelection; }); setValidationError(''); }, [currentStepData, setValidationError]);
 
   // NEXT Button Handler
   const handleNext = useCallback(() => {
-    setValidationError(''); if (currentStepData?.validation && currentStepData.type !== 'email') { /* Validate non-email steps */ const answer = answers[currentStepData.inputKey]; if (!currentStepData.validation(answer)) { setValidationError(currentStepData.validationMessage || 'Invalid...'); return; }} setDirection(1); const nextIdx = findValidStepIndex(currentStepIndex, 1); if (nextIdx !== -1) { setCurrentStepIndex(nextIdx); }
+    setValidationError(''); if (currentStepData?.validation && currentStepData.type !== 'email') { /* Validate non-email steps */ const answer = getAnswers()[currentStepData.inputKey]; if (!currentStepData.validation(answer)) { setValidationError(currentStepData.validationMessage || 'Invalid...'); return; }} if (currentStepData?.type === 'text') logEvent('answer', currentStepData.id); /* Free text: logged without its value */ setDirection(1); const nextIdx = findValidStepIndex(currentStepIndex, 1); if (nextIdx !== -1) { goToStep(nextIdx); }
     // Submission is handled separately
-  }, [currentStepData, answers, currentStepIndex, findValidStepIndex, setValidationError]);
+  }, [currentStepData, currentStepIndex, findValidStepIndex, goToStep, setValidationError]);
 
   // SUBMIT Results Handler
+   const openResultsWindow = useCallback((html) => { const newWindow = window.open("", "_blank"); if (newWindow) { newWindow.document.open(); newWindow.document.write(html); newWindow.document.close(); } else { setValidationError("Check pop-up blocker."); } }, [setValidationError]);
    const handleSubmitResults = useCallback(async () => {
-       console.log("Submitting results..."); setValidationError('');
+       console.log("Submitting results..."); setValidationError(''); const answers = getAnswers();
        if (currentStepData?.type === 'email' && currentStepData?.validation) { /* Final email validation */ const answer = answers[currentStepData.inputKey]; const consent = currentStepData.consentInputKey ? !!answers[currentStepData.consentInputKey] : true; if (!consent) { setValidationError('Please agree...'); return; } if (!currentStepData.validation(answer)) { setValidationError(currentStepData.validationMessage || 'Provide valid email.'); return; } }
+       const emailHash = await hashEmail(answers[currentStepData?.inputKey] || ''); logEvent('submit', currentStepData?.id, { ...closedAnswers(surveySteps, answers), ...(emailHash && { emailHash }) }); flushSessionLog();
        setIsLoadingResults(true);
-       try { /* Fetch logic as before... */ const response = await fetch('http://localhost:5001/generate-results', { method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(answers) }); setIsLoadingResults(false); if (!response.ok) { let errorMsg = `Server error: ${response.status}`; try { const errData = await response.json(); errorMsg = errData.error || errorMsg; } catch(e){} console.error("Backend Error:", errorMsg); setValidationError(errorMsg); return; } const htmlResults = await response.text(); const newWindow = window.open("", "_blank"); if (newWindow) { newWindow.document.open(); newWindow.document.write(htmlResults); newWindow.document.close(); } else { setValidationError("Check pop-up blocker."); } } catch (error) { setIsLoadingResults(false); console.error("Network/Fetch Error:", error); setValidationError(`Connection error. (${error.message})`); }
-   }, [answers, currentStepData, setIsLoadingResults, setValidationError]); // Removed findValidStepIndex
+       // Hard ceiling on the wait: the timer covers both the request and reading the page
+       const controller = new AbortController();
+       const timeoutId = setTimeout(() => controller.abort(), RESULTS_TIMEOUT_MS);
+       try { const response = await fetch('http://localhost:5001/generate-results', { method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(answers), signal: controller.signal }); if (response.status === QUEUED_STATUS || DEGRADED_STATUSES.includes(response.status)) { setIsLoadingResults(false); if (response.status === QUEUED_STATUS) clearDraft(); openResultsWindow(buildFallbackResultsHtml(answers)); return; } if (!response.ok) { setIsLoadingResults(false); let errorMsg = `Server error: ${response.status}`; try { const errData = await response.json(); errorMsg = errData.error || errorMsg; } catch(e){} console.error("Backend Error:", errorMsg); setValidationError(errorMsg); return; } const htmlResults = await response.text(); setIsLoadingResults(false); clearDraft(); openResultsWindow(htmlResults); } catch (error) { setIsLoadingResults(false); if (error.name === 'AbortError') { /* Deadline hit: show the degraded page instead of waiting */ console.warn(`Results took longer than ${RESULTS_TIMEOUT_MS}ms, showing fallback page.`); openResultsWindow(buildFallbackResultsHtml(answers)); return; } console.error("Network/Fetch Error:", error); setValidationError(`Connection error. (${error.message})`); } finally { clearTimeout(timeoutId); }
+   }, [currentStepData, openResultsWindow, setIsLoadingResults, setValidationError]); // Removed findValidStepIndex
 
 
    // ======================================================
    // ===== 3. OTHER MEMOS, CALLBACKS & EFFECTS ==========
    // ======================================================
-   const currentProgressPosition = useMemo(() => { if (!currentStepData || !currentStepData.sectionId || ['welcome','loading','results','section-marker'].includes(currentStepData.type)) return 0; const indexInProg = actualProgressSteps.findIndex(step => step.id === currentStepData.id); return indexInProg >= 0 ? indexInProg + 1 : 0; }, [currentStepData, actualProgressSteps]);
+   // Progress only counts the conditional steps the current answers actually show; both lookups are O(1) table reads
+   const progressSignature = useAnswerSelector(conditionSignature); // An int: App re-renders only when a condition flips
+   const progress = useMemo(() => { const { position, total } = getProgress(progressSignature, currentStepData?.id); if (!currentStepData || !currentStepData.sectionId || ['welcome','loading','results','section-marker'].includes(currentStepData.type)) return { position: 0, total }; return { position, total }; }, [currentStepData, progressSignature]);
    const showBackButton = useMemo(() => { if (currentStepIndex === 0) return false; const prevIndex = findValidStepIndex(currentStepIndex, -1); return prevIndex >= 0 && surveySteps[prevIndex]?.type !== 'welcome'; }, [currentStepIndex, findValidStepIndex]);
-   const isNextDisabled = useMemo(() => { if (validationError) return true; if (isLoadingResults) return true; /* <<< Also disable when loading >>> */ if (!currentStepData?.validation) return false; const answer = answers[currentStepData.inputKey]; if (currentStepData.type === 'email' && currentStepData.consentInputKey && !answers[currentStepData.consentInputKey]) return true; return !currentStepData.validation(answer); }, [currentStepData, answers, validationError, isLoadingResults]); // <<< Added isLoadingResults
-   const handlePrev = useCallback(() => { if (currentStepIndex === 0) return; setValidationError(''); setDirection(-1); const prevIdx = findValidStepIndex(currentStepIndex, -1); if (prevIdx !== -1) setCurrentStepIndex(prevIdx); }, [currentStepIndex, findValidStepIndex, setValidationError]);
-   const handleInputChange = useCallback((e) => { const { name, value, type, checked } = e.target; const key = name || currentStepData?.inputKey; if (!key) return; setAnswers(prev => ({ ...prev, [key]: type === 'checkbox' ? checked : value })); if (validationError) setValidationError(''); }, [currentStepData, setAnswers, validationError, setValidationError]);
-   const handleMultiSelectClick = useCallback((optionId) => { const key = currentStepData?.inputKey; const isExclusive = currentStepData?.options?.find(opt => opt.id === optionId)?.exclusive || false; updateMultiSelectState(key, optionId, isExclusive); }, [currentStepData, updateMultiSelectState]);
-   const handleSingleSelect = useCallback((optionId) => { const key = currentStepData?.inputKey; if (!key) return; setAnswers(prev => ({ ...prev, [key]: optionId })); setValidationError(''); if (currentStepData.autoAdvance) { setTimeout(handleNext, 250); } }, [currentStepData, setAnswers, setValidationError, handleNext]);
+   const handlePrev = useCallback(() => { if (currentStepIndex === 0) return; setValidationError(''); setDirection(-1); const prevIdx = findValidStepIndex(currentStepIndex, -1); if (prevIdx !== -1) goToStep(prevIdx); }, [currentStepIndex, findValidStepIndex, goToStep, setValidationError]);
+   const handleInputChange = useCallback((e) => { const { name, value, type, checked } = e.target; const key = name || currentStepData?.inputKey; if (!key) return; setAnswer(key, type === 'checkbox' ? checked : value); if (validationError) setValidationError(''); }, [currentStepData, validationError, setValidationError]);
+   const handleMultiSelectClick = useCallback((optionId) => { const key = currentStepData?.inputKey; const isExclusive = currentStepData?.options?.find(opt => opt.id === optionId)?.exclusive || false; updateMultiSelectState(key, optionId, isExclusive); logEvent('answer', currentStepData?.id, optionId); }, [currentStepData, updateMultiSelectState]);
+   const handleSingleSelect = useCallback((optionId) => { const key = currentStepData?.inputKey; if (!key) return; setAnswer(key, optionId); setValidationError(''); logEvent('answer', currentStepData.id, optionId); if (currentStepData.autoAdvance) { setTimeout(handleNext, 250); } }, [currentStepData, setValidationError, handleNext]);
 
   // Effects
-  useEffect(() => { /* Section marker effect */ if (currentStepData?.type === 'section-marker') { const sectionId = currentStepData.sectionId; const alreadyViewed = viewedSectionHeaders[sectionId]; if (!alreadyViewed) { setViewedSectionHeaders(prev => ({ ...prev, [sectionId]: true })); } const shouldDelay = !alreadyViewed && direction === 1; const nextAction = () => { const nextRealStepIndex = findValidStepIndex(currentStepIndex, direction); if (nextRealStepIndex !== -1 && nextRealStepIndex !== currentStepIndex) { setCurrentStepIndex(nextRealStepIndex); } else if (direction === -1) { const prevRealIndex = findValidStepIndex(currentStepIndex - 1, -1); if (prevRealIndex !== -1) setCurrentStepIndex(prevRealIndex); }}; if (shouldDelay) { const timer = setTimeout(nextAction, 1800); return () => clearTimeout(timer); } else { nextAction(); }}}, [currentStepIndex, currentStepData, findValidStepIndex, direction, viewedSectionHeaders, setViewedSectionHeaders]);
-  useEffect(() => { /* Other effects */ let timerId = null; const advanceDelay = currentStepData?.autoAdvanceDelay; if (advanceDelay && currentStepData.type === 'info') timerId = setTimeout(handleNext, advanceDelay); if (currentStepData?.type === 'loading' && !isLoadingResults) timerId = setTimeout(() => { const rIdx = surveySteps.findIndex(s => s.type === 'results'); if (rIdx > -1) setCurrentStepIndex(rIdx); else console.error("No results!"); }, 2000); const isProgressRelevant = currentStepIndex > 0 && !['welcome','loading','results','section-marker'].includes(currentStepData?.type); setShowProgress(isProgressRelevant); window.scrollTo({ top: 0, behavior: 'smooth' }); return () => { if (timerId) clearTimeout(timerId); }; }, [currentStepIndex, currentStepData, handleNext, isLoadingResults]);
+  const lastViewedIndex = useRef(-1);
+  const welcomePrerendered = useRef(PRERENDERED_WELCOME);
+  useEffect(() => { /* Only the first welcome render takes over static markup */ if (currentStepIndex > 0) welcomePrerendered.current = false; }, [currentStepIndex]);
+  useEffect(() => { /* Session log: one 'view' per step change */ if (!currentStepData || lastViewedIndex.current === currentStepIndex) return; lastViewedIndex.current = currentStepIndex; logEvent('view', currentStepData.id, direction); }, [currentStepIndex, currentStepData, direction]);
+  useEffect(() => { /* Section marker effect */ if (currentStepData?.type === 'section-marker') { const sectionId = currentStepData.sectionId; const alreadyViewed = viewedSectionHeaders[sectionId]; if (!alreadyViewed) { setViewedSectionHeaders(prev => ({ ...prev, [sectionId]: true })); } const shouldDelay = !alreadyViewed && direction === 1; const nextAction = () => { const nextRealStepIndex = findValidStepIndex(currentStepIndex, direction); if (nextRealStepIndex !== -1 && nextRealStepIndex !== currentStepIndex) { goToStep(nextRealStepIndex); } else if (direction === -1) { const prevRealIndex = findValidStepIndex(currentStepIndex - 1, -1); if (prevRealIndex !== -1) goToStep(prevRealIndex); }}; if (shouldDelay) { const timer = setTimeout(nextAction, 1800); return () => clearTimeout(timer); } else { nextAction(); }}}, [currentStepIndex, currentStepData, findValidStepIndex, goToStep, direction, viewedSectionHeaders, setViewedSectionHeaders]);
+  useEffect(() => { /* Other effects */ let timerId = null; const advanceDelay = currentStepData?.autoAdvanceDelay; if (advanceDelay && currentStepData.type === 'info') timerId = setTimeout(handleNext, advanceDelay); if (currentStepData?.type === 'loading' && !isLoadingResults) timerId = setTimeout(() => { const rIdx = surveySteps.findIndex(s => s.type === 'results'); if (rIdx > -1) goToStep(rIdx); else console.error("No results!"); }, 2000); const isProgressRelevant = currentStepIndex > 0 && !['welcome','loading','results','section-marker'].includes(currentStepData?.type); setShowProgress(isProgressRelevant); window.scrollTo({ top: 0, behavior: 'smooth' }); return () => { if (timerId) clearTimeout(timerId); }; }, [currentStepIndex, currentStepData, handleNext, goToStep, isLoadingResults]);
+  useEffect(() => { /* Restore answers from an earlier, unfinished visit (IndexedDB) */ loadDraft().then(draft => { if (!draft) return; mergeAnswers(draft.answers); if (draft.stepIndex > 0 && draft.stepIndex < surveySteps.length) { /* Earlier sections too: closedAnswers and the fallback page read their steps */ ensureStepsLoadedThrough(draft.stepIndex).then(() => { setDirection(1); setCurrentStepIndex(draft.stepIndex); }).catch(() => setValidationError('Connection error. Please try again.')); } }); }, [setValidationError]);
+  useEffect(() => { /* Keep the draft current; nothing to keep once results are on their way */ if (currentStepIndex === 0 || ['loading', 'results'].includes(currentStepData?.type)) return; const save = () => saveDraft(getAnswers(), currentStepIndex); save(); return subscribeAnswers(save); }, [currentStepIndex, currentStepData]);
+  useEffect(() => { /* Fetch the next section while this step is answered */ prefetchNextSection(currentStepIndex); }, [currentStepIndex]);
 
   // Animation Variants
   const variants = { enter: (d) => ({ y: d > 0 ? 20 : -20, opacity: 0 }), center: { zIndex: 1, y: 0, opacity: 1 }, exit: (d) => ({ zIndex: 0, y: d < 0 ? 20 : -20, opacity: 0 }), };
@@ -86,7 +123,7 @@ function App() {
       if (isLoadingResults) {
           return (
               <div className="question-step loader" aria-live="assertive">
-                  <img src="/provit-icon.png" alt="" /> {/* Ensure icon is in public */}
+                  <img src={assetUrl("/provit-icon.png")} alt="" /> {/* Hashed path from asset_manifest.py */}
                   <p>Generating your personalized results...</p>
               </div>
            );
@@ -97,10 +134,7 @@ function App() {
 
     // Standard step display
     if (!currentStepData) return <div className="question-step">Loading...</div>;
-    const { type, id, question, subText, inputKey } = currentStepData;
-    const hasActiveError = !!validationError;
-    const currentAnswer = answers[inputKey]; // Needed for shouldShowError maybe
-    const shouldShowError = (fieldKey) => { if (!hasActiveError) return false; const isConsentError = fieldKey === currentStepData?.consentInputKey && !answers[currentStepData?.consentInputKey]; const isMainInputError = fieldKey === inputKey && currentStepData?.validation && !currentStepData.validation(currentAnswer); return isConsentError || isMainInputError;};
+    const { type, id, question, subText } = currentStepData;
 
      // Render main content structure with stagger
      return (
@@ -108,10 +142,10 @@ function App() {
         {/* Welcome screen handles its own animation */}
         {type !== 'welcome' && question && ( <motion.h2 key={`${id}-question`} custom={1} variants={stepContentVariants} initial="hidden" animate="visible" exit="exit">{question}</motion.h2> )}
         {type !== 'welcome' && subText && ( <motion.p key={`${id}-subtext`} className="sub-text" custom={1.5} variants={stepContentVariants} initial="hidden" animate="visible" exit="exit">{subText}</motion.p> )}
-        <motion.div key={`${id}-options`} custom={2} variants={stepContentVariants} initial="hidden" animate="visible" exit="exit">
+        <motion.div key={`${id}-options`} custom={2} variants={stepContentVariants} initial={type === 'welcome' && welcomePrerendered.current ? false : 'hidden'} animate="visible" exit="exit"> {/* The prerendered welcome is already on screen */}
           {renderOptions()}
         </motion.div>
-        {shouldShowError(inputKey || currentStepData?.consentInputKey) && (<motion.p key={`${id}-error`} id={shouldShowError(inputKey)? `${inputKey}-error` : `${currentStepData.consentInputKey}-error`} className="validation-error-msg" role="alert" custom={2.5} variants={stepContentVariants} initial="hidden" animate="visible" exit="exit">{validationError}</motion.p> )}
+        <StepError step={currentStepData} validationError={validationError} />
        </motion.div>
      );
   };
@@ -120,10 +154,7 @@ function App() {
   // Helper function to render just the options/input part of a step
   const renderOptions = () => {
     if (!currentStepData || isLoadingResults) return null;
-    const { type, id, options = [], inputKey, gridColumns, placeholder, inputType='text', consentText, consentInputKey, title, text, buttonText } = currentStepData; // Get all props
-    const currentAnswer = answers[inputKey];
-    const hasActiveError = !!validationError; // Get error state
-    const shouldShowError = (fieldKey) => { /* simplified for context */ };
+    const { type, title, text, description, buttonText } = currentStepData; // Question steps get the whole step via stepRenderers
 
     switch (type) {
         case 'welcome': // <<< UPDATED: Render Welcome content via this helper >>>
@@ -131,24 +162,22 @@ function App() {
                   <div className="welcome-screen"> {/* Outer container */}
                       <div className="welcome-content">
                            <div className="welcome-text">
-                               <img src="/provit-logo-white.png" alt="PROVIT Logo" className="welcome-logo" />
+                               <ResponsiveImage src="/provit-logo-white.png" alt="PROVIT Logo" className="welcome-logo" sizes="96px" priority />
                                <h1 className="welcome-title">{title || 'Nutrition tailored...'}</h1>
                                <p className="welcome-tagline">{text || "Let's find..."}</p>
-                               <p className="welcome-description">Answer a few short questions about your goals, diet, and lifestyle, and get a personalised recommendation in minutes. Start your journey to better health today!</p>
+                               {description && <p className="welcome-description">{description}</p>}
                                 <button className="welcome-button" onClick={handleNext}>{buttonText || "Let's Get Started"}</button>
                            </div>
                            <div className="welcome-image-container">
-                               <img src="/provit-hero-image.png" alt="Personalized vitamins" className="welcome-hero-image" /> {/* Make sure image exists */}
+                               <ResponsiveImage src="/provit-hero-image.png" alt="Personalized vitamins" className="welcome-hero-image" sizes="(max-width: 850px) 80vw, 40vh" priority /> {/* Variants from image_assets.py */}
                            </div>
                       </div>
                  </div>
              );
 
-         case 'text': case 'email': return ( <div className="text-input-container"><input id={inputKey || id} type={inputType} name={inputKey} placeholder={placeholder} value={currentAnswer || ''} onChange={handleInputChange} className={`text-input ${!!validationError && (!currentStepData.validation || !currentStepData.validation(currentAnswer)) ? 'error' : ''}`} aria-invalid={!!validationError && (!currentStepData.validation || !currentStepData.validation(currentAnswer))} aria-describedby={!!validationError ? `${inputKey}-error` : undefined} autoFocus={id !== 'email'} key={id} />{type === 'email' && consentInputKey && (<><label className="consent-label"><input type="checkbox" name={consentInputKey} checked={!!answers[consentInputKey]} onChange={handleInputChange} aria-describedby={!!validationError && !answers[consentInputKey] ? `${consentInputKey}-error` : undefined}/> <span dangerouslySetInnerHTML={{ __html: consentText?.replace('Privacy Policy', '<a href="/privacy-policy" target="_blank" rel="noopener noreferrer">Privacy Policy</a>') || "I agree."}}></span></label></>)}</div> );
-         case 'icon-select': case 'yes-no-circle': case 'single-button': case 'multi-grid': case 'checkbox': { const isYesNo = type === 'yes-no-circle'; const isMulti = type === 'multi-grid' || type === 'checkbox'; const isButtonLike = !isYesNo; const El = isButtonLike ? 'button' : 'span'; const isGrid = type === 'multi-grid' || (type === 'checkbox' && !!gridColumns); const containerClass = isGrid ? 'options-grid-container' : (['icon-select', 'yes-no-circle'].includes(type) ? 'options-icon-container' : 'options-container'); const gridStyle = isGrid ? { gridTemplateColumns: `repeat(${gridColumns || 3}, 1fr)` } : {}; const C = 'div'; return (<C className={containerClass} style={gridStyle} role={isYesNo ? 'radiogroup': (isMulti ? 'group' : undefined)} aria-labelledby={currentStepData?.question ? `${id}-q`:undefined}>{options.map((opt, idx) => { const isSel = isMulti ? (Array.isArray(currentAnswer) && currentAnswer.includes(opt.id)) : (currentAnswer === opt.id); const clickH = isMulti ? ()=>handleMultiSelectClick(opt.id) : ()=>handleSingleSelect(opt.id); const className = `${isButtonLike?'option-button':'yes-no-option'} ${isGrid?'grid-item':''} ${type==='icon-select'?'icon-select-option':''} ${type==='checkbox'?'checkbox-option-simplified':''} ${isSel ? 'selected' : ''}`; return (<El key={opt.id} className={className} onClick={clickH} type={El==='button'?'button':undefined} role={isYesNo?'radio':(isMulti?'checkbox':undefined)} aria-checked={isYesNo || isMulti?isSel:undefined} tabIndex={isYesNo?((currentAnswer==null&&idx===0)||isSel?0:-1):0} onKeyDown={e=>{if(e.key===' '||e.key==='Enter'){e.preventDefault();clickH();}}} data-id={isYesNo?opt.id:undefined}>{opt.icon&&<span className={`icon ${type==='icon-select' ? 'large-icon' : ''}`} aria-hidden="true">{opt.icon}</span>}<span>{opt.text}</span></El>);})}</C>); }
          // Info, Loading, Results don't have standard options
          case 'info': case 'loading': case 'results': return null;
-        default: return null;
+        default: { const StepRenderer = stepRenderers[type]; /* components/steps/, see renderers.js */ return StepRenderer ? <StepRenderer step={currentStepData} validationError={validationError} onInputChange={handleInputChange} onSelect={handleSingleSelect} onToggle={handleMultiSelectClick} /> : null; }
     }
   }; // End renderOptions
 
@@ -157,12 +186,12 @@ function App() {
   // ======================================
   return (
     <>
-      <div className="background-elements" aria-hidden="true">{[1,2,3,4,5,6,7,8].map(i=><div key={i} className={`bg-element el-${i}`}></div>)}</div>
+      <BackgroundElements />
       <div className="survey-container">
-          <header className="survey-header"><img src="/provit-logo-white.png" alt="PROVIT Logo" /></header>
+          <header className="survey-header"><ResponsiveImage src="/provit-logo-white.png" alt="PROVIT Logo" sizes="84px" priority /></header>
           <div className="section-nav-container" aria-label="Survey Sections">{SECTIONS.map((sec) => (<div key={sec.id} className={`section-nav-item ${currentSectionId === sec.id ? 'active' : ''} ${viewedSectionHeaders[sec.id] ? 'viewed' : ''}`}>{sec.title}</div>))}</div>
           <div className='survey-header-spacer'></div>
-          <AnimatePresence>{showProgress && <motion.div initial={{ opacity: 0, height: 0 }} animate={{ opacity: 1, height: 'auto' }} exit={{ opacity: 0, height: 0 }} transition={{ duration: 0.3 }} style={{ width: '100%', overflow: 'hidden' }}><ProgressBar current={currentProgressPosition} total={totalProgressSteps} /></motion.div>}</AnimatePresence>
+          <AnimatePresence>{showProgress && <motion.div initial={{ opacity: 0, height: 0 }} animate={{ opacity: 1, height: 'auto' }} exit={{ opacity: 0, height: 0 }} transition={{ duration: 0.3 }} style={{ width: '100%', overflow: 'hidden' }}><ProgressBar current={progress.position} total={progress.total} /></motion.div>}</AnimatePresence>
 
           <div className='step-wrapper'>
               <AnimatePresence initial={false} custom={direction} mode="wait">
@@ -176,15 +205,7 @@ function App() {
           <AnimatePresence>
               {currentStepData && !['welcome', 'loading', 'results', 'info', 'section-marker'].includes(currentStepData.type) && !(currentStepData.autoAdvance && !currentStepData.inputKey) && (
                <motion.div className={`navigation-buttons ${!showBackButton ? 'center' : ''}`} initial={{ opacity: 0, y: 10 }} animate={{ opacity: 1, y: 0 }} exit={{ opacity: 0, y: 10 }} transition={{ delay: 0.4, duration: 0.4}}>
-                    {showBackButton && (<button className="nav-button prev" onClick={handlePrev} type="button">Back</button>)}
-                    {!(currentStepData.autoAdvance && ['single-button', 'yes-no-circle','icon-select'].includes(currentStepData.type)) && (
-                      <button className={`nav-button next ${currentStepData.type === 'email' ? 'submit' : ''}`}
-                           onClick={currentStepData.type === 'email' ? handleSubmitResults : handleNext} // Calls correct handler
-                           type="button"
-                           disabled={isNextDisabled || isLoadingResults}> {/* Correct disable check */}
-                               {isLoadingResults ? 'Generating...' : (currentStepData.buttonText || 'Continue')} {/* Correct text */}
-                        </button>
-                    )}
+                    <NavigationButtons step={currentStepData} showBackButton={showBackButton} validationError={validationError} isLoadingResults={isLoadingResults} onPrev={handlePrev} onNext={handleNext} onSubmit={handleSubmitResults} />
                </motion.div>
               )}
           </AnimatePresence>
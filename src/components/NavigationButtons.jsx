@@ -0,0 +1,24 @@
+// src/components/NavigationButtons.jsx
+import React, { memo } from 'react';
+import { useAnswer } from '../utils/answerStore';
+
+// Back / Continue (or Submit on the email step). Subscribes to the step's own answers for the
+// disabled state, so typing doesn't re-render App to update it.
+const NavigationButtons = memo(({ step, showBackButton, validationError, isLoadingResults, onPrev, onNext, onSubmit }) => {
+  const answer = useAnswer(step.inputKey);
+  const consent = useAnswer(step.consentInputKey);
+  const missingConsent = step.type === 'email' && step.consentInputKey && !consent;
+  const isNextDisabled = !!validationError || isLoadingResults || (!!step.validation && (missingConsent || !step.validation(answer)));
+  return (
+    <>
+      {showBackButton && (<button className="nav-button prev" onClick={onPrev} type="button">Back</button>)}
+      {!(step.autoAdvance && ['single-button', 'yes-no-circle', 'icon-select'].includes(step.type)) && (
+        <button className={`nav-button next ${step.type === 'email' ? 'submit' : ''}`} onClick={step.type === 'email' ? onSubmit : onNext} type="button" disabled={isNextDisabled}>
+          {isLoadingResults ? 'Generating...' : (step.buttonText || 'Continue')}
+        </button>
+      )}
+    </>
+  );
+});
+
+export default NavigationButtons;
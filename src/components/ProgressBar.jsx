@@ -1,6 +1,5 @@
 // src/components/ProgressBar.jsx
 import React from 'react';
-import '../styles/App.css'; // Import shared styles
 
 const ProgressBar = ({ current, total }) => {
   // current is 1-based index of current step in progress
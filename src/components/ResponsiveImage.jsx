@@ -0,0 +1,34 @@
+// src/components/ResponsiveImage.jsx
+import React from 'react';
+import { assetUrl } from '../utils/assets';
+
+// Written by image_assets.py (run by populate_project.py); the glob is empty when the stage hasn't run yet
+const manifests = import.meta.glob('../data/imageManifest.json', { eager: true, import: 'default' });
+const imageManifest = Object.values(manifests)[0] || {};
+
+// <img> for a file in public/ (at its content-hashed path), upgraded to a <picture> with AVIF/WebP srcsets when the manifest has variants.
+// Width and height come from the manifest so the browser reserves the image's space before it loads.
+const ResponsiveImage = ({ src, sizes = '100vw', priority = false, ...imgProps }) => {
+  const entry = imageManifest[src];
+  const img = (
+    <img
+      src={assetUrl(src)}
+      width={entry?.width}
+      height={entry?.height}
+      loading={priority ? 'eager' : 'lazy'}
+      fetchPriority={priority ? 'high' : undefined} // The hero image is the largest contentful paint on mobile
+      decoding="async"
+      {...imgProps}
+    />
+  );
+  const sources = Object.entries(entry?.srcset || {});
+  if (!sources.length) return img;
+  return (
+    <picture>
+      {sources.map(([type, srcSet]) => <source key={type} type={type} srcSet={srcSet} sizes={sizes} />)}
+      {img}
+    </picture>
+  );
+};
+
+export default ResponsiveImage;
@@ -0,0 +1,27 @@
+// src/components/steps/ChoiceStep.jsx
+import React, { memo } from 'react';
+import { useAnswer } from '../../utils/answerStore';
+
+// Option steps: 'icon-select', 'yes-no-circle' and 'single-button' pick one, 'multi-grid' and 'checkbox' pick several
+const ChoiceStep = memo(({ step, onSelect, onToggle }) => {
+  const { type, id, options = [], inputKey, gridColumns, question } = step;
+  const answer = useAnswer(inputKey);
+  const isYesNo = type === 'yes-no-circle';
+  const isMulti = type === 'multi-grid' || type === 'checkbox';
+  const El = isYesNo ? 'span' : 'button';
+  const isGrid = type === 'multi-grid' || (type === 'checkbox' && !!gridColumns);
+  const containerClass = isGrid ? 'options-grid-container' : (['icon-select', 'yes-no-circle'].includes(type) ? 'options-icon-container' : 'options-container');
+  const gridStyle = isGrid ? { gridTemplateColumns: `repeat(${gridColumns || 3}, 1fr)` } : {};
+  return (
+    <div className={containerClass} style={gridStyle} role={isYesNo ? 'radiogroup' : (isMulti ? 'group' : undefined)} aria-labelledby={question ? `${id}-q` : undefined}>
+      {options.map((opt, idx) => {
+        const isSel = isMulti ? (Array.isArray(answer) && answer.includes(opt.id)) : (answer === opt.id);
+        const clickH = isMulti ? () => onToggle(opt.id) : () => onSelect(opt.id);
+        const className = `${isYesNo ? 'yes-no-option' : 'option-button'} ${isGrid ? 'grid-item' : ''} ${type === 'icon-select' ? 'icon-select-option' : ''} ${type === 'checkbox' ? 'checkbox-option-simplified' : ''} ${isSel ? 'selected' : ''}`;
+        return (<El key={opt.id} className={className} onClick={clickH} type={El === 'button' ? 'button' : undefined} role={isYesNo ? 'radio' : (isMulti ? 'checkbox' : undefined)} aria-checked={isYesNo || isMulti ? isSel : undefined} tabIndex={isYesNo ? ((answer == null && idx === 0) || isSel ? 0 : -1) : 0} onKeyDown={e => { if (e.key === ' ' || e.key === 'Enter') { e.preventDefault(); clickH(); } }} data-id={isYesNo ? opt.id : undefined}>{opt.icon && <span className={`icon ${type === 'icon-select' ? 'large-icon' : ''}`} aria-hidden="true">{opt.icon}</span>}<span>{opt.text}</span></El>);
+      })}
+    </div>
+  );
+});
+
+export default ChoiceStep;
@@ -0,0 +1,20 @@
+// src/components/steps/TextStep.jsx
+import React, { memo } from 'react';
+import { useAnswer } from '../../utils/answerStore';
+
+// 'text' and 'email' steps: one input, plus the consent checkbox on the email step.
+// Subscribed to its own inputKeys only, so a keystroke re-renders this and nothing else.
+const TextStep = memo(({ step, validationError, onInputChange }) => {
+  const { type, id, inputKey, placeholder, inputType = 'text', consentText, consentInputKey, validation } = step;
+  const answer = useAnswer(inputKey);
+  const consent = useAnswer(consentInputKey);
+  const invalid = !!validationError && (!validation || !validation(answer));
+  return (
+    <div className="text-input-container">
+      <input id={inputKey || id} type={inputType} name={inputKey} placeholder={placeholder} value={answer || ''} onChange={onInputChange} className={`text-input ${invalid ? 'error' : ''}`} aria-invalid={invalid} aria-describedby={!!validationError ? `${inputKey}-error` : undefined} autoFocus={id !== 'email'} key={id} />
+      {type === 'email' && consentInputKey && (<label className="consent-label"><input type="checkbox" name={consentInputKey} checked={!!consent} onChange={onInputChange} aria-describedby={!!validationError && !consent ? `${consentInputKey}-error` : undefined}/> <span dangerouslySetInnerHTML={{ __html: consentText?.replace('Privacy Policy', '<a href="/privacy-policy" target="_blank" rel="noopener noreferrer">Privacy Policy</a>') || "I agree."}}></span></label>)}
+    </div>
+  );
+});
+
+export default TextStep;
@@ -0,0 +1,20 @@
+// src/components/steps/renderers.js
+// Generated by survey_split.py from src/data/surveyData.js (source 515875f85716).
+// Do not edit: change surveyData.js and rerun `python survey_split.py`.
+
+import ChoiceStep from './ChoiceStep.jsx';
+import TextStep from './TextStep.jsx';
+
+// Step type -> renderer component; sectionRendererLoaders add the rest as their sections load
+export const stepRenderers = {
+  "text": TextStep,
+  "email": TextStep,
+  "icon-select": ChoiceStep,
+  "yes-no-circle": ChoiceStep,
+  "single-button": ChoiceStep,
+  "multi-grid": ChoiceStep,
+  "checkbox": ChoiceStep,
+};
+
+export const sectionRendererLoaders = {
+};
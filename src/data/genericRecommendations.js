@@ -0,0 +1,19 @@
+// src/data/genericRecommendations.js
+// Generic suggestions per health goal, for the fallback results page (utils/fallbackResults.js).
+// Static on purpose: the page is shown when the results backend is slow or down, so it can't ask it.
+// Not matched to diet, allergies or medication; the page says so.
+
+export const GENERIC_RECOMMENDATIONS = {
+  g_sleep: [ { name: 'Magnesium', reason: 'contributes to the normal functioning of the nervous system' }, { name: 'Vitamin B6', reason: 'contributes to normal psychological function' } ],
+  g_bones: [ { name: 'Vitamin D3', reason: 'contributes to the maintenance of normal bones' }, { name: 'Calcium', reason: 'is needed for the maintenance of normal bones' }, { name: 'Vitamin K2', reason: 'contributes to the maintenance of normal bones' } ],
+  g_joints: [ { name: 'Vitamin C', reason: 'contributes to normal collagen formation for the normal function of cartilage' }, { name: 'Manganese', reason: 'contributes to the normal formation of connective tissue' } ],
+  g_heart: [ { name: 'Omega-3 (EPA & DHA)', reason: 'contributes to the normal function of the heart' }, { name: 'Vitamin B1', reason: 'contributes to the normal function of the heart' } ],
+  g_hair: [ { name: 'Biotin', reason: 'contributes to the maintenance of normal hair' }, { name: 'Zinc', reason: 'contributes to the maintenance of normal hair' } ],
+  g_skin: [ { name: 'Vitamin C', reason: 'contributes to normal collagen formation for the normal function of the skin' }, { name: 'Biotin', reason: 'contributes to the maintenance of normal skin' } ],
+  g_stress: [ { name: 'Vitamin B complex', reason: 'contributes to normal psychological function' }, { name: 'Magnesium', reason: 'contributes to the reduction of tiredness and fatigue' } ],
+  g_fitness: [ { name: 'Magnesium', reason: 'contributes to normal muscle function' }, { name: 'Protein', reason: 'contributes to the growth and maintenance of muscle mass' } ],
+  g_digestion: [ { name: 'Calcium', reason: 'contributes to the normal function of digestive enzymes' }, { name: 'Dietary fibre', reason: 'supports regular digestion' } ],
+  g_brain: [ { name: 'Omega-3 (DHA)', reason: 'contributes to the maintenance of normal brain function' }, { name: 'Iodine', reason: 'contributes to normal cognitive function' } ],
+  g_immunity: [ { name: 'Vitamin C', reason: 'contributes to the normal function of the immune system' }, { name: 'Vitamin D3', reason: 'contributes to the normal function of the immune system' }, { name: 'Zinc', reason: 'contributes to the normal function of the immune system' } ],
+  g_energy: [ { name: 'Iron', reason: 'contributes to the reduction of tiredness and fatigue' }, { name: 'Vitamin B12', reason: 'contributes to normal energy-yielding metabolism' } ],
+};
@@ -0,0 +1,13 @@
+// src/data/sections/diet.js
+// Generated by survey_split.py from src/data/surveyData.js (source 515875f85716).
+// Do not edit: change surveyData.js and rerun `python survey_split.py`.
+export default [
+  { id: "start-diet", type: "section-marker", sectionId: "diet" },
+  { id: "diet_describe", sectionId: "diet", type: "single-button", question: "How would you describe your diet?", options: [{ id: "d_omnivore", text: "I eat almost everything" }, { id: "d_plant_based", text: "Prefer plant-based foods" }, { id: "d_vegetarian", text: "Vegetarian" }, { id: "d_vegan", text: "Vegan" }, { id: "d_other", text: "Other" }], inputKey: "dietDescription", autoAdvance: true },
+  { id: "diet_meat", sectionId: "diet", type: "single-button", question: "How often do you eat meat?", options: [{ id: "meat_never", text: "Never" }, { id: "meat_rarely", text: "Rarely" }, { id: "meat_1_2_week", text: "Once/twice per week" }, { id: "meat_3_plus_week", text: "Three times per week or more" }], inputKey: "meatFrequency", autoAdvance: true, condition: (a) => !['d_vegan', 'd_vegetarian'].includes(a.dietDescription) },
+  { id: "diet_fish", sectionId: "diet", type: "single-button", question: "How often do you eat fish/seafood?", options: [{ id: "fish_never", text: "Never" }, { id: "fish_rarely", text: "Rarely" }, { id: "fish_1_week", text: "Once per week" }, { id: "fish_2_plus_week", text: "Twice per week or more" }], inputKey: "fishFrequency", autoAdvance: true },
+  { id: "diet_dairy", sectionId: "diet", type: "single-button", question: "How often do you eat dairy?", options: [{ id: "dairy_never", text: "Never" }, { id: "dairy_rarely", text: "Rarely" }, { id: "dairy_1_2_week", text: "Once/twice per week" }, { id: "dairy_3_plus_week", text: "Three times per week or more" }], inputKey: "dairyFrequency", autoAdvance: true },
+  { id: "diet_veg", sectionId: "diet", type: "single-button", question: "Daily fruit/veg serves?", options: [{ id: "veg_0", text: "Almost none" }, { id: "veg_1_2", text: "1-2 serves" }, { id: "veg_3_plus", text: "3 serves or more" }], inputKey: "vegServings", autoAdvance: true },
+  { id: "diet_restrictions", sectionId: "diet", type: "checkbox", question: "Any diet restrictions or preferences?", subText: "Select all that apply.", options: [{ id: "dr_dairy", text: "Limiting dairy" }, { id: "dr_gluten", text: "Gluten free" }, { id: "dr_paleo", text: "Paleo" }, { id: "dr_none", text: "None", exclusive: true }], inputKey: "dietRestrictions", nextButtonText: "Continue" },
+  { id: "allergies", sectionId: "diet", type: "checkbox", question: "Are you allergic to any of the following?", subText: "Select all known allergies, if any.", options: [{ id: "al_none", text: "None", exclusive: true }, { id: "al_fish", text: "Fish" }, { id: "al_gluten", text: "Gluten/Wheat" }, { id: "al_milk", text: "Milk" }, { id: "al_soy", text: "Soy" }, { id: "al_sulphites", text: "Sulphites" }, { id: "al_yeast", text: "Yeast" }, { id: "al_corn", text: "Corn/Maize" }, { id: "al_treenuts", text: "Tree nuts" }, { id: "al_peanuts", text: "Peanuts" }, { id: "al_egg", text: "Egg" }, { id: "al_sesame", text: "Sesame" }], inputKey: "allergies", nextButtonText: "Continue", gridColumns: 2 },
+];
@@ -0,0 +1,9 @@
+// src/data/sections/goals.js
+// Generated by survey_split.py from src/data/surveyData.js (source 515875f85716).
+// Do not edit: change surveyData.js and rerun `python survey_split.py`.
+export default [
+  { id: "start-goals", type: "section-marker", sectionId: "goals" },
+  { id: "goals", type: "multi-grid", sectionId: "goals", question: "Which areas of your health are you looking to improve?", subText: "Select one or more goals. (Max 5 recommended)", options: [{ id: "g_sleep", text: "Sleep", icon: "😴" }, { id: "g_bones", text: "Bones", icon: "🦴" }, { id: "g_joints", text: "Joints", icon: "🤸" }, { id: "g_heart", text: "Heart", icon: "❤️" }, { id: "g_hair", text: "Hair", icon: "💇‍" }, { id: "g_skin", text: "Skin", icon: "✨" }, { id: "g_stress", text: "Stress", icon: "🤯" }, { id: "g_fitness", text: "Fitness", icon: "💪" }, { id: "g_digestion", text: "Digestion", icon: "🥦" }, { id: "g_brain", text: "Brain", icon: "🧠" }, { id: "g_immunity", text: "Immunity", icon: "🛡️" }, { id: "g_energy", text: "Energy", icon: "⚡️" }], inputKey: "healthGoals", nextButtonText: "Continue", validation: (v) => Array.isArray(v) && v.length > 0, validationMessage: "Select at least one goal." },
+  { id: "sluggish", type: "yes-no-circle", sectionId: "goals", question: "Do you often wake up feeling sluggish?", options: [{ id: "yes", text: "Yes" }, { id: "no", text: "No" }], inputKey: "feelsSluggish", autoAdvance: true, condition: (a) => a.healthGoals?.includes('g_sleep') || a.healthGoals?.includes('g_energy') },
+  { id: "bone_history", type: "yes-no-circle", sectionId: "goals", question: "Family history of bone issues (e.g., osteoporosis)?", options: [{ id: "yes", text: "Yes" }, { id: "no", text: "No" }], inputKey: "boneHistory", autoAdvance: true, condition: (a) => a.healthGoals?.includes('g_bones') },
+];
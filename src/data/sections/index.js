@@ -0,0 +1,59 @@
+// src/data/sections/index.js
+// Generated by survey_split.py from src/data/surveyData.js (source 515875f85716).
+// Do not edit: change surveyData.js and rerun `python survey_split.py`.
+
+export const PROVIT_BACKGROUND = "#f8f6f2";
+export const PROVIT_BLUE = "#0BABC3";
+export const PROVIT_BORDER_COLOR = "#e0e0e0";
+export const PROVIT_GRADIENT_BLUE = "linear-gradient(105deg, #6fc8d7 0%, #0BABC3 100%)";
+export const PROVIT_GRADIENT_GREEN = "linear-gradient(105deg, #a8d88a 0%, #75C045 100%)";
+export const PROVIT_GREEN = "#75C045";
+export const PROVIT_LIGHT_BLUE = "#6fc8d7";
+export const PROVIT_LIGHT_GREEN = "#a8d88a";
+export const PROVIT_TEXT_DARK = "#333333";
+export const PROVIT_TEXT_LIGHT = "#555555";
+export const PROVIT_WHITE = "#ffffff";
+export const SECTIONS = [{ id: "basics", title: "Basics" }, { id: "goals", title: "Goals" }, { id: "diet", title: "Diet" }, { id: "lifestyle", title: "Lifestyle" }];
+export const getProgressSteps = (allSteps) => allSteps.filter(step => step.id !== 'welcome' && !['loading','results','info','section-header','section-marker'].includes(step.type) );
+
+// Welcome and the first section, in full
+const initialSteps = [
+  { id: "welcome", type: "welcome", title: "Nutrition tailored to you.", text: "Let's find the right supplements for your goals, lifestyle, and diet. Get started below!", description: "Answer a few short questions about your goals, diet, and lifestyle, and get a personalised recommendation in minutes. Start your journey to better health today!", buttonText: "Let's Get Started" },
+  { id: "name", type: "text", sectionId: "basics", question: "What's your first name?", placeholder: "Enter your name", inputKey: "userName", nextButtonText: "Next", validation: (v)=>!!v&&v.trim().length>0, validationMessage: "Name required." },
+  { id: "greeting", type: "info", sectionId: "basics", autoAdvanceDelay: 1500 },
+  { id: "start-basics", type: "section-marker", sectionId: "basics" },
+  { id: "sex", type: "icon-select", sectionId: "basics", question: "What sex were you assigned at birth?", options: [{ id: "male", text: "Male", icon: "♂️" }, { id: "female", text: "Female", icon: "♀️" }], inputKey: "sex", autoAdvance: true },
+  { id: "age", type: "text", sectionId: "basics", question: "How old are you?", placeholder: "Enter age", inputKey: "age", inputType: "number", nextButtonText: "Next", validation: (v)=>!!v&&parseInt(v)>10&&parseInt(v)<120, validationMessage: "Valid age required." },
+];
+
+// Later steps: what navigation and progress need; `chunk` names the module with the rest
+const stepOutline = [
+  { id: "start-goals", type: "section-marker", sectionId: "goals", chunk: "goals" },
+  { id: "goals", type: "multi-grid", sectionId: "goals", chunk: "goals" },
+  { id: "sluggish", type: "yes-no-circle", sectionId: "goals", condition: (a) => a.healthGoals?.includes('g_sleep') || a.healthGoals?.includes('g_energy'), chunk: "goals" },
+  { id: "bone_history", type: "yes-no-circle", sectionId: "goals", condition: (a) => a.healthGoals?.includes('g_bones'), chunk: "goals" },
+  { id: "start-diet", type: "section-marker", sectionId: "diet", chunk: "diet" },
+  { id: "diet_describe", sectionId: "diet", type: "single-button", chunk: "diet" },
+  { id: "diet_meat", sectionId: "diet", type: "single-button", condition: (a) => !['d_vegan', 'd_vegetarian'].includes(a.dietDescription), chunk: "diet" },
+  { id: "diet_fish", sectionId: "diet", type: "single-button", chunk: "diet" },
+  { id: "diet_dairy", sectionId: "diet", type: "single-button", chunk: "diet" },
+  { id: "diet_veg", sectionId: "diet", type: "single-button", chunk: "diet" },
+  { id: "diet_restrictions", sectionId: "diet", type: "checkbox", chunk: "diet" },
+  { id: "allergies", sectionId: "diet", type: "checkbox", chunk: "diet" },
+  { id: "start-lifestyle", type: "section-marker", sectionId: "lifestyle", chunk: "lifestyle" },
+  { id: "exercise", sectionId: "lifestyle", type: "single-button", chunk: "lifestyle" },
+  { id: "sunshine", sectionId: "lifestyle", type: "single-button", chunk: "lifestyle" },
+  { id: "alcohol", sectionId: "lifestyle", type: "yes-no-circle", chunk: "lifestyle" },
+  { id: "smoking", sectionId: "lifestyle", type: "yes-no-circle", chunk: "lifestyle" },
+  { id: "email", type: "email", sectionId: "finish", chunk: "lifestyle" },
+  { id: "loading", type: "loading", chunk: "lifestyle" },
+  { id: "results", type: "results", chunk: "lifestyle" },
+];
+
+export const surveySteps = [...initialSteps, ...stepOutline];
+
+export const sectionLoaders = {
+  "goals": () => import('./goals.js'),
+  "diet": () => import('./diet.js'),
+  "lifestyle": () => import('./lifestyle.js'),
+};
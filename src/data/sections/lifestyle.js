@@ -0,0 +1,13 @@
+// src/data/sections/lifestyle.js
+// Generated by survey_split.py from src/data/surveyData.js (source 515875f85716).
+// Do not edit: change surveyData.js and rerun `python survey_split.py`.
+export default [
+  { id: "start-lifestyle", type: "section-marker", sectionId: "lifestyle" },
+  { id: "exercise", sectionId: "lifestyle", type: "single-button", question: "Avg weekly exercise days?", options: [{ id: "ex_0", text: "I don't exercise" }, { id: "ex_1", text: "1" }, { id: "ex_2_3", text: "2-3" }, { id: "ex_4_plus", text: "4 or more" }], inputKey: "exerciseFrequency", autoAdvance: true },
+  { id: "sunshine", sectionId: "lifestyle", type: "single-button", question: "How often 20min sunshine (no sunscreen)?", options: [{ id: "sun_rarely", text: "Rarely, I don't really get in the sun" }, { id: "sun_weekends", text: "On weekends and holidays only" }, { id: "sun_daily", text: "Every day!" }], inputKey: "sunExposure", autoAdvance: true },
+  { id: "alcohol", sectionId: "lifestyle", type: "yes-no-circle", question: "Consume 8+ alcoholic drinks/week often?", options: [{ id: "yes", text: "Yes" }, { id: "no", text: "No" }], inputKey: "highAlcohol", autoAdvance: true },
+  { id: "smoking", sectionId: "lifestyle", type: "yes-no-circle", question: "Do you smoke?", subText: "May affect nutrient absorption.", options: [{ id: "yes", text: "Yes" }, { id: "no", text: "No" }], inputKey: "isSmoker", autoAdvance: true },
+  { id: "email", type: "email", sectionId: "finish", question: "Which email address should we use?", subText: "Save progress & get recommendations.", placeholder: "Enter email", inputKey: "email", buttonText: "See My Results", validation: (v)=> /^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(v||""), validationMessage: "Invalid email", consentInputKey: "hasConsented", consentText: "Agree to <a href='/privacy-policy' target='_blank'>Privacy Policy</a> & terms." },
+  { id: "loading", type: "loading" },
+  { id: "results", type: "results" },
+];
@@ -5,7 +5,7 @@ export const PROVIT_GREEN = '#75C045'; export const PROVIT_BLUE = '#0BABC3'; exp
 export const SECTIONS = [ { id: 'basics', title: 'Basics' }, { id: 'goals', title: 'Goals' }, { id: 'diet', title: 'Diet' }, { id: 'lifestyle', title: 'Lifestyle' }, ];
 
 export const surveySteps = [
-  { id: 'welcome', type: 'welcome', title: 'Nutrition tailored to you.', text: "Let's find the right supplements for your goals, lifestyle, and diet. Get started below!", buttonText: "Let's Get Started" },
+  { id: 'welcome', type: 'welcome', title: 'Nutrition tailored to you.', text: "Let's find the right supplements for your goals, lifestyle, and diet. Get started below!", description: "Answer a few short questions about your goals, diet, and lifestyle, and get a personalised recommendation in minutes. Start your journey to better health today!", buttonText: "Let's Get Started" },
   { id: 'name', type: 'text', sectionId: 'basics', question: "What's your first name?", placeholder:"Enter your name", inputKey: 'userName', nextButtonText: 'Next', validation: (v)=>!!v&&v.trim().length>0, validationMessage: "Name required." },
   { id: 'greeting', type: 'info', sectionId: 'basics', autoAdvanceDelay: 1500 },
   { id: 'start-basics', type: 'section-marker', sectionId: 'basics' },
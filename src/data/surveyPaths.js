@@ -0,0 +1,99 @@
+// src/data/surveyPaths.js
+// Exact progress through the survey, given which conditional steps are currently shown.
+// Also used by scripts/analyze-survey-paths.js for the offline path report.
+// Works from the step outline in sections/index.js (survey_split.py), so the app doesn't need every section loaded.
+
+import { surveySteps, getProgressSteps } from './sections/index.js';
+
+// Steps with a `condition`, in survey order. Bit i of a "signature" is conditionalSteps[i].condition(answers).
+export const conditionalSteps = surveySteps.filter(step => typeof step.condition === 'function');
+const progressSteps = getProgressSteps(surveySteps);
+
+export const conditionSignature = (answers) => conditionalSteps.reduce((signature, step, i) => (step.condition(answers) ? signature | (1 << i) : signature), 0);
+
+// signature -> { total, positions: { stepId: 1-based position } }. Built on first use of each signature.
+const progressTable = new Map();
+
+export const getProgressTableEntry = (signature) => {
+  let entry = progressTable.get(signature);
+  if (!entry) {
+    const visible = progressSteps.filter(step => {
+      const bit = conditionalSteps.indexOf(step);
+      return bit === -1 || (signature >> bit) & 1;
+    });
+    entry = { total: visible.length, positions: Object.fromEntries(visible.map((step, i) => [step.id, i + 1])) };
+    progressTable.set(signature, entry);
+  }
+  return entry;
+};
+
+// Position (0 if the step isn't a progress step), total and remaining steps for the current answers
+export const getProgress = (signature, stepId) => {
+  const { total, positions } = getProgressTableEntry(signature);
+  const position = positions[stepId] || 0;
+  return { position, total, remaining: position ? total - position : total };
+};
+
+// --- Offline analysis (see scripts/analyze-survey-paths.js) ---
+
+// Runs a condition against a recording proxy to find out which answer keys it reads.
+// Every key reads as unanswered, so a key only reached after another answer is set would be missed.
+const readKeys = (condition) => {
+  const keys = new Set();
+  condition(new Proxy({}, { get: (_, key) => { keys.add(key); return undefined; } }));
+  return [...keys];
+};
+
+const subsets = (ids) => Array.from({ length: 2 ** ids.length }, (_, mask) => ids.filter((_, i) => (mask >> i) & 1));
+
+// Enumerates every combination of the answers the conditions read, and reports the reachable paths.
+// `allSteps` are the full steps (surveyData.js): the outline has no inputKey or options.
+export const analyzeSurveyPaths = (allSteps, maxCombinations = 1_000_000) => {
+  const stepIndex = Object.fromEntries(allSteps.map((step, i) => [step.id, i]));
+  const inputStep = Object.fromEntries(allSteps.filter(step => step.inputKey).map(step => [step.inputKey, step]));
+  const problems = [];
+
+  const relevantKeys = [...new Set(conditionalSteps.flatMap(step => {
+    const keys = readKeys(step.condition);
+    keys.forEach(key => {
+      const source = inputStep[key];
+      if (!source) problems.push(`'${step.id}' reads '${key}', which no step asks for`);
+      else if (stepIndex[source.id] > stepIndex[step.id]) problems.push(`'${step.id}' reads '${key}', which is only asked later (at '${source.id}')`);
+    });
+    return keys.filter(key => inputStep[key]);
+  }))];
+
+  // Possible values per key: unanswered, each option, or each subset of options for multi-selects
+  const domains = relevantKeys.map(key => {
+    const { type, options = [] } = inputStep[key];
+    const ids = options.map(opt => opt.id);
+    return ['multi-grid', 'checkbox'].includes(type) ? subsets(ids) : [undefined, ...ids];
+  });
+  const combinations = domains.reduce((count, domain) => count * domain.length, 1);
+  if (combinations > maxCombinations) {
+    throw new Error(`Too many answer combinations to enumerate (${combinations}); raise maxCombinations to force it.`);
+  }
+
+  const signatures = new Set();
+  const answers = {};
+  const visit = (k) => {
+    if (k === relevantKeys.length) { signatures.add(conditionSignature(answers)); return; }
+    for (const value of domains[k]) { answers[relevantKeys[k]] = value; visit(k + 1); }
+  };
+  visit(0);
+
+  const lengths = [...new Set([...signatures].map(signature => getProgressTableEntry(signature).total))].sort((a, b) => a - b);
+  const everShown = [...signatures].reduce((mask, signature) => mask | signature, 0);
+  const unreachable = conditionalSteps.filter((_, i) => !((everShown >> i) & 1)).map(step => step.id);
+
+  return {
+    relevantKeys,
+    combinations,
+    signatures: [...signatures].sort((a, b) => a - b),
+    minLength: lengths[0],
+    maxLength: lengths[lengths.length - 1],
+    distinctLengths: lengths,
+    unreachable,
+    problems,
+  };
+};
@@ -0,0 +1,40 @@
+// src/data/surveySections.js
+// Loads the survey section by section (modules written by survey_split.py from surveyData.js).
+// `surveySteps` starts as the welcome screen and first section plus an outline of the rest; loading a
+// section fills its outline entries in place, so the same step objects stay valid everywhere.
+
+import { surveySteps, sectionLoaders } from './sections/index.js';
+import { sectionRendererLoaders } from '../components/steps/renderers.js';
+
+export * from './sections/index.js'; // surveySteps, SECTIONS and the rest of surveyData.js's exports
+export { stepRenderers } from '../components/steps/renderers.js';
+
+const stepsById = new Map(surveySteps.map(step => [step.id, step]));
+const pending = new Map(); // chunk -> promise, kept once loaded
+
+// Loads a section's steps and any renderer it needs first; a failed load is retried on the next call
+export const loadSection = (chunk) => {
+  if (!chunk || !sectionLoaders[chunk]) return Promise.resolve();
+  if (!pending.has(chunk)) {
+    const loading = Promise.all([sectionLoaders[chunk](), sectionRendererLoaders[chunk]?.()])
+      .then(([{ default: steps }]) => { steps.forEach(step => Object.assign(stepsById.get(step.id), step)); })
+      .catch(error => { pending.delete(chunk); throw error; });
+    pending.set(chunk, loading);
+  }
+  return pending.get(chunk);
+};
+
+export const ensureStepLoaded = (index) => loadSection(surveySteps[index]?.chunk);
+
+// Every section up to and including the one at `index`, for resuming a draft part-way through
+export const ensureStepsLoadedThrough = (index) => {
+  const chunks = new Set(surveySteps.slice(0, index + 1).map(step => step.chunk));
+  return Promise.all([...chunks].map(loadSection));
+};
+
+// The section after the one at `index`, fetched while the user answers this one
+export const prefetchNextSection = (index) => {
+  const chunk = surveySteps[index]?.chunk;
+  const next = surveySteps.slice(index + 1).find(step => step.chunk && step.chunk !== chunk);
+  if (next) loadSection(next.chunk).catch(() => {}); // Navigation retries and reports it
+};
@@ -2,8 +2,15 @@
 import React from 'react';
 import ReactDOM from 'react-dom/client';
 import App from './App.jsx'; // Main survey component
-// Global styles imported within App.jsx now
+// The full stylesheet loads without blocking the first paint; the built index.html inlines what the first screen needs (critical_css.py)
+import('./styles/App.css');
 
+// Offline support for built sessions (dist/sw.js, generated by service_worker.py); the dev server has none
+if ('serviceWorker' in navigator && import.meta.env.PROD) {
+  window.addEventListener('load', () => { navigator.serviceWorker.register('/sw.js').catch(error => console.warn('Service worker not registered:', error)); });
+}
+
+// Replaces the static welcome screen prerender.py writes into #root
 ReactDOM.createRoot(document.getElementById('root')).render(
   <React.StrictMode>
     <App />
@@ -0,0 +1,44 @@
+// src/utils/answerDraft.js
+// In-progress answers, kept in IndexedDB so a reload or a dropped connection doesn't lose them.
+// Shares the 'provit-survey' database with the service worker (service_worker.py), which keeps its
+// queue of unsent submissions in the 'outbox' store: both sides open it with the same version and stores.
+
+const DB_NAME = 'provit-survey';
+const DB_VERSION = 1;
+const DRAFT_KEY = 'current';
+const SAVE_DELAY_MS = 300; // Typing saves once per pause, not once per keystroke
+const DRAFT_MAX_AGE_MS = 7 * 24 * 60 * 60 * 1000; // Older drafts start the survey over
+
+let dbPromise = null;
+const openDb = () => {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => { ['drafts', 'outbox'].forEach(name => { if (!request.result.objectStoreNames.contains(name)) request.result.createObjectStore(name, { autoIncrement: name === 'outbox' }); }); };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    }).catch(error => { dbPromise = null; throw error; });
+  }
+  return dbPromise;
+};
+
+const withDrafts = (mode, action) => openDb().then(db => new Promise((resolve, reject) => {
+  const tx = db.transaction('drafts', mode);
+  const request = action(tx.objectStore('drafts'));
+  tx.oncomplete = () => resolve(request.result);
+  tx.onerror = () => reject(tx.error);
+}));
+
+// { answers, stepIndex } from an earlier visit, or null. Never rejects: without IndexedDB (private mode) there is no draft.
+export const loadDraft = () => withDrafts('readonly', store => store.get(DRAFT_KEY))
+  .then(draft => (draft && Date.now() - draft.savedAt < DRAFT_MAX_AGE_MS ? draft : null))
+  .catch(() => null);
+
+let timerId = null;
+export const saveDraft = (answers, stepIndex) => {
+  clearTimeout(timerId);
+  timerId = setTimeout(() => { withDrafts('readwrite', store => store.put({ answers, stepIndex, savedAt: Date.now() }, DRAFT_KEY)).catch(() => {}); }, SAVE_DELAY_MS);
+};
+
+// After a submission is sent (or queued by the service worker)
+export const clearDraft = () => { clearTimeout(timerId); return withDrafts('readwrite', store => store.delete(DRAFT_KEY)).catch(() => {}); };
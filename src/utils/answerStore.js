@@ -0,0 +1,56 @@
+// src/utils/answerStore.js
+// The survey answers, outside React state. Components subscribe to the inputKeys they show
+// (useAnswer), so typing in one input re-renders that input and nothing else; App reads the
+// whole object (getAnswers) only when it acts on it: navigation, validation, submission.
+
+import { useCallback, useSyncExternalStore } from 'react';
+
+let answers = {}; // Replaced, never mutated: a snapshot handed out stays as it was
+const keyListeners = new Map(); // inputKey -> Set of listeners
+const allListeners = new Set();
+
+const notify = (keys) => {
+  keys.forEach(key => keyListeners.get(key)?.forEach(listener => listener()));
+  allListeners.forEach(listener => listener());
+};
+
+export const getAnswer = (key) => answers[key];
+export const getAnswers = () => answers;
+
+export const setAnswer = (key, value) => {
+  if (Object.is(answers[key], value)) return;
+  answers = { ...answers, [key]: value };
+  notify([key]);
+};
+
+export const updateAnswer = (key, update) => setAnswer(key, update(answers[key]));
+
+// Fills in answers not given yet (a restored draft never overwrites what was typed meanwhile)
+export const mergeAnswers = (values) => {
+  const keys = Object.keys(values).filter(key => !(key in answers));
+  if (!keys.length) return;
+  answers = { ...Object.fromEntries(keys.map(key => [key, values[key]])), ...answers };
+  notify(keys);
+};
+
+export const subscribeAnswer = (key, listener) => {
+  if (!keyListeners.has(key)) keyListeners.set(key, new Set());
+  keyListeners.get(key).add(listener);
+  return () => { keyListeners.get(key)?.delete(listener); };
+};
+
+export const subscribeAnswers = (listener) => {
+  allListeners.add(listener);
+  return () => { allListeners.delete(listener); };
+};
+
+const noSubscription = () => () => {};
+
+// One answer; re-renders only when that inputKey changes. A missing key (steps without input) reads undefined.
+export const useAnswer = (key) => {
+  const subscribe = useCallback((listener) => subscribeAnswer(key, listener), [key]);
+  return useSyncExternalStore(key ? subscribe : noSubscription, () => (key ? answers[key] : undefined));
+};
+
+// A value derived from all answers; re-renders only when it changes, so `select` must return a primitive
+export const useAnswerSelector = (select) => useSyncExternalStore(subscribeAnswers, () => select(answers));
@@ -0,0 +1,9 @@
+// src/utils/assets.js
+// Content-hashed paths for files in public/ (asset_manifest.py), served with immutable caching.
+
+// Written by asset_manifest.py (run by populate_project.py); the glob is empty when the stage hasn't run yet
+const manifests = import.meta.glob('../data/assetManifest.json', { eager: true, import: 'default' });
+const assetManifest = Object.values(manifests)[0] || {};
+
+// '/provit-icon.png' -> '/static/provit-icon.3f9c0a1b.png'; unknown paths are returned as they are
+export const assetUrl = (path) => assetManifest[path] || path;
@@ -0,0 +1,41 @@
+// src/utils/fallbackResults.js
+// Degraded (but complete) results page, shown when /generate-results misses its deadline
+
+import { surveySteps, PROVIT_GREEN, PROVIT_BACKGROUND, PROVIT_TEXT_DARK, PROVIT_TEXT_LIGHT } from '../data/sections/index.js';
+import { GENERIC_RECOMMENDATIONS } from '../data/genericRecommendations.js';
+
+// Looked up per call: the goals step only has its options once its section has loaded (it has by submission)
+const goalOptions = () => surveySteps.find(step => step.inputKey === 'healthGoals')?.options || [];
+const escapeHtml = (value) => String(value).replace(/[&<>"']/g, ch => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch]));
+
+// Pages only depend on the goal selection, so they are built once per combination
+const pageCache = new Map();
+
+export const buildFallbackResultsHtml = (answers) => {
+  const goalIds = Array.isArray(answers.healthGoals) ? answers.healthGoals : [];
+  const cacheKey = goalIds.join(',');
+  if (pageCache.has(cacheKey)) return pageCache.get(cacheKey);
+
+  const options = goalOptions();
+  const goals = goalIds.map(id => options.find(opt => opt.id === id)).filter(Boolean);
+  const [primaryGoal, ...otherGoals] = goals;
+  const goalItems = goals.map(opt => `<li>${opt.icon || ''} ${escapeHtml(opt.text)}</li>`).join('');
+  const suggestions = (primaryGoal && GENERIC_RECOMMENDATIONS[primaryGoal.id]) || [];
+  const suggestionItems = suggestions.map(item => `<li><strong>${escapeHtml(item.name)}</strong>: ${escapeHtml(item.reason)}</li>`).join('');
+  const html = `<!doctype html>
+<html lang="en">
+<head><meta charset="UTF-8" /><meta name="viewport" content="width=device-width, initial-scale=1.0" /><title>Your PROVIT Results</title>
+<style>body{margin:0;padding:40px 20px;font-family:system-ui,sans-serif;background:${PROVIT_BACKGROUND};color:${PROVIT_TEXT_DARK};}main{max-width:600px;margin:0 auto;}h1{color:${PROVIT_GREEN};}li{margin:6px 0;font-size:1.1rem;}.note{color:${PROVIT_TEXT_LIGHT};font-size:0.9rem;}</style>
+</head>
+<body><main>
+<h1>Your PROVIT results</h1>
+<p>We couldn't put together your personalised recommendations just now, so here is a summary of what you told us${primaryGoal ? `. Your top priority is <strong>${escapeHtml(primaryGoal.text)}</strong>` : ''}${otherGoals.length ? `, followed by ${otherGoals.length} other goal${otherGoals.length > 1 ? 's' : ''}` : ''}.</p>
+${goalItems ? `<ul>${goalItems}</ul>` : ''}
+${suggestionItems ? `<h2>Common choices for ${escapeHtml(primaryGoal.text)}</h2>
+<ul>${suggestionItems}</ul>
+<p class="note">These are general suggestions for this goal, not yet matched to your diet, allergies or medication. Check the label, and ask your doctor or pharmacist if you're unsure.</p>` : ''}
+</main></body>
+</html>`;
+  pageCache.set(cacheKey, html);
+  return html;
+};
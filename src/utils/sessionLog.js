@@ -0,0 +1,77 @@
+// src/utils/sessionLog.js
+// Compact, batched log of step views and answer changes, sent to survey_server.py with sendBeacon.
+// Events are buffered in memory and sent in batches (size, interval, or when the page is hidden),
+// so answering the survey never waits on an analytics request.
+
+const EVENTS_URL = 'http://localhost:5002/events';
+const FLUSH_EVERY_EVENTS = 20;
+const FLUSH_INTERVAL_MS = 10000;
+const SESSION_KEY = 'provit-session-id';
+
+const getSessionId = () => {
+  try {
+    let id = sessionStorage.getItem(SESSION_KEY);
+    if (!id) { id = crypto.randomUUID(); sessionStorage.setItem(SESSION_KEY, id); }
+    return id;
+  } catch { return crypto.randomUUID(); } // Storage can be unavailable (private mode)
+};
+
+const sessionId = getSessionId();
+const startedAt = Date.now();
+let buffer = [];
+let timerId = null;
+
+// Event tuples: [type, stepId, ms since page load, extra]
+//   'view'   extra = direction (1 forward, -1 back)
+//   'answer' extra = the option id picked (or toggled, for multi-selects); omitted for free-text answers
+//   'submit' extra = closedAnswers(...) at submission, plus emailHash, for the answer store and combination analytics
+export const logEvent = (type, stepId, extra = null) => {
+  buffer.push([type, stepId, Date.now() - startedAt, extra]);
+  if (buffer.length >= FLUSH_EVERY_EVENTS) flush();
+  else if (!timerId) timerId = setTimeout(flush, FLUSH_INTERVAL_MS);
+};
+
+// Only answers picked from options, plus age as a number, are logged; names and emails never leave through analytics
+export const closedAnswers = (steps, answers) => {
+  const closed = Object.fromEntries(steps.filter(step => step.inputKey && step.options && answers[step.inputKey] != null).map(step => [step.inputKey, answers[step.inputKey]]));
+  const age = parseInt(answers.age, 10);
+  if (age > 0 && age < 128) closed.age = age;
+  return closed;
+};
+
+// Hex SHA-256 of the trimmed, lower-cased email: lets the server find a person's rows for erasure without storing the address
+export const hashEmail = async (email) => {
+  try {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(email.trim().toLowerCase()));
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+  } catch { return undefined; } // crypto.subtle needs a secure context
+};
+
+const takeBatch = () => {
+  clearTimeout(timerId); timerId = null;
+  if (!buffer.length) return null;
+  const batch = JSON.stringify({ sid: sessionId, t0: startedAt, events: buffer });
+  buffer = [];
+  return batch;
+};
+
+// text/plain keeps the beacon a CORS "simple" request (no preflight); the server sniffs gzip itself
+const send = (body) => navigator.sendBeacon?.(EVENTS_URL, new Blob([body], { type: 'text/plain' }));
+
+// Regular flushes are gzipped when the browser supports it
+export const flush = async () => {
+  const batch = takeBatch();
+  if (!batch) return;
+  if (typeof CompressionStream === 'undefined') { send(batch); return; }
+  try {
+    const compressed = await new Response(new Blob([batch]).stream().pipeThrough(new CompressionStream('gzip'))).arrayBuffer();
+    send(compressed);
+  } catch { send(batch); }
+};
+
+// The page may be gone before an async compression finishes, so the final flush is sent as-is
+const flushNow = () => { const batch = takeBatch(); if (batch) send(batch); };
+if (typeof window !== 'undefined') {
+  window.addEventListener('pagehide', flushNow);
+  document.addEventListener('visibilitychange', () => { if (document.visibilityState === 'hidden') flushNow(); });
+}
@@ -0,0 +1,540 @@
+"""
+Survey analytics server: receives the batched session-log beacons sent by
+`src/utils/sessionLog.js`.
+
+    python survey_server.py [--host 127.0.0.1] [--port 5002]
+
+POST /events accepts one batch per request, gzip-compressed or plain JSON:
+
+    {"sid": "<session id>", "t0": <page load, epoch ms>, "events": [[type, stepId, offsetMs, extra], ...]}
+
+Event times come from the server's clock: the newest event in a batch is
+stamped with the receive time, and the others keep their offset from it,
+capped at MAX_BATCH_SPAN_MS. The client's t0 is never used as a time, so a
+wrong or hostile clock can't open windows far in the past or future.
+
+Accepted events go into an in-memory ring buffer and the request is answered
+straight away; a background task drains the ring to JSON-lines segment files
+under `data/events/` every few seconds. If the ring fills faster than it is
+flushed, the oldest events are dropped (and counted) rather than blocking
+ingest. Accepted events are also passed to EVENT_LISTENERS, which keep the
+in-memory analytics rollups current:
+
+    GET /funnel?hours=24    per-step reach, drop-offs, median dwell, back rate
+    GET /distinct?days=1    approximate distinct sessions per step (HyperLogLog)
+    GET /top-combinations?family=healthGoals&n=50&days=7
+                            most common answer combinations (count-min sketch)
+    POST /answers/query     {"where": {...}, "groupBy": [key, key?]} over the answer store;
+                            admin only (see /answers/erase): narrow filters single out respondents
+    GET /cube?keys=healthGoals,dietDescription&fixed=sunExposure:sun_rarely
+                            precomputed crosstab slice (crosstab_cube.py); admin only, like /answers/query
+    POST /answers/erase     {"email": "..."} or {"emailHash": "<sha-256 hex>"}: privacy erasure;
+                            needs `Authorization: Bearer $PROVIT_ADMIN_TOKEN`, and sends no CORS headers
+
+Submit events may carry the session's closed-option answers, age and email
+hash as their extra value; free-text answers are rejected there. Those
+submissions feed the columnar answer store (answer_store.py) under
+`data/answers/`, and the in-memory similar-profiles index
+(similar_profiles.py), which is rebuilt from the store on startup. The
+flusher seals the store's tail into a small block every few seconds and
+compacts blocks every COMPACT_INTERVAL; erasures are logged at request
+time and applied by the flusher, to the store and the index; queued results
+emails for the address (email_queue.py) are deleted straight away. Email hashes are not
+written to the event segments, so an erasure never has to touch them; the
+store keeps its own journal of unsaved submissions for crash recovery, and
+drops each journal file once the blocks covering it are saved.
+
+The HTTP layer is a small asyncio HTTP/1.1 server (keep-alive, Content-Length
+bodies) with a route table, so one process can serve many beacons at once.
+serve_dist.py reuses it to serve the built survey, alone or alongside these
+routes.
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import sys
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from answer_decoder import PayloadError, get_schema
+from answer_store import EMAIL_HASH_KEY, AnswerStore, email_prefix, hash_email, submission_row
+from crosstab_cube import CrossTabCube, write_cube_file
+from email_queue import erase_queued_emails
+from funnel import RETENTION_HOURS, FunnelAggregator, replay_segments
+from similar_profiles import SimilarProfiles
+from sketches import COMBINATION_FAMILIES, RETENTION_DAYS, SketchStore, write_sketch_files
+
+# --- Configuration ---
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5002 # The results backend uses 5001
+BACKLOG = 1024 # Pending connections the listening socket queues
+MAX_HEADER_COUNT = 100
+MAX_BODY_BYTES = 64 * 1024
+MAX_DECOMPRESSED_BYTES = 256 * 1024 # Guards against gzip bombs
+MAX_EVENTS_PER_BATCH = 500
+MAX_SESSION_ID_LENGTH = 64
+MAX_BATCH_SPAN_MS = 5 * 60 * 1000 # Oldest event accepted before the newest one in a batch (the client flushes every 10s)
+EVENT_TYPES = ('view', 'answer', 'submit')
+RING_CAPACITY = 200_000 # Events held in memory between flushes
+FLUSH_INTERVAL = 5.0 # Seconds
+COMPACT_INTERVAL = 300.0 # Seconds between answer-store compaction passes
+EVENTS_DIR = Path("data") / "events"
+SKETCHES_DIR = Path("data") / "sketches"
+ANSWERS_DIR = Path("data") / "answers"
+CUBE_PATH = ANSWERS_DIR / "cube.bin"
+ADMIN_TOKEN_ENV = 'PROVIT_ADMIN_TOKEN' # Bearer token for admin routes; they refuse every request while it's unset
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request', 401: 'Unauthorized',
+               403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+# --- HTTP Layer ---
+
+class HttpError(Exception):
+    """Raised by handlers (or the parser) to answer with an error status."""
+
+    def __init__(self, status, message=''):
+        super().__init__(message)
+        self.status = status
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'headers', 'body')
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+class FileBody:
+    """Response body sent straight from a file with sendfile (serve_dist.py), instead of bytes."""
+    __slots__ = ('path', 'length', 'send')
+
+    def __init__(self, path, length, send=True):
+        self.path = path
+        self.length = length
+        self.send = send # False for HEAD: headers only
+
+# (method, path) -> async handler(request) returning (status, headers, body bytes or FileBody)
+ROUTES = {}
+PRIVATE_PATHS = set() # Answered without CORS headers, so other origins' pages can't call them
+
+def route(method, path, cors=True):
+    def register(handler):
+        ROUTES[(method, path)] = handler
+        if not cors:
+            PRIVATE_PATHS.add(path)
+        return handler
+    return register
+
+def require_admin(request):
+    """Raises 401/403 unless the request carries the admin bearer token."""
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected:
+        raise HttpError(403, f'Admin routes are disabled: {ADMIN_TOKEN_ENV} is not set')
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(), expected.encode()):
+        raise HttpError(401, 'Admin token required')
+
+def json_response(data, status=200):
+    return status, {'Content-Type': 'application/json'}, json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+async def read_request(reader, max_body=MAX_BODY_BYTES):
+    """Parses one request from the stream; returns None when the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, 'Malformed request line') from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADER_COUNT:
+            raise HttpError(400, 'Too many headers')
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    headers[':version'] = version
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(411, 'Send a Content-Length')
+    length = int(headers.get('content-length') or 0)
+    if length > max_body:
+        raise HttpError(413, f'Body exceeds {max_body} bytes')
+    body = await reader.readexactly(length) if length else b''
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, parse_qs(url.query), headers, body)
+
+def write_head(writer, status, headers, content_length, keep_alive):
+    """Status line and headers only; the caller sends `content_length` bytes of body after it."""
+    head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    for name, value in headers.items():
+        head.append(f"{name}: {value}")
+    head.append(f"Content-Length: {content_length}")
+    head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+
+def write_response(writer, status, headers, body, keep_alive, cors=True):
+    write_head(writer, status, {**CORS_HEADERS, **headers} if cors else headers, len(body), keep_alive)
+    writer.write(body)
+
+async def send_file_response(writer, status, headers, body, keep_alive):
+    """Headers, then the file through loop.sendfile (os.sendfile on plain sockets: no copy through Python)."""
+    write_head(writer, status, {**CORS_HEADERS, **headers}, body.length, keep_alive)
+    await writer.drain()
+    if body.send and body.length:
+        with open(body.path, 'rb') as file:
+            await asyncio.get_running_loop().sendfile(writer.transport, file, 0, body.length)
+
+async def handle_connection(reader, writer, routes=ROUTES, fallback=None):
+    """Serves requests on one connection; `fallback(request)` answers those no route matches (serve_dist.py)."""
+    try:
+        while True:
+            cors = True
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                cors = request.path not in PRIVATE_PATHS
+                handler = routes.get((request.method, request.path))
+                if handler is None:
+                    if request.method == 'OPTIONS':
+                        status, headers, body = 204, {}, b'' # CORS preflight
+                    elif any(path == request.path for _, path in routes):
+                        raise HttpError(405)
+                    elif fallback is not None:
+                        status, headers, body = await fallback(request)
+                    else:
+                        raise HttpError(404)
+                else:
+                    status, headers, body = await handler(request)
+                keep_alive = request.headers.get('connection', '').lower() != 'close' and request.headers[':version'] != 'HTTP/1.0'
+            except HttpError as e:
+                status, headers, body = json_response({'error': str(e) or STATUS_TEXT.get(e.status, '')}, e.status)
+                keep_alive = False
+            except (ValueError, asyncio.IncompleteReadError):
+                status, headers, body = json_response({'error': 'Bad request'}, 400)
+                keep_alive = False
+            if isinstance(body, FileBody):
+                await send_file_response(writer, status, headers, body, keep_alive)
+            else:
+                write_response(writer, status, headers, body, keep_alive, cors)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        writer.close()
+
+# --- Event Ingest ---
+
+class EventRing:
+    """Bounded in-memory buffer of event records awaiting a flush to disk."""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.events = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def extend(self, records):
+        overflow = len(self.events) + len(records) - self.events.maxlen
+        if overflow > 0:
+            self.dropped += min(overflow, self.events.maxlen)
+        self.events.extend(records)
+
+    def drain(self):
+        records = list(self.events)
+        self.events.clear()
+        return records
+
+ring = EventRing()
+funnel = None # FunnelAggregator, created in serve()
+sketches = None # SketchStore, created in serve()
+answer_store = None # AnswerStore, created in serve()
+cube = None # CrossTabCube over answer_store, created in serve()
+similar = None # SimilarProfiles over the same submissions, created in serve()
+EVENT_LISTENERS = [] # Callables receiving each accepted batch of records
+_step_ids = None
+
+def known_step_ids():
+    global _step_ids
+    if _step_ids is None:
+        _step_ids = {step['id'] for step in get_schema().steps}
+    return _step_ids
+
+def parse_event_batch(raw, received_ms=None):
+    """Decodes and validates one beacon body; returns event records (sid, type, step, ts, extra), timed by the server."""
+    if raw[:2] == b'\x1f\x8b': # gzip magic: compressed batch
+        inflater = zlib.decompressobj(wbits=31)
+        try:
+            raw = inflater.decompress(raw, MAX_DECOMPRESSED_BYTES)
+        except zlib.error:
+            raise HttpError(400, 'Malformed gzip body') from None
+        if inflater.unconsumed_tail or (not inflater.eof and len(raw) >= MAX_DECOMPRESSED_BYTES):
+            raise HttpError(413, 'Decompressed batch is too large')
+        if not inflater.eof: # A cut-off stream would otherwise pass as a shorter batch
+            raise HttpError(400, 'Truncated gzip body')
+    try:
+        batch = json.loads(raw)
+        sid, t0, events = batch['sid'], batch['t0'], batch['events']
+    except (ValueError, TypeError, KeyError):
+        raise HttpError(400, 'Malformed event batch') from None
+    if type(sid) is not str or len(sid) > MAX_SESSION_ID_LENGTH or type(t0) is not int or type(events) is not list:
+        raise HttpError(400, 'Malformed event batch')
+    if len(events) > MAX_EVENTS_PER_BATCH:
+        raise HttpError(413, f'More than {MAX_EVENTS_PER_BATCH} events in one batch')
+
+    step_ids = known_step_ids()
+    if any(type(event) is not list or len(event) != 4 or type(event[2]) is not int or event[2] < 0 for event in events):
+        raise HttpError(400, 'Malformed event')
+    received_ms = int(time.time() * 1000) if received_ms is None else received_ms
+    newest = max((event[2] for event in events), default=0)
+    records = []
+    for event_type, step_id, offset, extra in events:
+        if event_type not in EVENT_TYPES or step_id not in step_ids:
+            raise HttpError(400, 'Unknown event type or step')
+        if event_type == 'submit' and extra is not None:
+            try:
+                submission_row(extra, get_schema())
+            except PayloadError as e:
+                raise HttpError(400, f'Submit answers: {e}') from None
+        records.append((sid, event_type, step_id, received_ms - min(newest - offset, MAX_BATCH_SPAN_MS), extra))
+    return records
+
+@route('POST', '/events')
+async def ingest_events(request):
+    records = parse_event_batch(request.body)
+    ring.extend(records)
+    for listener in EVENT_LISTENERS:
+        listener(records)
+    return 204, {}, b''
+
+def query_int(request, name, default, low, high):
+    try:
+        value = int(request.query.get(name, [default])[0])
+    except ValueError:
+        raise HttpError(400, f'{name} must be an integer') from None
+    if not low <= value <= high:
+        raise HttpError(400, f'{name} must be between {low} and {high}')
+    return value
+
+@route('GET', '/funnel')
+async def get_funnel(request):
+    hours = query_int(request, 'hours', 24, 1, RETENTION_HOURS)
+    return json_response({'hours': hours, 'steps': funnel.funnel(hours)})
+
+@route('GET', '/distinct')
+async def get_distinct(request):
+    days = query_int(request, 'days', 1, 1, RETENTION_DAYS)
+    return json_response({'days': days, 'steps': sketches.distinct_sessions(days)})
+
+@route('GET', '/top-combinations')
+async def get_top_combinations(request):
+    family = request.query.get('family', ['healthGoals'])[0]
+    if family not in COMBINATION_FAMILIES:
+        raise HttpError(400, f"family must be one of: {', '.join(COMBINATION_FAMILIES)}")
+    n = query_int(request, 'n', 50, 1, 100)
+    days = query_int(request, 'days', 7, 1, RETENTION_DAYS)
+    return json_response({'family': family, 'days': days, 'top': sketches.top_combinations(family, n, days)})
+
+@route('POST', '/answers/query', cors=False)
+async def query_answers(request):
+    require_admin(request)
+    try:
+        query = json.loads(request.body or b'{}')
+        where, group_by = query.get('where'), query.get('groupBy') or []
+        if not isinstance(where, (dict, type(None))) or not isinstance(group_by, list) or len(group_by) > 2:
+            raise ValueError("Expected {\"where\": {...}, \"groupBy\": [key, key?]}")
+        result = {'rows': len(answer_store), 'count': answer_store.count(where)}
+        if group_by:
+            result['groups'] = answer_store.crosstab(*group_by, where=where)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HttpError(400, str(e)) from None
+    return json_response(result)
+
+@route('GET', '/cube', cors=False)
+async def get_cube_slice(request):
+    require_admin(request) # Small cells are individual respondents
+    keys = [key for key in request.query.get('keys', [''])[0].split(',') if key]
+    pins = [pin.split(':', 1) for pin in request.query.get('fixed', [''])[0].split(',') if pin]
+    if any(len(pin) != 2 for pin in pins):
+        raise HttpError(400, 'fixed must look like key:option,key:option')
+    try:
+        counts = cube.slice(keys, dict(pins))
+    except ValueError as e:
+        raise HttpError(400, str(e)) from None
+    return json_response({'keys': keys, 'fixed': dict(pins), 'counts': counts})
+
+@route('POST', '/answers/erase', cors=False)
+async def erase_answers(request):
+    require_admin(request)
+    try:
+        body = json.loads(request.body)
+        email_hash = hash_email(body['email']) if 'email' in body else body['emailHash']
+        await asyncio.to_thread(answer_store.erase, email_hash) # The tombstone append is fsync'd
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HttpError(400, 'Expected {"email": "..."} or {"emailHash": "<sha-256 hex>"}') from None
+    await asyncio.to_thread(erase_queued_emails, email_hash) # Unsent and failed results emails still hold the address
+    return json_response({'queued': True}, 202)
+
+def write_segment(records, events_dir=EVENTS_DIR):
+    """Writes one JSON-lines segment file, without email hashes; runs in a worker thread."""
+    events_dir.mkdir(parents=True, exist_ok=True)
+    path = events_dir / f"events-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{time.monotonic_ns()}.jsonl"
+    fields = ('sid', 'type', 'step', 'ts', 'extra')
+    with path.open('w', encoding='utf-8') as f:
+        for sid, event_type, step_id, ts, extra in records:
+            if isinstance(extra, dict) and EMAIL_HASH_KEY in extra:
+                extra = {key: value for key, value in extra.items() if key != EMAIL_HASH_KEY}
+            f.write(json.dumps(dict(zip(fields, (sid, event_type, step_id, ts, extra))), separators=(',', ':')) + '\n')
+    return path
+
+async def save_answer_store(loop, journal=(None, [])):
+    """Writes a flush's journal, then new block files off the loop, then the manifest and cube that reference them.
+
+    `journal` comes from answer_store.seal_journal(), called on the loop step that drained the ring.
+    """
+    seq, rows = journal
+    new_blocks = answer_store.unsaved_blocks()
+    covered = answer_store.journal_sealed
+    if rows:
+        await loop.run_in_executor(None, answer_store.write_journal, seq, rows)
+    if new_blocks:
+        await loop.run_in_executor(None, answer_store.write_blocks, new_blocks)
+    if new_blocks or covered != answer_store.journal_saved:
+        answer_store.journal_saved = covered
+        answer_store.write_manifest()
+        await loop.run_in_executor(None, answer_store.drop_journals)
+    if new_blocks:
+        await loop.run_in_executor(None, write_cube_file, cube.snapshot(answer_store), CUBE_PATH)
+
+async def compact_answer_store(loop):
+    plan = answer_store.plan_compaction(int(time.time() * 1000))
+    if plan is None:
+        return
+    replacements = await loop.run_in_executor(None, answer_store.run_compaction, plan)
+    answer_store.commit_compaction(plan, replacements)
+    await loop.run_in_executor(None, write_cube_file, cube.snapshot(answer_store), CUBE_PATH)
+
+async def flush_once(loop):
+    """One flusher pass over the ring and the answer store; returns the drained records."""
+    records = ring.drain()
+    new_erasures = answer_store.tombstones.entries[answer_store.tombstones_applied:]
+    if new_erasures:
+        similar.erase({email_prefix(email_hash) for email_hash in new_erasures})
+    erased = answer_store.apply_tombstones()
+    journal = answer_store.seal_journal(records) # Same loop step as the drain: the sealed blocks hold exactly these submissions
+    if records:
+        await loop.run_in_executor(None, write_segment, records)
+    funnel.expire_sessions()
+    sketches.expire()
+    if erased:
+        await loop.run_in_executor(None, write_cube_file, cube.snapshot(answer_store), CUBE_PATH)
+    await save_answer_store(loop, journal)
+    return records
+
+async def flush_events_periodically(interval=FLUSH_INTERVAL):
+    loop = asyncio.get_running_loop()
+    last_dropped = 0
+    last_compaction = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        await flush_once(loop)
+        if time.monotonic() - last_compaction >= COMPACT_INTERVAL:
+            await compact_answer_store(loop)
+            last_compaction = time.monotonic()
+        payloads = sketches.snapshot() # Serialized here, on the loop, so ingest can't change them mid-write
+        if payloads:
+            await loop.run_in_executor(None, write_sketch_files, payloads, sketches.token, SKETCHES_DIR)
+        if ring.dropped != last_dropped:
+            print(f"Warning: event ring overflowed, {ring.dropped - last_dropped} events dropped", file=sys.stderr)
+            last_dropped = ring.dropped
+
+# --- Main Script Logic ---
+
+def open_stores():
+    """Loads (or rebuilds) every store from disk and registers the event listeners; serve() calls it before accepting traffic."""
+    global funnel, sketches, answer_store, cube, similar
+    known_step_ids() # Load the schema before accepting traffic
+    funnel = FunnelAggregator(get_schema())
+    if EVENTS_DIR.exists():
+        print(f"Replayed {replay_segments(funnel, EVENTS_DIR)} event segment(s) into the funnel")
+    sketches = SketchStore(get_schema())
+    if SKETCHES_DIR.exists():
+        print(f"Loaded {sketches.load(SKETCHES_DIR)} sketch file(s)")
+    answer_store = AnswerStore(get_schema())
+    print(f"Loaded {answer_store.open(ANSWERS_DIR)} answer block(s)")
+    cube = CrossTabCube(get_schema())
+    if not cube.load(CUBE_PATH, answer_store):
+        cube = CrossTabCube(get_schema()) # Missing, stale or built for another survey: rebuild from the blocks
+    refreshed = cube.refresh(answer_store)
+    if refreshed:
+        print(f"Counted {refreshed} answer block(s) into the crosstab cube")
+    write_cube_file(cube.snapshot(answer_store), CUBE_PATH)
+    answer_store.observers.append(cube)
+    replayed = answer_store.replay_journal()
+    if replayed:
+        print(f"Replayed {replayed} unsaved submission(s) into the answer store")
+    similar = SimilarProfiles(get_schema())
+    print(f"Indexed {similar.load(answer_store)} stored submission(s) for similar profiles")
+    EVENT_LISTENERS[:] = [funnel.ingest, sketches.ingest, answer_store.ingest, similar.ingest]
+
+def close_stores():
+    """Synchronous last flush, for shutdown: the ring, the sketches and the answer store."""
+    records = ring.drain()
+    answer_store.apply_tombstones()
+    seq, rows = answer_store.seal_journal(records)
+    if records:
+        write_segment(records)
+    payloads = sketches.snapshot()
+    if payloads:
+        write_sketch_files(payloads, sketches.token, SKETCHES_DIR)
+    if rows:
+        answer_store.write_journal(seq, rows)
+    new_blocks = answer_store.unsaved_blocks()
+    answer_store.write_blocks(new_blocks)
+    answer_store.journal_saved = answer_store.journal_sealed
+    answer_store.write_manifest()
+    answer_store.drop_journals()
+    if new_blocks:
+        write_cube_file(cube.snapshot(answer_store), CUBE_PATH)
+
+async def serve(host, port, handler=handle_connection):
+    """Runs the analytics server; serve_dist.py passes a handler that serves the built survey as well."""
+    open_stores()
+    server = await asyncio.start_server(handler, host, port, backlog=BACKLOG)
+    flusher = asyncio.create_task(flush_events_periodically())
+    print(f"Survey server listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        close_stores()
+
+def main():
+    parser = argparse.ArgumentParser(description="PROVIT survey analytics server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+if __name__ == "__main__":
+    main()
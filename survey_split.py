@@ -0,0 +1,176 @@
+"""
+Splits `src/data/surveyData.js` into per-section modules the app loads on
+demand, so the initial bundle only carries the welcome screen and the first
+section:
+
+  src/data/sections/index.js        SECTIONS and the other exports, the
+                                    steps up to the end of the first section,
+                                    and an outline of every later step (id,
+                                    type, sectionId, condition): enough for
+                                    navigation and exact progress
+  src/data/sections/<section>.js    the full steps of one later section
+  src/components/steps/renderers.js step type -> renderer component; the
+                                    renderers the first section uses are
+                                    imported up front, any other renderer
+                                    loads with the first section that needs it
+
+Steps without a section (welcome, loading, results) or with one that isn't
+in SECTIONS (`finish`) go with the section before them. A survey without
+SECTIONS stays in one piece.
+
+Step objects are written back out from node, functions through their
+source text, so `condition` and `validation` must not use variables from
+the rest of surveyData.js (none do).
+
+surveyData.js stays the source of truth: edit it, then rerun this stage.
+
+    python survey_split.py        # same stage populate_project.py runs
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+from answer_decoder import SURVEY_DATA_PATH, run_survey_script
+
+# --- Configuration ---
+SECTIONS_DIR = Path("src") / "data" / "sections"
+RENDERERS_PATH = Path("src") / "components" / "steps" / "renderers.js"
+OUTLINE_KEYS = ('id', 'type', 'sectionId', 'condition') # Kept for steps of lazily loaded sections
+# Step type -> renderer module in src/components/steps/ (other types are rendered by App.jsx itself)
+STEP_RENDERERS = {
+    'text': 'TextStep', 'email': 'TextStep',
+    'icon-select': 'ChoiceStep', 'yes-no-circle': 'ChoiceStep', 'single-button': 'ChoiceStep',
+    'multi-grid': 'ChoiceStep', 'checkbox': 'ChoiceStep',
+}
+
+# Prints every export as JS source: values as JSON, functions through their source text.
+# Steps come back as a list of [key, source] pairs so the outline can pick keys out of them.
+DUMP_SURVEY_SOURCE_JS = dedent("""\
+    const survey = await import(process.argv[1]);
+    const key = (k) => /^[A-Za-z_$][\\w$]*$/.test(k) ? k : JSON.stringify(k);
+    const isExpression = (fn) => /^(async\\s+)?(function\\b|\\(|[\\w$]+\\s*=>)/.test(fn.toString());
+    const source = (value) => typeof value === 'function' ? value.toString()
+      : Array.isArray(value) ? `[${value.map(source).join(', ')}]`
+      : value && typeof value === 'object' ? `{ ${Object.entries(value).map(([k, v]) => property(k, v)).join(', ')} }`
+      : JSON.stringify(value);
+    const property = (k, v) => typeof v === 'function' && !isExpression(v) ? v.toString() : `${key(k)}: ${source(v)}`;
+    const exports = Object.entries(survey).filter(([name]) => name !== 'surveySteps').map(([name, value]) => [name, source(value)]);
+    const steps = survey.surveySteps.map(step => ({
+      id: step.id, type: step.type, sectionId: step.sectionId ?? null,
+      properties: Object.entries(step).map(([k, v]) => [k, property(k, v)]),
+    }));
+    process.stdout.write(JSON.stringify({ exports, steps, sections: (survey.SECTIONS ?? []).map(section => section.id) }));
+""")
+
+# --- Splitting ---
+
+def assign_chunks(steps, section_ids):
+    """Chunk (section id) per step: its own section if listed in SECTIONS, else the chunk of the step before it."""
+    chunks, current = [], section_ids[0] if section_ids else None
+    for step in steps:
+        if step['sectionId'] in section_ids:
+            current = step['sectionId']
+        chunks.append(current)
+    return chunks
+
+def _step_source(properties):
+    return '{ ' + ', '.join(text for _, text in properties) + ' }'
+
+def _header(path, source_hash):
+    return (f"// {path.as_posix()}\n"
+            f"// Generated by survey_split.py from src/data/surveyData.js (source {source_hash[:12]}).\n"
+            f"// Do not edit: change surveyData.js and rerun `python survey_split.py`.\n")
+
+def render_split(survey, source_hash, sections_dir=SECTIONS_DIR, renderers_path=RENDERERS_PATH):
+    """Returns {path: file text} for the whole split."""
+    steps, section_ids = survey['steps'], survey['sections']
+    chunks = assign_chunks(steps, section_ids)
+    first = chunks[0] if steps else None
+    lazy = [section_id for section_id in section_ids if section_id != first and section_id in chunks]
+    files = {}
+
+    index_path = sections_dir / 'index.js'
+    lines = [_header(index_path, source_hash)]
+    lines += [f"export const {name} = {text};" for name, text in survey['exports']]
+    lines.append("\n// Welcome and the first section, in full")
+    lines.append("const initialSteps = [")
+    lines += [f"  {_step_source(step['properties'])}," for step, chunk in zip(steps, chunks) if chunk == first]
+    lines.append("];")
+    lines.append("\n// Later steps: what navigation and progress need; `chunk` names the module with the rest")
+    lines.append("const stepOutline = [")
+    for step, chunk in zip(steps, chunks):
+        if chunk != first:
+            outline = [(key, text) for key, text in step['properties'] if key in OUTLINE_KEYS] + [('chunk', f"chunk: {json.dumps(chunk)}")]
+            lines.append(f"  {_step_source(outline)},")
+    lines.append("];")
+    lines.append("\nexport const surveySteps = [...initialSteps, ...stepOutline];")
+    lines.append("\nexport const sectionLoaders = {")
+    lines += [f"  {json.dumps(section_id)}: () => import('./{section_id}.js')," for section_id in lazy]
+    lines.append("};")
+    files[index_path] = '\n'.join(lines) + '\n'
+
+    for section_id in lazy:
+        path = sections_dir / f"{section_id}.js"
+        body = [f"  {_step_source(step['properties'])}," for step, chunk in zip(steps, chunks) if chunk == section_id]
+        files[path] = _header(path, source_hash) + "export default [\n" + '\n'.join(body) + "\n];\n"
+
+    # Renderers: the first section's are static imports, the rest load with their section
+    types_by_chunk = {}
+    for step, chunk in zip(steps, chunks):
+        if step['type'] in STEP_RENDERERS:
+            types_by_chunk.setdefault(chunk, []).append(step['type'])
+    eager_modules = sorted({STEP_RENDERERS[step_type] for step_type in types_by_chunk.get(first, [])})
+    eager_types = [step_type for step_type, module in STEP_RENDERERS.items() if module in eager_modules]
+    lines = [_header(renderers_path, source_hash)]
+    lines += [f"import {module} from './{module}.jsx';" for module in eager_modules]
+    lines.append("\n// Step type -> renderer component; sectionRendererLoaders add the rest as their sections load")
+    lines.append("export const stepRenderers = {")
+    lines += [f"  {json.dumps(step_type)}: {STEP_RENDERERS[step_type]}," for step_type in eager_types]
+    lines.append("};")
+    lines.append("\nexport const sectionRendererLoaders = {")
+    for section_id in lazy: # Each section lists every lazy renderer it needs, in case an earlier one was never loaded
+        modules = sorted({STEP_RENDERERS[step_type] for step_type in types_by_chunk.get(section_id, [])} - set(eager_modules))
+        if not modules:
+            continue
+        imports = ', '.join(f"import('./{module}.jsx')" for module in modules)
+        assignments = ', '.join(f"{json.dumps(step_type)}: {module}.default" for step_type, module in STEP_RENDERERS.items() if module in modules)
+        lines.append(f"  {json.dumps(section_id)}: () => Promise.all([{imports}]).then(([{', '.join(modules)}]) => Object.assign(stepRenderers, {{ {assignments} }})),")
+    lines.append("};")
+    files[renderers_path] = '\n'.join(lines) + '\n'
+    return files
+
+def split_survey(survey_data_path=SURVEY_DATA_PATH, sections_dir=SECTIONS_DIR, renderers_path=RENDERERS_PATH):
+    """Writes the split; returns (number of files written, number unchanged). Stale section modules are removed."""
+    survey = run_survey_script(DUMP_SURVEY_SOURCE_JS, survey_data_path)
+    source_hash = hashlib.sha256(Path(survey_data_path).read_bytes()).hexdigest()
+    files = render_split(survey, source_hash, Path(sections_dir), Path(renderers_path))
+    written = 0
+    for path, text in files.items():
+        if path.exists() and path.read_text(encoding='utf-8') == text: # Unchanged files keep their mtime, so Vite doesn't rebuild
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+        written += 1
+    for path in Path(sections_dir).glob('*.js'):
+        if path not in files:
+            path.unlink()
+    return written, len(files) - written
+
+# --- Command Line ---
+
+def main():
+    try:
+        written, unchanged = split_survey()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Split the survey: {written} file(s) written, {unchanged} unchanged")
+
+if __name__ == "__main__":
+    main()
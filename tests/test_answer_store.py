@@ -0,0 +1,100 @@
+"""
+Answer-store erasure, compaction and the cold tier, through the same calls
+survey_server.py makes (seal, save, apply tombstones, compact, reopen).
+
+    python -m unittest
+"""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from answer_decoder import get_schema
+from answer_store import COLD, COLD_AFTER_DAYS, AnswerStore, hash_email
+
+DAY_MS = 24 * 3600 * 1000
+
+def submission(email, diet='d_omnivore'):
+    return {'sex': 'female', 'age': 34, 'dietDescription': diet, 'healthGoals': ['g_bones'], 'emailHash': hash_email(email)}
+
+class AnswerStoreErasureTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name) / 'answers'
+        self.directory.mkdir()
+        self.store = self.open_store()
+        self.now_ms = int(time.time() * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_store(self):
+        store = AnswerStore(get_schema())
+        store.open(self.directory)
+        return store
+
+    def save(self):
+        """What a flush does: seal the tail, write the new block files, then the manifest."""
+        self.store.seal()
+        self.store.write_blocks(self.store.unsaved_blocks())
+        self.store.write_manifest()
+
+    def compact(self):
+        plan = self.store.plan_compaction(self.now_ms)
+        self.assertIsNotNone(plan)
+        self.store.commit_compaction(plan, self.store.run_compaction(plan))
+
+    def block_files(self):
+        return sorted(path.relative_to(self.directory).as_posix() for path in self.directory.rglob('block-*'))
+
+    def test_erasure_hides_rows_in_blocks_and_tail(self):
+        self.store.append(submission('a@example.com'), self.now_ms)
+        self.store.append(submission('b@example.com'), self.now_ms)
+        self.save()
+        self.store.append(submission('c@example.com'), self.now_ms) # Still in the tail
+        self.store.erase(hash_email(' B@Example.com'))
+        self.store.erase(hash_email('c@example.com'))
+        self.assertEqual(len(self.store), 3) # Logged, not applied yet
+        self.assertEqual(self.store.apply_tombstones(), 2)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.count({'sex': 'female'}), 1)
+        with self.assertRaises(ValueError):
+            self.store.erase('not-a-hash')
+
+    def test_compaction_merges_small_blocks_and_drops_erased_rows(self):
+        for email, diet in (('a@example.com', 'd_vegan'), ('b@example.com', 'd_omnivore'), ('c@example.com', 'd_vegan')):
+            self.store.append(submission(email, diet), self.now_ms)
+            self.save() # One small block per flush
+        self.store.erase(hash_email('b@example.com'))
+        self.store.apply_tombstones()
+        self.compact()
+        self.assertEqual(len(self.store.blocks), 1)
+        self.assertEqual(self.store.blocks[0].rows, 2) # Dropped physically, not just marked
+        self.assertEqual(self.store.count({'dietDescription': 'd_vegan'}), 2)
+        self.assertEqual(len(self.block_files()), 1)
+
+    def test_old_blocks_move_to_the_cold_tier(self):
+        self.store.append(submission('a@example.com'), self.now_ms - (COLD_AFTER_DAYS + 1) * DAY_MS)
+        self.save()
+        self.compact()
+        self.assertEqual(self.store.blocks[0].tier, COLD)
+        self.assertEqual(self.block_files(), ['cold/block-000000.bin.xz'])
+        self.assertEqual(len(self.open_store()), 1)
+
+    def test_erasure_survives_restart_before_and_after_compaction(self):
+        for email in ('a@example.com', 'b@example.com', 'c@example.com'):
+            self.store.append(submission(email), self.now_ms)
+            self.save()
+        self.store.erase(hash_email('b@example.com'))
+        self.store.apply_tombstones()
+        self.assertEqual(len(self.open_store()), 2) # Only the tombstone knows about it yet
+        self.compact()
+        self.store.erase(hash_email('c@example.com'))
+        self.store.apply_tombstones() # After the compaction: marked in the new block, not yet dropped
+        restarted = self.open_store()
+        self.assertEqual(len(restarted), 1)
+        self.assertEqual(restarted.apply_tombstones(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Erased submissions must stay erased across a restart of survey_server.py,
+whether the flusher saved them into a block or only into the journal.
+
+    python -m unittest
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import survey_server
+from answer_store import hash_email
+
+def submit_batch(sid, email):
+    answers = {'sex': 'female', 'age': 34, 'dietDescription': 'd_omnivore', 'healthGoals': ['g_bones'], 'emailHash': hash_email(email)}
+    return json.dumps({'sid': sid, 't0': 0, 'events': [['submit', 'email', 0, answers]]}).encode()
+
+class RestartAfterEraseTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name) # The server keeps its data under ./data
+        survey_server.ring.drain()
+        survey_server.open_stores()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def submit(self, sid, email):
+        records = survey_server.parse_event_batch(submit_batch(sid, email))
+        survey_server.ring.extend(records)
+        for listener in survey_server.EVENT_LISTENERS:
+            listener(records)
+
+    def flush(self):
+        async def flush_once():
+            await survey_server.flush_once(asyncio.get_running_loop())
+        asyncio.run(flush_once())
+
+    def restart(self):
+        survey_server.open_stores()
+        return survey_server.answer_store
+
+    def test_erased_row_stays_erased_after_restart(self):
+        self.submit('a', 'a@example.com')
+        self.submit('b', 'b@example.com')
+        self.flush()
+        survey_server.answer_store.erase(hash_email('b@example.com'))
+        self.flush()
+        store = self.restart()
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.apply_tombstones(), 0)
+        store.erase(hash_email('a@example.com'))
+        self.assertEqual(store.apply_tombstones(), 1)
+        self.assertEqual(len(store), 0)
+
+    def test_journal_replay_skips_erased_rows(self):
+        self.submit('a', 'a@example.com')
+        self.submit('b', 'b@example.com')
+        survey_server.answer_store.erase(hash_email('b@example.com'))
+        # Crash after the journal is written but before the blocks and manifest are saved
+        store = survey_server.answer_store
+        seq, rows = store.seal_journal(survey_server.ring.drain())
+        store.write_journal(seq, rows)
+        store = self.restart()
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.count({'sex': 'female'}), 1)
+        store.erase(hash_email('a@example.com'))
+        store.apply_tombstones()
+        self.assertEqual(len(store), 0)
+
+    def test_saved_journals_are_removed(self):
+        self.submit('a', 'a@example.com')
+        self.flush()
+        self.assertEqual(list(survey_server.ANSWERS_DIR.glob('journal-*.jsonl')), [])
+        self.assertEqual(len(self.restart()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
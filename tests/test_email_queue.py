@@ -0,0 +1,92 @@
+"""
+Results-email queue: leases, retries, permanent failures, and delivery
+through the SMTP stand-in over the connection pool.
+
+    python -m unittest
+"""
+
+import email.policy
+import smtplib
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from answer_decoder import get_schema
+from email_queue import (LEASE_SECONDS, MAX_ATTEMPTS, EmailQueue, ResultEmailRenderer, SmtpPool, SmtpStandIn, TokenBucket,
+                         deliver_batch, is_permanent, retry_delay)
+
+CATALOG = {'products': [{'sku': 'd3', 'name': 'Vitamin D3', 'goals': ['g_bones'], 'nutrients': {'vitamin_d_iu': 1000}, 'excludeFor': []}]}
+PAYLOAD = {'name': 'Alexandra', 'goals': ['g_bones'], 'products': [['d3', 'Supports your Bones goal']]}
+
+class EmailQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = EmailQueue(Path(self.tmp.name) / 'email_queue.sqlite3')
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_claimed_jobs_are_leased(self):
+        self.queue.enqueue('a@example.com', PAYLOAD)
+        now = time.time()
+        self.assertEqual(len(self.queue.claim(now=now)), 1)
+        self.assertEqual(self.queue.claim(now=now), []) # Leased to the first worker
+        self.assertEqual(len(self.queue.claim(now=now + LEASE_SECONDS + 1)), 1) # That worker died: due again
+
+    def test_temporary_failures_back_off_then_fail(self):
+        self.queue.enqueue('a@example.com', PAYLOAD)
+        now = time.time()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            [job] = self.queue.claim(now=now)
+            self.queue.finish([], [(job, '451 Try again later', False)], now=now)
+            if attempt < MAX_ATTEMPTS:
+                self.assertEqual(self.queue.claim(now=now), []) # Backing off
+                now += retry_delay(attempt)
+        self.assertEqual(self.queue.stats(now), {'pending': 0, 'due': 0, 'failed': 1})
+        self.assertEqual(self.queue.retry_failed(), 1)
+        self.assertEqual(len(self.queue.claim()), 1)
+
+    def test_permanent_errors(self):
+        self.assertTrue(is_permanent(smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'No such user')})))
+        self.assertFalse(is_permanent(smtplib.SMTPSenderRefused(550, b'Relay denied', 'sender')))
+        self.assertFalse(is_permanent(smtplib.SMTPResponseException(451, b'Later')))
+        self.assertFalse(is_permanent(ConnectionRefusedError()))
+
+class DeliveryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = EmailQueue(Path(self.tmp.name) / 'email_queue.sqlite3')
+        self.stand_in = SmtpStandIn(fail_every=2)
+        self.pool = SmtpPool('127.0.0.1', self.stand_in.start_thread(), size=2)
+        self.renderer = ResultEmailRenderer(CATALOG, get_schema())
+
+    def tearDown(self):
+        self.pool.close()
+        self.stand_in.stop()
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def deliver(self):
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            return deliver_batch(self.queue, self.renderer, self.pool, TokenBucket(1000, 1000), executor)
+
+    def test_sent_jobs_leave_the_queue(self):
+        for recipient in ('a@example.com', 'b@example.com', 'c@example.com', 'd@example.com'):
+            self.queue.enqueue(recipient, PAYLOAD)
+        self.queue.enqueue('e@example.com', {'name': 'Broken'}) # No goals or products: fails at render
+        self.assertEqual(self.deliver(), (2, 3)) # Every 2nd message gets a 451
+        self.assertEqual(self.queue.stats(), {'pending': 2, 'due': 0, 'failed': 1})
+        self.queue.db.execute("UPDATE jobs SET due_at = 0 WHERE status = 'pending'")
+        self.stand_in.fail_every = 0
+        self.assertEqual(self.deliver(), (2, 0))
+        self.assertEqual(self.queue.stats()['pending'], 0) # Sent jobs, and their addresses, are gone
+
+        message = email.message_from_bytes(self.stand_in.messages[0][2], policy=email.policy.default)
+        self.assertRegex(message['Message-ID'], r'^<results-\d+@')
+        self.assertIn('Vitamin D3', message.get_body(('plain',)).get_content())
+
+if __name__ == "__main__":
+    unittest.main()
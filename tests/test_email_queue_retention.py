@@ -0,0 +1,75 @@
+"""
+The email queue must not keep an address after its erasure, nor keep failed
+jobs past FAILED_RETENTION_DAYS.
+
+    python -m unittest
+"""
+
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from answer_store import hash_email
+from email_queue import FAILED_RETENTION_DAYS, EmailQueue, erase_queued_emails
+
+PAYLOAD = {'name': 'Alexandra', 'goals': ['g_bones'], 'products': []}
+
+class EmailQueueRetentionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'email_queue.sqlite3'
+        self.queue = EmailQueue(self.path)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def fail_due_jobs(self, failed_at=None):
+        jobs = self.queue.claim()
+        self.queue.finish([], [(job, '550 No such user', True) for job in jobs], now=failed_at)
+
+    def recipients(self):
+        return sorted(row[0] for row in self.queue.db.execute("SELECT recipient FROM jobs"))
+
+    def test_erase_deletes_pending_and_failed_jobs(self):
+        self.queue.enqueue(' Alexandra@Example.com', PAYLOAD)
+        self.fail_due_jobs()
+        self.queue.enqueue('alexandra@example.com', PAYLOAD)
+        self.queue.enqueue('b@example.com', PAYLOAD)
+        self.assertEqual(self.queue.erase(hash_email('alexandra@example.com')), 2)
+        self.assertEqual(self.recipients(), ['b@example.com'])
+
+    def test_erase_from_another_connection(self):
+        self.queue.enqueue('a@example.com', PAYLOAD)
+        self.assertEqual(erase_queued_emails(hash_email('a@example.com'), self.path), 1)
+        self.assertEqual(self.recipients(), [])
+        self.assertEqual(erase_queued_emails(hash_email('a@example.com'), Path(self.tmp.name) / 'missing.sqlite3'), 0)
+
+    def test_failed_jobs_expire(self):
+        now = time.time()
+        self.queue.enqueue('old@example.com', PAYLOAD)
+        self.fail_due_jobs(now - (FAILED_RETENTION_DAYS + 1) * 86400)
+        self.queue.enqueue('new@example.com', PAYLOAD)
+        self.fail_due_jobs(now)
+        self.queue.enqueue('pending@example.com', PAYLOAD)
+        self.assertEqual(self.queue.purge_expired(now=now), 1)
+        self.assertEqual(self.recipients(), ['new@example.com', 'pending@example.com'])
+
+    def test_older_queue_file_gains_hashes(self):
+        self.queue.close()
+        self.path.unlink()
+        db = sqlite3.connect(self.path)
+        db.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, recipient TEXT NOT NULL, payload TEXT NOT NULL, "
+                   "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, due_at REAL NOT NULL, "
+                   "created_at REAL NOT NULL, last_error TEXT)")
+        db.execute("INSERT INTO jobs (recipient, payload, status, due_at, created_at) VALUES ('a@example.com', '{}', 'failed', 0, 0)")
+        db.commit()
+        db.close()
+        self.queue = EmailQueue(self.path)
+        self.assertEqual(self.queue.purge_expired(), 0) # Retention starts at the upgrade
+        self.assertEqual(self.queue.erase(hash_email('a@example.com')), 1)
+
+if __name__ == "__main__":
+    unittest.main()
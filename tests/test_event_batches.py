@@ -0,0 +1,37 @@
+"""
+Beacon bodies that fail to decode must be answered with an HTTP error, never
+dropped with the connection or accepted in part.
+
+    python -m unittest
+"""
+
+import gzip
+import json
+import unittest
+
+import survey_server
+from survey_server import HttpError, parse_event_batch
+
+BATCH = json.dumps({'sid': 'a', 't0': 0, 'events': [['view', 'email', 0, 1]]}).encode()
+
+class GzipBatchTest(unittest.TestCase):
+    def assertStatus(self, status, raw):
+        with self.assertRaises(HttpError) as caught:
+            parse_event_batch(raw)
+        self.assertEqual(caught.exception.status, status)
+
+    def test_gzip_batch_is_decoded(self):
+        self.assertEqual(len(parse_event_batch(gzip.compress(BATCH))), 1)
+
+    def test_malformed_gzip_is_rejected(self):
+        self.assertStatus(400, b'\x1f\x8b' + b'\x00' * 32)
+
+    def test_truncated_gzip_is_rejected(self):
+        self.assertStatus(400, gzip.compress(BATCH)[:-12])
+
+    def test_oversized_batch_is_rejected(self):
+        padded = json.dumps({'sid': 'a', 't0': 0, 'events': [], 'pad': ' ' * survey_server.MAX_DECOMPRESSED_BYTES}).encode()
+        self.assertStatus(413, gzip.compress(padded))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,20 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 
+// Content-hashed paths (asset_manifest.py's /static/, image_assets.py's /img/, Vite's /assets/) never change,
+// so `vite preview` serves them as immutable; everything else is revalidated. Same rule as asset_manifest.cache_control().
+const IMMUTABLE_PATH = /^\/(static|img|assets)\//
+const cacheHeaders = () => ({
+  name: 'cache-headers',
+  configurePreviewServer(server) {
+    server.middlewares.use((req, res, next) => {
+      res.setHeader('Cache-Control', IMMUTABLE_PATH.test(req.url) ? 'public, max-age=31536000, immutable' : 'no-cache')
+      next()
+    })
+  },
+})
+
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), cacheHeaders()],
 })